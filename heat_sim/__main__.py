@@ -1,3 +1,17 @@
+import os
+import sys
+import time
+
+_t_start = time.perf_counter()
+
+# The modules import each other by bare name; make that work under `python -m heat_sim` too
+_here = os.path.dirname(os.path.abspath(__file__))
+if _here not in sys.path:
+    sys.path.insert(0, _here)
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        from heat_cli import main
+        sys.exit(main(sys.argv[1:], t_start=_t_start))
     from heat_gui import create_gui
-    create_gui()
\ No newline at end of file
+    create_gui()
@@ -0,0 +1,205 @@
+# heat_bench.py
+# Reproducible timings of the core kernels and the render loop.
+# Results are JSON so runs can be diffed against a saved baseline.
+import json
+import os
+import platform
+import time
+import timeit
+import warnings
+import numpy as np
+import heat_core
+from heat_core import (setup_matrices, compute_next_u, setup_banded, compute_next_u_banded, Stepper,
+                       Ensemble, parse_initial_condition, initialize_u)
+
+# The dense reference needs nx**2 memory, so it stops well before the banded path
+DENSE_MAX_NX = 2000
+EXPR = 'sin(pi * x / L) + exp(-50 * (x / L - 0.5)**2)'
+
+def measure(func, repeat=5):
+    """Best seconds per call of func(), timeit-style (each repeat runs >= 0.2 s)."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+def parse_cold(x):
+    """initialize_u of a freshly compiled EXPR: sympy parse and lambdify, no memo or disk cache."""
+    saved = os.environ.get('HEAT_SIM_EXPR_CACHE')
+    os.environ['HEAT_SIM_EXPR_CACHE'] = 'off'
+    try:
+        heat_core._compile_expression.cache_clear()
+        return initialize_u(x, parse_initial_condition(EXPR, 1.0))
+    finally:
+        if saved is None:
+            del os.environ['HEAT_SIM_EXPR_CACHE']
+        else:
+            os.environ['HEAT_SIM_EXPR_CACHE'] = saved
+
+def grid_sizes(max_nx):
+    sizes = []
+    nx = 100
+    while nx <= max_nx:
+        sizes.append(nx)
+        nx *= 10
+    return sizes
+
+def bench_kernels(sizes, repeat=5):
+    results = []
+    for nx in sizes:
+        u = np.random.default_rng(0).random(nx)
+        if nx <= DENSE_MAX_NX:
+            results.append(('setup_matrices', {'nx': nx}, measure(lambda: setup_matrices(nx, 0.5), repeat)))
+            M_imp, M_exp = setup_matrices(nx, 0.5)
+            results.append(('compute_next_u', {'nx': nx}, measure(lambda: compute_next_u(u, M_imp, M_exp), repeat)))
+        results.append(('setup_banded', {'nx': nx}, measure(lambda: setup_banded(nx, 0.5), repeat)))
+        ab_imp, ab_exp = setup_banded(nx, 0.5)
+        results.append(('compute_next_u_banded', {'nx': nx},
+                        measure(lambda: compute_next_u_banded(u, ab_imp, ab_exp), repeat)))
+        stepper = Stepper(nx, 0.5, 'dirichlet')
+        v = u.copy()
+        results.append(('stepper_step', {'nx': nx}, measure(lambda: stepper.advance(v, 10, out=v), repeat) / 10))
+        x = np.linspace(0, 1.0, nx)
+        # Cold is what a first parse costs; warm is a memoised repeat (the GUI's Start button)
+        results.append(('parse_initialize', {'nx': nx}, measure(lambda: parse_cold(x), min(repeat, 3))))
+        results.append(('parse_initialize_warm', {'nx': nx},
+                        measure(lambda: initialize_u(x, parse_initial_condition(EXPR, 1.0)), min(repeat, 3))))
+    return results
+
+def bench_ensemble(batches, nx=101, repeat=5, precisions=('float64', 'float32', 'mixed')):
+    results = []
+    for batch in batches:
+        for precision in precisions:
+            ensemble = Ensemble(nx, np.linspace(1e-5, 2e-4, batch), 1.0, precision=precision)
+            U = np.random.default_rng(0).random((batch, nx)).astype(ensemble.dtype)
+            per_step = measure(lambda: ensemble.advance(U, 10, out=U), repeat) / 10
+            # float64 keeps the parameter set of older baselines
+            params = {'nx': nx, 'batch': batch}
+            if precision != 'float64':
+                params['precision'] = precision
+            results.append(('ensemble_step', params, per_step))
+    return results
+
+def check_precision(nx=1001, batch=16, steps=2000):
+    """Error of the float32 and mixed modes against float64 after steps steps.
+
+    Returns {precision: {'max_error': ..., 'mean_drift': ...}}, both relative to
+    the initial temperature range: the largest pointwise deviation from the
+    float64 run, and how far the mean of the insulated rods has wandered from
+    the value float64 keeps (float64 conserves it to round-off).
+    """
+    f = parse_initial_condition(EXPR, 1.0)
+    bc_type = ['neumann', 'dirichlet'] * (batch // 2)
+    bc_params = [None, {'left': 0.0, 'right': 1.0}] * (batch // 2)
+    alpha = np.linspace(1e-5, 2e-4, len(bc_type))
+    runs = {}
+    for precision in ('float64', 'float32', 'mixed'):
+        ensemble = Ensemble(nx, alpha, 1.0, bc_type, bc_params, precision=precision)
+        U = np.stack([initialize_u(x, f, bc, params, dtype=ensemble.dtype)
+                      for x, bc, params in zip(ensemble.x, bc_type, bc_params)])
+        spread = np.ptp(U.astype(float))
+        runs[precision] = ensemble.advance(U, steps, out=U).astype(float)
+    ref = runs.pop('float64')
+    neumann = np.array(bc_type) == 'neumann'
+    return {precision: {'max_error': float(np.abs(U - ref).max() / spread),
+                        'mean_drift': float(np.abs(U[neumann].mean(axis=1) - ref[neumann].mean(axis=1)).max() / spread)}
+            for precision, U in runs.items()}
+
+def bench_render(sizes, repeat=3):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from heat_plot import run_plot
+
+    results = []
+    f = parse_initial_condition(EXPR, 1.0)
+    for nx in sizes:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')  # tight_layout vs. the button axes
+            fig, update = run_plot(1.0, heat_core.metals['iron'], f, lambda: None, steady_tol=None,
+                                   nx=nx, show=False, threaded=False, use_cache=False)
+        frame = iter(range(10**9))
+        results.append(('plot_update', {'nx': nx}, measure(lambda: update(next(frame)), repeat)))
+        plt.close(fig)
+    return results
+
+def bench_dashboard(layouts=(1, 2, 6, 16), repeat=3):
+    """Frame time of run_comparison with each number of panels."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from heat_plot import run_comparison
+
+    results = []
+    f = parse_initial_condition(EXPR, 1.0)
+    names = list(heat_core.metals)
+    for panels in layouts:
+        rods = [{'L': 1.0, 'alpha': heat_core.metals[names[i % len(names)]], 'f': f, 'name': names[i % len(names)]}
+                for i in range(panels)]
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            fig, update = run_comparison(rods, lambda: None, steady_tol=None, show=False, threaded=False,
+                                         use_cache=False)
+        update(0)  # the first frame draws the shared background
+        frame = iter(range(1, 10**9))
+        results.append(('dashboard_frame', {'panels': panels}, measure(lambda: update(next(frame)), repeat)))
+        plt.close(fig)
+    return results
+
+def run_benchmarks(max_nx=10**6, batches=(1, 16, 256, 4096), render_max_nx=10**5, repeat=5):
+    results = bench_kernels(grid_sizes(max_nx), repeat)
+    results += bench_ensemble(batches, repeat=repeat)
+    results += bench_render(grid_sizes(min(max_nx, render_max_nx)), min(repeat, 3))
+    results += bench_dashboard(repeat=min(repeat, 3))
+    return {
+        'accuracy': check_precision(),
+        'meta': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': [{'name': name, 'params': params, 'seconds': seconds} for name, params, seconds in results],
+    }
+
+def _key(entry):
+    return entry['name'] + ''.join(f" {k}={v}" for k, v in sorted(entry['params'].items()))
+
+def compare(current, baseline, threshold=1.25):
+    """Rows of (case, baseline s, current s, ratio, regressed) for the cases both runs share."""
+    old = {_key(e): e['seconds'] for e in baseline['results']}
+    rows = []
+    for entry in current['results']:
+        key = _key(entry)
+        if key in old:
+            ratio = entry['seconds'] / old[key]
+            rows.append((key, old[key], entry['seconds'], ratio, ratio > threshold))
+    return rows
+
+def main(args):
+    """Entry point for `python -m heat_sim bench`."""
+    if args.quick:
+        report = run_benchmarks(max_nx=10**4, batches=(1, 16, 256), render_max_nx=10**3, repeat=1)
+    else:
+        report = run_benchmarks(max_nx=args.max_nx)
+    for entry in report['results']:
+        fps = f"{1 / entry['seconds']:8.0f} fps" if entry['name'] == 'dashboard_frame' else ''
+        print(f"{_key(entry):40s} {entry['seconds'] * 1e6:12.1f} us{fps}")
+    for precision, errors in report['accuracy'].items():
+        print(f"{precision:8s} vs float64: max error {errors['max_error']:.1e}, "
+              f"mean drift {errors['mean_drift']:.1e} (relative to the initial range)")
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(report, fh, indent=2)
+        print(f"wrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+        rows = compare(report, baseline, args.threshold)
+        regressed = [row for row in rows if row[4]]
+        for key, old, new, ratio, bad in rows:
+            print(f"{'REGRESSION' if bad else 'ok':10s} {key:40s} {ratio:6.2f}x")
+        print(f"{len(regressed)} of {len(rows)} cases slower than {args.threshold:.2f}x the baseline")
+        return 1 if regressed else 0
+    return 0
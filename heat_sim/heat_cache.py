@@ -0,0 +1,191 @@
+# heat_cache.py
+# Content-addressed cache of computed runs. A run is identified by a hash of
+# everything that determines its numbers (rod, initial expression, boundary
+# conditions, grid, solver, precision) plus SOLVER_VERSION; its snapshots every
+# `every` steps are kept on disk, so repeating a configuration replays them
+# instead of stepping, and asking for a longer run only computes the new part.
+import hashlib
+import json
+import os
+import numpy as np
+from heat_core import cache_setting
+
+# Bump whenever a change to the solvers alters their output bits
+SOLVER_VERSION = 1
+DEFAULT_MAX_MB = 512
+
+def result_cache_dir():
+    """Directory of cached results, or None when HEAT_SIM_RESULT_CACHE is 'off'."""
+    return cache_setting('HEAT_SIM_RESULT_CACHE', 'results')
+
+def spec_key(spec):
+    """Stable hex digest of a JSON-able run spec and the solver version."""
+    text = json.dumps(spec, sort_keys=True, separators=(',', ':'), default=float)
+    return hashlib.sha256(f"{SOLVER_VERSION}|{text}".encode()).hexdigest()
+
+class ResultCache:
+    """Snapshot arrays on disk, one <key>.npy (frames x state) per spec.
+
+    Entries are evicted least recently used first once they add up to more
+    than max_bytes (HEAT_SIM_RESULT_CACHE_MB, default 512 MiB); reading an
+    entry counts as a use.
+    """
+
+    def __init__(self, root, max_bytes=None):
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get('HEAT_SIM_RESULT_CACHE_MB', DEFAULT_MAX_MB)) * 2**20)
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return os.path.join(self.root, key + '.npy')
+
+    def load(self, spec):
+        """(frames, meta) cached for spec, memory-mapped, or None."""
+        path = self._path(spec_key(spec))
+        try:
+            frames = np.load(path, mmap_mode='r')
+            with open(path[:-4] + '.json') as fh:
+                meta = json.load(fh)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return frames, meta
+
+    def store(self, spec, parts, meta=None):
+        """Write the frames of spec (a list of arrays stacked in order) and evict down to the cap."""
+        key = spec_key(spec)
+        path = self._path(key)
+        count = sum(len(p) for p in parts)
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            tmp = f"{path[:-4]}.{os.getpid()}.tmp.npy"
+            out = np.lib.format.open_memmap(tmp, mode='w+', dtype=parts[0].dtype,
+                                            shape=(count,) + parts[0].shape[1:])
+            i = 0
+            for p in parts:
+                out[i:i + len(p)] = p
+                i += len(p)
+            out.flush()
+            del out
+            with open(path[:-4] + '.json', 'w') as fh:
+                json.dump({'spec': spec, 'frames': count, **(meta or {})}, fh, default=float)
+            os.replace(tmp, path)
+        except OSError:
+            return  # a read-only or full cache only costs the next run its stepping
+        self.evict(keep=key)
+
+    def entries(self):
+        """[(last use, bytes, key)] of every entry, oldest first."""
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return []
+        found = []
+        for name in names:
+            if name.endswith('.npy') and '.tmp' not in name:
+                path = os.path.join(self.root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                found.append((st.st_mtime, st.st_size, name[:-4]))
+        return sorted(found)
+
+    def evict(self, keep=None):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            self.remove(key)
+            total -= size
+
+    def remove(self, key):
+        for path in (self._path(key), self._path(key)[:-4] + '.json'):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self):
+        for _, _, key in self.entries():
+            self.remove(key)
+
+def default_cache():
+    """The ResultCache of this user, or None if disabled."""
+    root = result_cache_dir()
+    return ResultCache(root) if root else None
+
+class CachedRun:
+    """Replays and extends the cached snapshots of one run.
+
+    wrap(advance) returns an advance(u, k) that walks the run in pieces of
+    `every` steps: a piece whose end state is cached is copied from the cache,
+    any other is computed and recorded. Snapshots are only reused for the same
+    initial state u, so a stale or mismatched entry is simply recomputed.
+    Recording stops at a quarter of the cache size; save() writes what was
+    added.
+    """
+
+    def __init__(self, cache, spec, u, every):
+        self.cache = cache
+        self.spec = dict(spec, every=every)
+        self.every = every
+        self.step = 0
+        self.replayed = 0
+        self.computed = 0
+        u = np.asarray(u)
+        hit = cache.load(self.spec)
+        self._cached = None
+        if hit is not None:
+            frames = hit[0]
+            if frames.shape[1:] == u.shape and frames.dtype == u.dtype and np.array_equal(frames[0], u):
+                self._cached = frames
+        self._new = [] if self._cached is not None else [u.copy()]
+        self._limit = max(2, cache.max_bytes // 4 // max(u.nbytes, 1))
+
+    @property
+    def cached_frames(self):
+        return 0 if self._cached is None else len(self._cached)
+
+    def _count(self):
+        return self.cached_frames + len(self._new)
+
+    def wrap(self, advance):
+        def cached_advance(v, k):
+            while k > 0:
+                offset = self.step % self.every
+                if offset or k < self.every:
+                    # Off the snapshot grid: compute without recording
+                    n = min(k, self.every - offset)
+                    v = advance(v, n)
+                else:
+                    n = self.every
+                    index = self.step // self.every + 1
+                    if index < self.cached_frames:
+                        v[...] = self._cached[index]
+                        self.replayed += 1
+                    else:
+                        v = advance(v, n)
+                        self.computed += 1
+                        if index == self._count() and index < self._limit:
+                            self._new.append(v.copy())
+                self.step += n
+                k -= n
+            return v
+        return cached_advance
+
+    def save(self):
+        """Store the snapshots added since the last save (a no-op if none were)."""
+        if len(self._new) <= (0 if self._cached is not None else 1):
+            return
+        parts = ([self._cached] if self._cached is not None else []) + [np.stack(self._new)]
+        self.cache.store(self.spec, parts, {'every': self.every})
+        # Later saves extend what was just written
+        hit = self.cache.load(self.spec)
+        if hit is not None:
+            self._cached = hit[0]
+            self._new = []
@@ -0,0 +1,503 @@
+# heat_cli.py
+# Headless entry point: never imports tkinter or matplotlib.
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import numpy as np
+from heat_core import (metals, parse_initial_condition, initialize_u, Stepper, AdaptiveStepper,
+                       steady_state, run_to_steady_state, resolve_segments, face_diffusivity,
+                       precision_dtypes)
+from heat_io import TrajectoryWriter, advance_recorded, CheckpointWriter, read_checkpoint
+from heat_spectral import SpectralSolver
+from heat_mesh import graded_mesh, run_adaptive_mesh
+from heat_sweep import expand_grid, default_chunk, run_sweep, write_summary
+from heat_stats import SimStats
+from heat_cache import CachedRun, default_cache
+
+# Job keys that only shape the output, not the computed states
+_OUTPUT_KEYS = ('steps', 'output', 'trajectory', 'stride', 'probes', 'steady_tol', 'checkpoint',
+                'checkpoint_every', 'cache')
+
+def load_config(path):
+    """Read a job file (.toml, or .json) into a dict."""
+    if path.endswith('.json'):
+        with open(path) as fh:
+            return json.load(fh)
+    try:
+        import tomllib
+    except ImportError:  # Python < 3.11
+        try:
+            import tomli as tomllib
+        except ImportError:
+            raise ValueError("TOML configs need Python 3.11+ or tomli; use a .json config instead")
+    with open(path, 'rb') as fh:
+        return tomllib.load(fh)
+
+def build_job(cfg):
+    """Validate a config dict and fill in defaults."""
+    rod = cfg.get('rod', {})
+    grid = cfg.get('grid', {})
+    run = cfg.get('run', {})
+
+    # Composite rod: [[metal or alpha, length], ...] laid end to end
+    segments = resolve_segments(rod['segments']) if 'segments' in rod else None
+    L = float(rod.get('length', sum(length for _, length in segments) if segments else 1.0))
+    if L <= 0:
+        raise ValueError("Length must be positive.")
+    if segments is not None:
+        alpha = max(a for a, _ in segments)
+    elif 'alpha' in rod:
+        alpha = float(rod['alpha'])
+    else:
+        metal = str(rod.get('metal', 'iron')).lower()
+        alpha = metals.get(metal)
+        if alpha is None:
+            raise ValueError(f"Unknown metal '{metal}'. Choose one of: {', '.join(metals)}")
+
+    bc_type = str(rod.get('bc', 'neumann')).lower()
+    if bc_type not in ('neumann', 'dirichlet'):
+        raise ValueError("Unsupported boundary condition type")
+    bc_params = None
+    if bc_type == 'dirichlet':
+        bc_params = {'left': float(rod.get('left', 0.0)), 'right': float(rod.get('right', 0.0))}
+
+    nx = int(grid.get('nx', 101))
+    if nx < 3:
+        raise ValueError("nx must be at least 3.")
+    dx = L / (nx - 1)
+    dt = float(grid['dt']) if 'dt' in grid else float(grid.get('sigma', 0.5)) * dx**2 / alpha
+    solver = str(grid.get('solver', 'cn')).lower()
+    if solver not in ('cn', 'spectral'):
+        raise ValueError("solver must be 'cn' or 'spectral'")
+    adaptive = bool(grid.get('adaptive', False))
+    if adaptive and solver != 'cn':
+        raise ValueError("Adaptive time stepping applies to the 'cn' solver only")
+    mesh = str(grid.get('mesh', 'uniform')).lower()
+    if mesh not in ('uniform', 'graded', 'adaptive'):
+        raise ValueError("mesh must be 'uniform', 'graded' or 'adaptive'")
+    if mesh != 'uniform' and (solver != 'cn' or adaptive):
+        raise ValueError("Graded and adaptive meshes need the fixed-step 'cn' solver")
+    if segments is not None and (solver != 'cn' or adaptive or mesh == 'adaptive'):
+        raise ValueError("Composite rods need the fixed-step 'cn' solver on a uniform or graded mesh")
+    precision = str(grid.get('precision', 'float64')).lower()
+    precision_dtypes(precision)
+    if precision != 'float64' and (solver != 'cn' or adaptive or mesh == 'adaptive'):
+        raise ValueError("float32 and mixed precision need the fixed-step 'cn' solver on a uniform or graded mesh")
+    if run.get('checkpoint') and (adaptive or mesh == 'adaptive'):
+        raise ValueError("Checkpoints need fixed time steps on a fixed mesh")
+    if mesh == 'adaptive' and (run.get('trajectory') or 'steady_tol' in run):
+        raise ValueError("mesh = 'adaptive' moves the nodes, so it only writes the final profile")
+
+    # Checkpoints land on output/check boundaries, so a resumed run repeats them exactly
+    stride = max(1, int(run.get('stride', 10)))
+    checkpoint_every = max(1, int(run.get('checkpoint_every', 1000)))
+    if run.get('trajectory') or 'steady_tol' in run:
+        checkpoint_every = -(-checkpoint_every // stride) * stride
+
+    return {
+        'L': L,
+        'alpha': alpha,
+        'segments': segments,
+        'init': str(rod.get('init', 'sin(pi * x / L)')),
+        'bc_type': bc_type,
+        'bc_params': bc_params,
+        'nx': nx,
+        'dt': dt,
+        'solver': solver,
+        'adaptive': adaptive,
+        'tol': float(grid.get('tol', 1e-4)),
+        'mesh': mesh,
+        'remesh_every': int(grid.get('remesh_every', 10)),
+        'precision': precision,
+        'steps': int(run.get('steps', 2000)),
+        'output': run.get('output', 'result.npz'),
+        'trajectory': run.get('trajectory'),
+        'stride': stride,
+        'probes': run.get('probes'),
+        'steady_tol': float(run['steady_tol']) if 'steady_tol' in run else None,
+        'checkpoint': run.get('checkpoint'),
+        'checkpoint_every': checkpoint_every,
+        'cache': bool(run.get('cache', True)),
+    }
+
+def run_job(job, sim_stats=None, resume=None):
+    """Run one job; sim_stats (a heat_stats.SimStats) collects per-phase timings.
+
+    resume is a checkpoint from heat_io.read_checkpoint; the run then continues
+    from its state and produces exactly what the uninterrupted run would have.
+
+    Fixed-step runs keep their state every stride steps in the result cache
+    (heat_cache) unless job['cache'] is false: a repeated job replays those
+    snapshots, and a longer one only computes past the cached end.
+    """
+    t0 = time.perf_counter()
+    f = parse_initial_condition(job['init'], job['L'])
+    if job['mesh'] == 'uniform':
+        x = np.linspace(0, job['L'], job['nx'])
+    else:
+        x = graded_mesh(job['L'], job['nx'], f)
+    u = initialize_u(x, f, job['bc_type'], job['bc_params'], dtype=precision_dtypes(job['precision'])[0])
+    dx = job['L'] / (job['nx'] - 1)
+    stats = solver = None
+    if job['mesh'] == 'adaptive':
+        def advance(v, k):
+            nonlocal x
+            x, v = run_adaptive_mesh(x, v, job['alpha'], job['dt'], k, job['bc_type'], job['bc_params'],
+                                     remesh_every=job['remesh_every'])
+            return v
+    elif job['solver'] == 'spectral':
+        solver = SpectralSolver(x, u, job['alpha'], job['bc_type'], job['bc_params'], dt=job['dt'])
+        advance = lambda v, k: solver.advance(v, k, out=v)
+    elif job['adaptive']:
+        # dt is then only the nominal output spacing; the controller picks the real steps
+        solver = AdaptiveStepper(job['nx'], dx, job['alpha'], job['bc_type'], job['bc_params'],
+                                 tol=job['tol'])
+        advance = lambda v, k: solver.integrate(v, k * job['dt'], out=v)
+        stats = solver.stats
+    else:
+        r = job['alpha'] * job['dt'] / dx**2
+        kappa = None
+        if job['segments'] is not None:
+            kappa = face_diffusivity(x, job['segments']) / job['alpha']
+        solver = Stepper(job['nx'], r, job['bc_type'], job['bc_params'], x=None if job['mesh'] == 'uniform' else x,
+                         kappa=kappa, precision=job['precision'])
+        advance = lambda v, k: solver.advance(v, k, out=v)
+        # The Crank-Nicolson stepper splits its own time into stencil/solve/boundary
+        solver.stats = sim_stats
+    if sim_stats is not None and not isinstance(solver, Stepper):
+        inner = advance
+        def advance(v, k):
+            with sim_stats.phase('step'):
+                v = inner(v, k)
+            sim_stats.add_steps(k)
+            return v
+    # Settling is always judged against the spread of the initial profile
+    spread = max(np.ptp(u), 1e-12)
+    profile = None
+    if job['steady_tol'] is not None:
+        profile = steady_state(x, u, job['bc_type'], job['bc_params'], job['segments'])
+    cached = None
+    if job.get('cache', True) and resume is None and not job['adaptive'] and job['mesh'] != 'adaptive':
+        cache = default_cache()
+        if cache is not None:
+            spec = {k: v for k, v in job.items() if k not in _OUTPUT_KEYS}
+            cached = CachedRun(cache, dict(spec, kind='job'), u, job['stride'])
+            advance = cached.wrap(advance)
+    start = 0
+    if resume is not None:
+        u = resume['u']
+        start = resume['step']
+    t1 = time.perf_counter()
+    writer = None
+    if job['trajectory']:
+        if resume is not None:
+            writer = TrajectoryWriter.reopen(job['trajectory'], x, start * job['dt'], job['probes'])
+        else:
+            n_snapshots = 1 + -(-job['steps'] // job['stride'])
+            writer = TrajectoryWriter(job['trajectory'], x, n_snapshots, probes=job['probes'], meta={'job': job},
+                                      dtype=u.dtype)
+    checkpoints = on_chunk = None
+    if job['checkpoint']:
+        checkpoints = CheckpointWriter(job['checkpoint'], job)
+        def save_checkpoint(done, v):
+            if done % job['checkpoint_every'] == 0:
+                checkpoints.submit(v, done, done * job['dt'])
+        on_chunk = save_checkpoint
+    try:
+        if job['steady_tol'] is not None:
+            # steps is then an upper bound; stop as soon as the rod settles
+            time_scale = job['L']**2 / job['alpha']
+            if job['segments'] is not None:
+                time_scale = job['L'] * sum(length / a for a, length in job['segments'])
+            eq = run_to_steady_state(advance, u, job['dt'], time_scale, tol=job['steady_tol'],
+                                     check_every=job['stride'], max_steps=job['steps'], writer=writer,
+                                     start=start, spread=spread, on_check=on_chunk)
+            u, steps = eq['u'], eq['steps']
+            equilibrium = {'converged': eq['converged'], 't_eq': eq['t_eq'], 'profile': profile}
+        else:
+            steps, equilibrium = job['steps'], None
+            chunk = job['stride'] if writer is not None else job['checkpoint_every'] if checkpoints else steps
+            u = advance_recorded(advance, u, steps, max(chunk, 1), writer, job['dt'], start=start, on_chunk=on_chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+        if checkpoints is not None:
+            checkpoints.close()
+        if cached is not None:
+            cached.save()
+    t2 = time.perf_counter()
+    cache_info = None
+    if cached is not None:
+        cache_info = {'replayed': cached.replayed * job['stride'], 'computed': steps - cached.replayed * job['stride']}
+    return {'x': x, 'u': u, 't': steps * job['dt'], 'steps': steps, 'stats': stats, 'equilibrium': equilibrium,
+            'cache': cache_info, 'setup_s': t1 - t0, 'step_s': t2 - t1}
+
+def write_result(path, result, meta):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    extra = {}
+    if result.get('equilibrium'):
+        extra['u_eq'] = result['equilibrium']['profile']
+    np.savez(path, x=result['x'], u=result['u'], t=result['t'], meta=json.dumps(meta), **extra)
+
+def cmd_run(args, t_start):
+    resume = None
+    if args.resume:
+        # The checkpoint carries the whole job; --config is not needed
+        resume = read_checkpoint(args.resume)
+        job = resume['config']
+        print(f"resuming from step {resume['step']} (t={resume['t']:.6g} s)")
+    elif args.config:
+        job = build_job(load_config(args.config))
+    else:
+        raise ValueError("run needs --config or --resume")
+    if args.output:
+        job['output'] = args.output
+    if args.no_cache:
+        job['cache'] = False
+    sim_stats = None
+    if args.stats or args.log_every:
+        if args.log_every:
+            logging.basicConfig(level=logging.INFO, format='%(message)s')
+        sim_stats = SimStats(log_every=args.log_every)
+    t_ready = time.perf_counter()
+    result = run_job(job, sim_stats, resume)
+    # Cold start: interpreter hand-off to the first time step (imports, config, parsing, setup)
+    meta = {
+        'job': job,
+        'startup_s': t_ready - t_start + result['setup_s'],
+        'step_s': result['step_s'],
+        'stats': result['stats'],
+        'cache': result['cache'],
+    }
+    if sim_stats is not None:
+        meta['timing'] = sim_stats.summary()
+    if result['equilibrium']:
+        meta['converged'] = result['equilibrium']['converged']
+        meta['t_eq'] = result['equilibrium']['t_eq']
+    write_result(job['output'], result, meta)
+    print(f"wrote {job['output']}: {result['steps']} steps to t={result['t']:.6g} s "
+          f"(startup {meta['startup_s']:.3f} s, stepping {meta['step_s']:.3f} s)")
+    if result['equilibrium']:
+        if meta['converged']:
+            print(f"equilibrium reached at t={meta['t_eq']:.6g} s")
+        else:
+            print("equilibrium not reached within the step limit")
+    if result['cache'] and result['cache']['replayed']:
+        print(f"cache: replayed {result['cache']['replayed']} steps, computed {result['cache']['computed']}")
+    if result['stats']:
+        print("adaptive: " + ", ".join(f"{k} {v}" for k, v in result['stats'].items()))
+    if sim_stats is not None:
+        print("timing: " + sim_stats.format())
+    return 0
+
+def cmd_sweep(args, t_start):
+    cfg = load_config(args.config)
+    grid = cfg.get('grid', {})
+    run = cfg.get('run', {})
+    specs = expand_grid(cfg)
+    workers = args.workers or os.cpu_count()
+    chunk = args.chunk or default_chunk(len(specs), workers)
+    t0 = time.perf_counter()
+    rows = run_sweep(specs, workers=workers, chunk=chunk,
+                     nx=int(grid.get('nx', 101)), sigma=float(grid.get('sigma', 0.5)),
+                     steps=int(run.get('steps', 2000)),
+                     steady_tol=float(run['steady_tol']) if 'steady_tol' in run else None,
+                     precision=str(grid.get('precision', 'float64')).lower())
+    elapsed = time.perf_counter() - t0
+    output = args.output or run.get('output', 'sweep.csv')
+    write_summary(output, rows)
+    print(f"wrote {output}: {len(rows)} runs in {elapsed:.3f} s "
+          f"({workers} workers, {chunk} runs per task)")
+    return 0
+
+def cmd_fit(args, t_start):
+    # Imported here: scipy.optimize is only needed for fitting
+    import heat_fit
+    cfg = load_config(args.config)
+    rod = cfg.get('rod', {})
+    grid = cfg.get('grid', {})
+    fit_cfg = cfg.get('fit', {})
+    bc_type = str(rod.get('bc', 'neumann')).lower()
+    bc_params = None
+    if bc_type == 'dirichlet':
+        # Known end temperatures, or the starting guess when the ends are fitted too
+        bc_params = {'left': float(rod.get('left', 0.0)), 'right': float(rod.get('right', 0.0))}
+    times, probes, data = heat_fit.load_probe_csv(args.data)
+    problem = heat_fit.FitProblem(float(rod.get('length', 1.0)), str(rod.get('init', 'sin(pi * x / L)')),
+                                  probes, times, data, bc_type, bc_params, nx=int(grid.get('nx', 101)),
+                                  substeps=int(fit_cfg.get('substeps', 4)))
+    alpha_range = None
+    if 'alpha_min' in fit_cfg or 'alpha_max' in fit_cfg:
+        alpha_range = (float(fit_cfg.get('alpha_min', min(metals.values()) / 4)),
+                       float(fit_cfg.get('alpha_max', max(metals.values()) * 4)))
+    result = heat_fit.fit(problem, fit_ends=args.fit_ends or bool(fit_cfg.get('ends', False)),
+                          candidates=int(fit_cfg.get('candidates', 16)), alpha_range=alpha_range)
+    print(f"alpha = {result['alpha']:.4e} +/- {result['alpha_stderr']:.1e} m^2/s "
+          f"(closest: {result['closest_metal']}, {metals[result['closest_metal']]:.3e})")
+    if 'left_stderr' in result:
+        print(f"ends: left {result['left']:.4f} +/- {result['left_stderr']:.1e}, "
+              f"right {result['right']:.4f} +/- {result['right_stderr']:.1e}")
+    print(f"rms residual {result['rms']:.3e} over {problem.n_samples} samples; "
+          f"{result['evaluations']} forward evaluations in {result['wall_s']:.3f} s")
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(result, fh, indent=2)
+        print(f"wrote {args.output}")
+    return 0 if result['success'] else 1
+
+def cmd_verify(args, t_start):
+    # Imported here: the sweep runs every solver backend
+    import heat_verify
+    job = build_job(load_config(args.config) if args.config else {})
+    if job['segments'] is not None or job['mesh'] != 'uniform':
+        raise ValueError("The Fourier-series reference needs a uniform rod on a uniform mesh")
+    L, alpha, t_end = job['L'], job['alpha'], job['steps'] * job['dt']
+    problem = (L, alpha, job['init'], job['bc_type'], job['bc_params'], t_end)
+    sweep = {'nxs': (26, 51, 101, 201), 'steps': (10, 20, 50, 100, 200, 500, 1000),
+             'tols': (1e-2, 1e-3, 1e-4, 1e-5)} if args.quick else {}
+    points = heat_verify.work_precision(*problem, **sweep)
+    configured = heat_verify.default_point(*problem, nx=job['nx'],
+                                           sigma=alpha * job['dt'] / (L / (job['nx'] - 1))**2)
+    print(f"{'solver':<9} {'nx':>5} {'dt / tol':>10} {'error':>10} {'ms':>9}")
+    for p in points:
+        setting = f"{p['dt']:.3g}" if 'dt' in p else f"{p['tol']:.0e}" if 'tol' in p else 'exact'
+        print(f"{p['solver']:<9} {p['nx']:>5} {setting:>10} {p['error']:>10.2e} {p['seconds'] * 1e3:>9.3f}")
+    best = heat_verify.recommend(points, args.tol)
+    print(f"configured: cn nx={configured['nx']} dt={configured['dt']:.3g}: error {configured['error']:.2e} "
+          f"in {configured['seconds'] * 1e3:.2f} ms")
+    if best is None:
+        print(f"no setting reaches error {args.tol:g}; refine the sweep or relax --tol")
+    for solver in heat_verify.BACKENDS:
+        p = heat_verify.recommend([p for p in points if p['solver'] == solver], args.tol)
+        if p is not None:
+            setting = f" dt={p['dt']:.3g}" if 'dt' in p else f" tol={p['tol']:g}" if 'tol' in p else ''
+            print(f"cheapest {solver} within {args.tol:g}: nx={p['nx']}{setting}: error {p['error']:.2e} "
+                  f"in {p['seconds'] * 1e3:.2f} ms{' (fastest)' if p is best else ''}")
+    if args.plot:
+        heat_verify.plot_work_precision(points, args.plot, tol=args.tol, best=best)
+        print(f"wrote {args.plot}")
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump({'t_end': t_end, 'tol': args.tol, 'points': points, 'configured': configured,
+                       'recommended': best}, fh, indent=2)
+        print(f"wrote {args.output}")
+    return 0 if best is not None else 1
+
+def cmd_export(args, t_start):
+    # Imported here: rendering pulls in matplotlib and Pillow
+    import heat_export
+    info = heat_export.export_trajectory(args.trajectory, args.output, fps=args.fps, workers=args.workers,
+                                         chunk=args.chunk, dpi=args.dpi, every=args.every)
+    print(f"wrote {args.output}: {info['frames']} frames in {info['seconds']:.3f} s "
+          f"({info['frames'] / info['seconds']:.1f} frames/s, {info['workers']} workers)")
+    return 0
+
+def cmd_serve(args, t_start):
+    # Imported here: the service starts a process pool
+    import heat_service
+    heat_service.serve(args.host, args.port, workers=args.workers, window=args.window / 1000,
+                       max_batch=args.max_batch)
+    return 0
+
+def cmd_loadtest(args, t_start):
+    import heat_service
+    report = heat_service.load_test(args.url, requests=args.requests, concurrency=args.concurrency,
+                                    nx=args.nx, steps=args.steps, stride=args.stride)
+    print(f"{report['requests']} requests ({report['errors']} failed) in {report['wall_s']:.2f} s: "
+          f"{report['requests_per_s']:.1f} requests/s, {report['snapshots_per_s']:.0f} snapshots/s")
+    print(f"latency p50 {report['latency_p50_s'] * 1e3:.1f} ms, p99 {report['latency_p99_s'] * 1e3:.1f} ms; "
+          f"first snapshot p99 {report['first_snapshot_p99_s'] * 1e3:.1f} ms; "
+          f"{report['mean_batch']:.1f} requests per batched solve")
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(report, fh, indent=2)
+    return 1 if report['errors'] else 0
+
+def cmd_bench(args, t_start):
+    # Imported here: the benchmarks pull in matplotlib for the render loop
+    import heat_bench
+    return heat_bench.main(args)
+
+def main(argv=None, t_start=None):
+    if t_start is None:
+        t_start = time.perf_counter()
+    parser = argparse.ArgumentParser(prog='python -m heat_sim',
+                                     description="Headless 1D heat transfer runs.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_run = sub.add_parser('run', help="run one job from a TOML/JSON config")
+    p_run.add_argument('--config', help="job file (.toml or .json)")
+    p_run.add_argument('--resume', metavar='CHECKPOINT', help="continue a run from its checkpoint file")
+    p_run.add_argument('--output', help="override [run] output")
+    p_run.add_argument('--stats', action='store_true', help="time the solver phases and print a summary")
+    p_run.add_argument('--log-every', type=float, metavar='SECONDS', help="log a timing line periodically")
+    p_run.add_argument('--no-cache', action='store_true', help="neither replay nor store results in the result cache")
+    p_run.set_defaults(func=cmd_run)
+
+    p_sweep = sub.add_parser('sweep', help="run a parameter grid over a process pool")
+    p_sweep.add_argument('--config', required=True, help="sweep file (.toml or .json)")
+    p_sweep.add_argument('--output', help="override [run] output (CSV)")
+    p_sweep.add_argument('--workers', type=int, help="worker processes (default: all cores)")
+    p_sweep.add_argument('--chunk', type=int, help="runs batched into one task (default: 4 tasks per worker)")
+    p_sweep.set_defaults(func=cmd_sweep)
+
+    p_fit = sub.add_parser('fit', help="estimate alpha from measured probe temperatures")
+    p_fit.add_argument('--config', required=True, help="rod, grid and [fit] settings (.toml or .json)")
+    p_fit.add_argument('--data', required=True, help="CSV with a header t, x1, x2, ... and one row per sample")
+    p_fit.add_argument('--fit-ends', action='store_true', help="also fit the Dirichlet end temperatures")
+    p_fit.add_argument('--output', help="write the estimate as JSON")
+    p_fit.set_defaults(func=cmd_fit)
+
+    p_verify = sub.add_parser('verify', help="work-precision sweep against the exact Fourier-series solution")
+    p_verify.add_argument('--config', help="job file whose rod, init and steps x dt set the problem")
+    p_verify.add_argument('--tol', type=float, default=1e-4, help="error tolerance, relative to the initial range")
+    p_verify.add_argument('--plot', help="save the work-precision diagram (PNG)")
+    p_verify.add_argument('--output', help="write all points and the recommendation as JSON")
+    p_verify.add_argument('--quick', action='store_true', help="coarser sweep, for CI smoke runs")
+    p_verify.set_defaults(func=cmd_verify)
+
+    p_export = sub.add_parser('export', help="render a trajectory to MP4, GIF or PNG frames")
+    p_export.add_argument('trajectory', help="trajectory directory written by a run")
+    p_export.add_argument('output', help="out.mp4, out.gif, or a directory for PNG frames")
+    p_export.add_argument('--fps', type=float, default=20, help="frames per second of the video")
+    p_export.add_argument('--every', type=int, default=1, help="render every n-th snapshot")
+    p_export.add_argument('--dpi', type=int, default=100, help="resolution (the figure is 9 x 5 inches)")
+    p_export.add_argument('--workers', type=int, help="rendering processes (default: all cores)")
+    p_export.add_argument('--chunk', type=int, help="consecutive frames per task")
+    p_export.set_defaults(func=cmd_export)
+
+    p_serve = sub.add_parser('serve', help="run the local JSON simulation service")
+    p_serve.add_argument('--host', default='127.0.0.1')
+    p_serve.add_argument('--port', type=int, default=8765)
+    p_serve.add_argument('--workers', type=int, help="solver processes (default: all cores)")
+    p_serve.add_argument('--window', type=float, default=5, help="milliseconds to gather requests into a batch")
+    p_serve.add_argument('--max-batch', type=int, default=64, help="most requests solved together")
+    p_serve.set_defaults(func=cmd_serve)
+
+    p_load = sub.add_parser('loadtest', help="measure throughput and latency of a running service")
+    p_load.add_argument('--url', default='http://127.0.0.1:8765')
+    p_load.add_argument('--requests', type=int, default=200)
+    p_load.add_argument('--concurrency', type=int, default=16, help="client threads")
+    p_load.add_argument('--nx', type=int, default=101)
+    p_load.add_argument('--steps', type=int, default=2000)
+    p_load.add_argument('--stride', type=int, default=100, help="steps between streamed snapshots")
+    p_load.add_argument('--output', help="write the report as JSON")
+    p_load.set_defaults(func=cmd_loadtest)
+
+    p_bench = sub.add_parser('bench', help="time the solver kernels and the render loop")
+    p_bench.add_argument('--output', help="write results as JSON")
+    p_bench.add_argument('--baseline', help="compare against a saved JSON run; exit 1 on regressions")
+    p_bench.add_argument('--threshold', type=float, default=1.25, help="slowdown ratio counted as a regression")
+    p_bench.add_argument('--max-nx', type=int, default=10**6, help="largest grid (powers of ten from 100)")
+    p_bench.add_argument('--quick', action='store_true', help="small grids only, for CI smoke runs")
+    p_bench.set_defaults(func=cmd_bench)
+
+    args = parser.parse_args(argv)
+    try:
+        return args.func(args, t_start)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
@@ -1,6 +1,11 @@
 # heat_core.py
+import ast
+import functools
+import json
+import os
+import time
 import numpy as np
-from sympy import sympify, symbols, lambdify
+from scipy.linalg import solve_banded, get_lapack_funcs
 
 metals = {
     'copper': 1.17e-4,
@@ -11,19 +16,24 @@ metals = {
     'silver': 1.65e-4
 }
 
-def setup_matrices(nx, r, bc_type='neumann'):
+def setup_matrices(nx, r, bc_type='neumann', x=None, kappa=None):
+    if x is not None or kappa is not None:
+        # Non-uniform grid or varying alpha: expand the banded finite-volume stencil
+        return tuple(np.diag(ab[1]) + np.diag(ab[0, 1:], 1) + np.diag(ab[2, :-1], -1)
+                     for ab in setup_banded(nx, r, bc_type, x, kappa=kappa))
+
     M_imp = np.zeros((nx, nx))
     M_exp = np.zeros((nx, nx))
 
     # Interior points (common for both BC types)
-    for i in range(1, nx-1):
-        M_imp[i, i-1] = -r / 2
-        M_imp[i, i] = 1 + r
-        M_imp[i, i+1] = -r / 2
+    i = np.arange(1, nx-1)
+    M_imp[i, i-1] = -r / 2
+    M_imp[i, i] = 1 + r
+    M_imp[i, i+1] = -r / 2
 
-        M_exp[i, i-1] = r / 2
-        M_exp[i, i] = 1 - r
-        M_exp[i, i+1] = r / 2
+    M_exp[i, i-1] = r / 2
+    M_exp[i, i] = 1 - r
+    M_exp[i, i+1] = r / 2
 
     if bc_type == 'neumann':
         # Insulated (zero-flux) boundaries
@@ -51,15 +61,668 @@ def setup_matrices(nx, r, bc_type='neumann'):
 def compute_next_u(u, M_imp, M_exp):
     return np.linalg.solve(M_imp, M_exp @ u)
 
-def parse_initial_condition(init_expr, L):
+def setup_banded(nx, r, bc_type='neumann', x=None, theta=0.5, kappa=None):
+    """Banded (3, nx) form of setup_matrices: rows are upper, main and lower diagonal.
+
+    With node positions x the stencil is the finite-volume one for a non-uniform
+    grid: each node owns the half-cells on either side and exchanges flux through
+    its two faces. r keeps its meaning for the mean spacing (x[-1] - x[0]) / (nx - 1),
+    and a uniform x reproduces the uniform-grid matrices up to round-off.
+    kappa (nx - 1 values) scales the diffusivity of each cell between neighbouring
+    nodes relative to the alpha in r, for rods whose alpha varies along x (see
+    face_diffusivity). theta = 0.5 is Crank-Nicolson; theta = 1 gives backward
+    Euler, which damps the stiff modes of a sharp start (use it with r halved for
+    Rannacher steps).
+    """
+    if x is None:
+        h = 1.0
+        V = np.ones(nx)
+        V[0] = V[-1] = 0.5
+    else:
+        x = np.asarray(x, dtype=float)
+        if len(x) != nx or np.any(np.diff(x) <= 0):
+            raise ValueError("x must hold nx strictly increasing positions")
+        h = np.diff(x) / ((x[-1] - x[0]) / (nx - 1))
+        # Control-volume widths; the end nodes own half a cell
+        V = np.empty(nx)
+        V[1:-1] = (h[:-1] + h[1:]) / 2
+        V[0] = h[0] / 2
+        V[-1] = h[-1] / 2
+    g = r / h
+    if kappa is not None:
+        kappa = np.asarray(kappa, dtype=float)
+        if kappa.shape != (nx - 1,) or np.any(kappa <= 0):
+            raise ValueError("kappa must hold nx - 1 positive values")
+        g = g * kappa
+
+    # Fill the coupling coefficients straight into the diagonals, then scale by theta
+    ab_exp = np.empty((3, nx))
+    upper, diag, lower = ab_exp[0, 1:], ab_exp[1], ab_exp[2, :-1]
+    ab_exp[0, 0] = ab_exp[2, -1] = 0
+    np.divide(g, V[:-1], out=upper)
+    np.divide(g, V[1:], out=lower)
+    diag[:-1] = upper
+    diag[-1] = 0
+    diag[1:] += lower
+    ab_imp = ab_exp * -theta
+    ab_imp[1] = 1 - ab_imp[1]
+    ab_exp *= 1 - theta
+    ab_exp[1] = 1 - ab_exp[1]
+
+    if bc_type == 'neumann':
+        # Insulated (zero-flux) boundaries: no flux through the outer faces
+        pass
+    elif bc_type == 'dirichlet':
+        # Fixed temperature boundaries
+        for ab in (ab_imp, ab_exp):
+            ab[1, 0] = ab[1, -1] = 1
+            ab[0, 1] = 0
+            ab[2, -2] = 0
+    else:
+        raise ValueError("Unsupported boundary condition type")
+
+    return ab_imp, ab_exp
+
+def banded_matvec(ab, u):
+    # Three-point stencil: the explicit half of Crank-Nicolson without a dense matrix
+    out = ab[1] * u
+    out[:-1] += ab[0, 1:] * u[1:]
+    out[1:] += ab[2, :-1] * u[:-1]
+    return out
+
+def compute_next_u_banded(u, ab_imp, ab_exp):
+    return solve_banded((1, 1), ab_imp, banded_matvec(ab_exp, u), check_finite=False)
+
+# State dtype and elimination dtype of each precision mode. 'mixed' stores
+# states (and snapshots) in float32 but runs the tridiagonal solve in float64.
+PRECISIONS = {
+    'float64': (np.float64, np.float64),
+    'float32': (np.float32, np.float32),
+    'mixed': (np.float32, np.float64),
+}
+
+def precision_dtypes(precision):
+    """(state dtype, solve dtype) for a precision name."""
+    try:
+        return PRECISIONS[precision]
+    except KeyError:
+        raise ValueError(f"precision must be one of: {', '.join(PRECISIONS)}") from None
+
+class Stepper:
+    """Crank-Nicolson stepper: factors M_imp once and advances u in place.
+
+    precision ('float64', 'float32' or 'mixed', see PRECISIONS) sets the dtype
+    of new states and of the factorization.
+    """
+
+    def __init__(self, nx, r, bc_type='neumann', bc_params=None, x=None, theta=0.5, kappa=None,
+                 precision='float64'):
+        ab_imp, ab_exp = setup_banded(nx, r, bc_type, x, theta, kappa)
+        pinned_index = pinned_value = None
+        if bc_type == 'dirichlet':
+            if bc_params is None:
+                bc_params = {'left': 0, 'right': 0}
+            pinned_index = [0, nx - 1]
+            pinned_value = [bc_params['left'], bc_params['right']]
+        self._setup(ab_imp, ab_exp, pinned_index, pinned_value, precision)
+
+    @classmethod
+    def from_banded(cls, ab_imp, ab_exp, pinned_index=None, pinned_value=None, precision='float64'):
+        """Build a stepper from prepared diagonals; pinned nodes are held at fixed values."""
+        stepper = cls.__new__(cls)
+        stepper._setup(ab_imp, ab_exp, pinned_index, pinned_value, precision)
+        return stepper
+
+    def _setup(self, ab_imp, ab_exp, pinned_index, pinned_value, precision='float64'):
+        self.nx = ab_imp.shape[1]
+        self.precision = precision
+        state_dtype, solve_dtype = precision_dtypes(precision)
+        self.dtype = np.dtype(state_dtype)
+        ab_imp = ab_imp.astype(solve_dtype, copy=False)
+        ab_exp = ab_exp.astype(solve_dtype, copy=False)
+        gttrf, self._gttrs = get_lapack_funcs(('gttrf', 'gttrs'), (ab_imp,))
+        *self._lu, info = gttrf(ab_imp[2, :-1], ab_imp[1], ab_imp[0, 1:])
+        if info != 0:
+            raise np.linalg.LinAlgError("Implicit matrix is singular")
+
+        self._upper = np.ascontiguousarray(ab_exp[0, 1:])
+        self._diag = np.ascontiguousarray(ab_exp[1])
+        self._lower = np.ascontiguousarray(ab_exp[2, :-1])
+
+        if pinned_index is None:
+            self._pinned_index = None
+        else:
+            self._pinned_index = np.asarray(pinned_index, dtype=np.intp)
+            self._pinned_value = np.asarray(pinned_value, dtype=float)
+
+        # Work buffers reused by every step
+        self._rhs = np.empty(self.nx, dtype=solve_dtype)
+        self._tmp = np.empty(self.nx - 1, dtype=solve_dtype)
+        # Optional heat_stats.SimStats; when set, every step is timed per phase
+        self.stats = None
+
+    def advance(self, u, n_steps, out=None):
+        """Run n_steps from u into out (allocated if None; may be u itself)."""
+        if out is None:
+            out = np.array(u, dtype=self.dtype)
+        elif out is not u:
+            out[...] = u
+        if self.stats is None:
+            for _ in range(n_steps):
+                self._step(out)
+        else:
+            for _ in range(n_steps):
+                self._step_timed(out)
+            self.stats.add_steps(n_steps)
+        return out
+
+    def _step(self, u):
+        self._explicit(u)
+        self._pin(self._rhs)
+        self._solve(u)
+        self._pin(u)
+
+    def _step_timed(self, u):
+        clock = time.perf_counter
+        t0 = clock()
+        self._explicit(u)
+        t1 = clock()
+        self._pin(self._rhs)
+        t2 = clock()
+        self._solve(u)
+        t3 = clock()
+        self._pin(u)
+        t4 = clock()
+        self.stats.add('stencil', t1 - t0)
+        self.stats.add('solve', t3 - t2)
+        self.stats.add('boundary', (t2 - t1) + (t4 - t3))
+
+    def _explicit(self, u):
+        rhs, tmp = self._rhs, self._tmp
+        np.multiply(self._diag, u, out=rhs)
+        np.multiply(self._upper, u[1:], out=tmp)
+        rhs[:-1] += tmp
+        np.multiply(self._lower, u[:-1], out=tmp)
+        rhs[1:] += tmp
+
+    def _solve(self, u):
+        self._gttrs(*self._lu, self._rhs, overwrite_b=1)
+        u[...] = self._rhs
+
+    def _pin(self, v):
+        # Pivoting may perturb identity rows by an ulp, so this runs after the solve too
+        if self._pinned_index is not None:
+            v[self._pinned_index] = self._pinned_value
+
+class Ensemble:
+    """Many independent rods on nx-node grids, advanced together by one batched solve.
+
+    The members' tridiagonal systems are laid end to end as a single block-diagonal
+    system, so every step is one stencil pass and one LAPACK solve over batch * nx
+    unknowns. alpha, L and dt broadcast over the batch; bc_type and bc_params may be
+    given once or per member. precision follows Stepper.
+    """
+
+    def __init__(self, nx, alpha, L, bc_type='neumann', bc_params=None, dt=None, sigma=0.5,
+                 precision='float64'):
+        alpha = np.atleast_1d(np.asarray(alpha, dtype=float))
+        L = np.atleast_1d(np.asarray(L, dtype=float))
+        batch = max(alpha.size, L.size)
+        if isinstance(bc_type, str):
+            bc_type = [bc_type] * batch
+        if bc_params is None or isinstance(bc_params, dict):
+            bc_params = [bc_params] * batch
+        batch = max(batch, len(bc_type), len(bc_params))
+        if len(bc_type) != batch or len(bc_params) != batch:
+            raise ValueError("bc_type and bc_params must match the ensemble size")
+
+        self.nx = nx
+        self.batch = batch
+        self.alpha = np.broadcast_to(alpha, (batch,)).copy()
+        self.L = np.broadcast_to(L, (batch,)).copy()
+        self.bc_type = list(bc_type)
+        self.bc_params = []
+        for bc, params in zip(self.bc_type, bc_params):
+            if bc == 'dirichlet' and params is None:
+                params = {'left': 0, 'right': 0}
+            self.bc_params.append(params)
+        self.dx = self.L / (nx - 1)
+        if dt is None:
+            dt = sigma * self.dx**2 / self.alpha
+        self.dt = np.broadcast_to(np.asarray(dt, dtype=float), (batch,)).copy()
+        self.r = self.alpha * self.dt / self.dx**2
+
+        # Members sharing (r, bc_type) share their diagonals
+        blocks = {}
+        imp, exp = [], []
+        pinned_index, pinned_value = [], []
+        for m in range(batch):
+            key = (self.r[m], self.bc_type[m])
+            if key not in blocks:
+                blocks[key] = setup_banded(nx, *key)
+            imp.append(blocks[key][0])
+            exp.append(blocks[key][1])
+            if self.bc_type[m] == 'dirichlet':
+                pinned_index += [m * nx, m * nx + nx - 1]
+                pinned_value += [self.bc_params[m]['left'], self.bc_params[m]['right']]
+        # setup_banded leaves the corner entries zero, so the blocks never couple
+        self._stepper = Stepper.from_banded(np.concatenate(imp, axis=1), np.concatenate(exp, axis=1),
+                                            pinned_index or None, pinned_value or None, precision)
+        self.precision = precision
+        self.dtype = self._stepper.dtype
+
+    @property
+    def x(self):
+        return self.L[:, None] * np.linspace(0, 1, self.nx)
+
+    @property
+    def stats(self):
+        return self._stepper.stats
+
+    @stats.setter
+    def stats(self, value):
+        self._stepper.stats = value
+
+    def subset(self, members):
+        """A new ensemble holding only the given members, with their dt unchanged."""
+        members = np.asarray(members, dtype=np.intp)
+        ensemble = Ensemble(self.nx, self.alpha[members], self.L[members],
+                            [self.bc_type[m] for m in members], [self.bc_params[m] for m in members],
+                            dt=self.dt[members], precision=self.precision)
+        ensemble.stats = self.stats
+        return ensemble
+
+    def run_to_steady_state(self, u, tol=1e-4, check_every=10, max_steps=10**6):
+        """Advance every member until it reaches equilibrium (see run_to_steady_state).
+
+        Converged members are dropped from the system as soon as they settle, so
+        the remaining ones run on a smaller solve. Returns per-member arrays:
+        converged, t_eq (NaN if not converged), steps, u and the exact steady profile.
+        """
+        u = np.array(u, dtype=self.dtype)
+        x = self.x
+        steady = np.stack([steady_state(x[m], u[m], self.bc_type[m], self.bc_params[m])
+                           for m in range(self.batch)])
+        spread = np.maximum(np.ptp(u, axis=1), 1e-12)
+        time_scale = self.L**2 / self.alpha
+        t_eq = np.full(self.batch, np.nan)
+        steps = np.zeros(self.batch, dtype=int)
+
+        active = np.arange(self.batch)
+        ensemble = self
+        state = u.copy()
+        done = 0
+        while active.size and done < max_steps:
+            k = min(check_every, max_steps - done)
+            prev = state.copy()
+            ensemble.advance(state, k, out=state)
+            done += k
+            settled = settling_rate(state, prev, k * ensemble.dt, time_scale[active], spread[active]) <= tol
+            if settled.any():
+                members = active[settled]
+                u[members] = state[settled]
+                t_eq[members] = done * self.dt[members]
+                steps[members] = done
+                active = active[~settled]
+                state = state[~settled]
+                if active.size:
+                    ensemble = self.subset(active)
+        u[active] = state
+        steps[active] = done
+        return {'converged': np.isfinite(t_eq), 't_eq': t_eq, 'steps': steps, 'u': u, 'steady': steady}
+
+    def advance(self, u, n_steps, out=None):
+        """Run n_steps on the (batch, nx) state u; out follows Stepper.advance."""
+        if out is None:
+            out = np.array(u, dtype=self.dtype)
+        elif out is not u:
+            out[...] = u
+        if out.shape != (self.batch, self.nx) or not out.flags.c_contiguous:
+            raise ValueError("Ensemble state must be a C-contiguous (batch, nx) array")
+        flat = out.reshape(-1)
+        self._stepper.advance(flat, n_steps, out=flat)
+        return out
+
+class AdaptiveStepper:
+    """Crank-Nicolson with step-doubling error control.
+
+    Each trial compares one step of dt with two steps of dt/2 and accepts the
+    latter when their difference, scaled by tol * max(1, |u|), is small enough.
+    dt moves on the ladder dt0 * 2**k, so every rung is factored once and reused
+    whenever the controller comes back to it. stats counts accepted and rejected
+    steps, tridiagonal solves and factorizations.
+    """
+
+    def __init__(self, nx, dx, alpha, bc_type='neumann', bc_params=None, tol=1e-4, dt0=None, max_dt=None):
+        self.nx = nx
+        self.dx = dx
+        self.alpha = alpha
+        self.bc_type = bc_type
+        self.bc_params = bc_params
+        self.tol = tol
+        # Start from the old fixed sigma = 0.5 step and let the controller grow it
+        self.dt0 = 0.5 * dx**2 / alpha if dt0 is None else dt0
+        self.max_dt = np.inf if max_dt is None else max_dt
+        self.level = 0
+        self._steppers = {}
+        self._full = np.empty(nx)
+        self._half = np.empty(nx)
+        self.stats = {'steps': 0, 'rejected': 0, 'solves': 0, 'factorizations': 0}
+
+    def _stepper(self, dt, cache=True):
+        stepper = self._steppers.get(dt)
+        if stepper is None:
+            stepper = Stepper(self.nx, self.alpha * dt / self.dx**2, self.bc_type, self.bc_params)
+            self.stats['factorizations'] += 1
+            if cache:
+                self._steppers[dt] = stepper
+        return stepper
+
+    def integrate(self, u, t_end, out=None, t0=0.0):
+        """Advance u from t0 to t_end; out follows Stepper.advance."""
+        if out is None:
+            out = np.array(u, dtype=float)
+        elif out is not u:
+            out[...] = u
+        full, half = self._full, self._half
+        t = t0
+        while t < t_end:
+            dt = self.dt0 * 2.0**self.level
+            last = t + dt >= t_end
+            if last:
+                # Land exactly on t_end; the odd-sized step is not worth caching
+                dt = t_end - t
+            self._stepper(dt, cache=not last).advance(out, 1, out=full)
+            self._stepper(dt / 2, cache=not last).advance(out, 2, out=half)
+            self.stats['solves'] += 3
+
+            # CN is second order, so the half-step error is about (half - full) / 3
+            err = np.max(np.abs(half - full)) / 3 / (self.tol * max(1.0, np.max(np.abs(half))))
+            if err <= 1:
+                out[...] = half
+                t = t_end if last else t + dt
+                self.stats['steps'] += 1
+                # Local error scales as dt^3: 8x headroom buys one doubling
+                grow = int(np.log2(0.9 / max(err, 1e-12)) // 3)
+                while grow > 0 and self.dt0 * 2.0**(self.level + 1) <= self.max_dt:
+                    self.level += 1
+                    grow -= 1
+                if grow < 0 and not last:
+                    self.level -= 1
+            else:
+                self.stats['rejected'] += 1
+                self.level -= max(1, int(np.ceil(np.log2(err) / 3)))
+        return out
+
+def steady_state(x, u0, bc_type='neumann', bc_params=None, alpha=None):
+    """Exact equilibrium reached from u0.
+
+    Neumann: the mean temperature. The discrete scheme conserves the trapezoidal
+    integral of u, so this is also exactly what the stepper converges to.
+    Dirichlet: the straight line between the two end temperatures; for a
+    composite rod (alpha as in face_diffusivity) the line is straight in the
+    accumulated resistance dx / alpha instead, so the flux is the same everywhere.
+    """
+    x = np.asarray(x, dtype=float)
+    if bc_type == 'neumann':
+        return np.full_like(x, np.trapezoid(u0, x) / (x[-1] - x[0]))
+    if bc_type == 'dirichlet':
+        if bc_params is None:
+            bc_params = {'left': 0, 'right': 0}
+        left, right = bc_params['left'], bc_params['right']
+        if alpha is None:
+            return left + (right - left) * (x - x[0]) / (x[-1] - x[0])
+        resistance = np.concatenate([[0], np.cumsum(np.diff(x) / face_diffusivity(x, alpha))])
+        return left + (right - left) * resistance / resistance[-1]
+    raise ValueError("Unsupported boundary condition type")
+
+def settling_rate(u, prev, elapsed, time_scale, spread):
+    """max|u - prev| / elapsed in units of spread / time_scale, per row of u."""
+    return np.max(np.abs(u - prev), axis=-1) / elapsed * time_scale / spread
+
+def run_to_steady_state(advance, u, dt, time_scale, tol=1e-4, check_every=10, max_steps=10**6, writer=None,
+                        start=0, spread=None, on_check=None):
+    """Step with advance(u, k) until the rod is at equilibrium, or max_steps.
+
+    Every check_every steps the change per unit time, max|du/dt|, is compared
+    with tol * (initial spread of u) / time_scale; time_scale is the diffusion
+    time L**2 / alpha. A writer, if given, gets the initial state and every check.
+    To resume, pass the steps already done as start and the original spread.
+    on_check(done, u) runs after every check that did not converge.
+    Returns converged, t_eq (None if not converged), steps and the final u.
+    """
+    u = np.array(u)
+    prev = np.empty_like(u)
+    if spread is None:
+        spread = max(np.ptp(u), 1e-12)
+    if writer is not None and start == 0:
+        writer.append(0.0, u)
+    done = start
+    converged = False
+    while done < max_steps:
+        k = min(check_every, max_steps - done)
+        prev[...] = u
+        u = advance(u, k)
+        done += k
+        if writer is not None:
+            writer.append(done * dt, u)
+        if settling_rate(u, prev, k * dt, time_scale, spread) <= tol:
+            converged = True
+            break
+        if on_check is not None:
+            on_check(done, u)
+    return {'converged': converged, 't_eq': done * dt if converged else None, 'steps': done, 'u': u,
+            'spread': spread}
+
+def make_solver(nx, r, bc_type='neumann', bc_params=None, solver='banded', kappa=None, precision='float64'):
+    """Return advance(u, n_steps) for the chosen solver (precision applies to 'banded')."""
+    if solver == 'banded':
+        stepper = Stepper(nx, r, bc_type, bc_params, kappa=kappa, precision=precision)
+        return lambda u, n_steps: stepper.advance(u, n_steps, out=u)
+    if solver == 'dense':
+        # The original O(n^3) path, kept as a reference
+        M_imp, M_exp = setup_matrices(nx, r, bc_type, kappa=kappa)
+        if bc_type == 'dirichlet' and bc_params is None:
+            bc_params = {'left': 0, 'right': 0}
+
+        def advance(u, n_steps):
+            for _ in range(n_steps):
+                u = compute_next_u(u, M_imp, M_exp)
+                if bc_type == 'dirichlet':
+                    u[0] = bc_params['left']
+                    u[-1] = bc_params['right']
+            return u
+        return advance
+    raise ValueError("Unsupported solver")
+
+def resolve_segments(segments):
+    """(alpha, length) pairs from (metal name or alpha, length) pairs."""
+    resolved = []
+    for material, length in segments:
+        if isinstance(material, str):
+            alpha = metals.get(material.lower())
+            if alpha is None:
+                raise ValueError(f"Unknown metal '{material}'. Choose one of: {', '.join(metals)}")
+        else:
+            alpha = float(material)
+        if alpha <= 0 or float(length) <= 0:
+            raise ValueError("Segment diffusivities and lengths must be positive.")
+        resolved.append((alpha, float(length)))
+    return resolved
+
+def face_diffusivity(x, alpha):
+    """Effective alpha of every cell [x[i], x[i+1]] of a rod.
+
+    alpha is a number, a function alpha(x), or a list of (metal or alpha, length)
+    segments laid end to end from x[0]. Each cell gets its series (harmonic)
+    mean, the length of the cell over its integrated resistance dx / alpha, so
+    the flux leaving one material is exactly the flux entering the next. For
+    segments the resistance is integrated exactly, for a function by Simpson's
+    rule.
+    """
+    x = np.asarray(x, dtype=float)
+    h = np.diff(x)
+    if callable(alpha):
+        ends = np.broadcast_to(alpha(x), x.shape)
+        mid = np.broadcast_to(alpha((x[:-1] + x[1:]) / 2), h.shape)
+        return 6 / (1 / ends[:-1] + 4 / mid + 1 / ends[1:])
+    if np.ndim(alpha) == 0:
+        return np.full(len(h), float(alpha))
+    segments = resolve_segments(alpha)
+    lengths = np.array([length for _, length in segments])
+    if not np.isclose(lengths.sum(), x[-1] - x[0]):
+        raise ValueError(f"Segment lengths add up to {lengths.sum():g}, not the rod length {x[-1] - x[0]:g}")
+    knots = x[0] + np.concatenate([[0], np.cumsum(lengths)])
+    knots[-1] = x[-1]
+    # Resistance R(x) = integral of 1/alpha is piecewise linear, so interpolation is exact
+    resistance = np.concatenate([[0], np.cumsum(lengths / [a for a, _ in segments])])
+    return h / np.diff(np.interp(x, knots, resistance))
+
+def cache_setting(name, default):
+    """Path from environment variable name (None if set to 'off'), else default under the user cache directory."""
+    setting = os.environ.get(name)
+    if setting is not None:
+        return None if setting.lower() in ('', '0', 'off', 'none') else setting
+    root = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(root, 'heat_sim', default)
+
+def expression_cache_path():
+    """JSON file that keeps compiled initial conditions across launches, or None.
+
+    HEAT_SIM_EXPR_CACHE overrides the location; set it to 'off' to disable.
+    """
+    return cache_setting('HEAT_SIM_EXPR_CACHE', 'expressions.json')
+
+# Entries kept in the on-disk file; the oldest go first
+EXPR_DISK_ENTRIES = 1024
+
+def _read_expression_cache(path):
+    try:
+        with open(path) as fh:
+            entries = json.load(fh)
+        return entries if isinstance(entries, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def _write_expression_cache(path, key, source):
+    entries = _read_expression_cache(path)
+    entries.pop(key, None)
+    entries[key] = source
+    for old in list(entries)[:max(0, len(entries) - EXPR_DISK_ENTRIES)]:
+        del entries[old]
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as fh:
+            json.dump(entries, fh)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # a read-only cache only costs the next launch a sympy parse
+
+# Non-ufunc callables that expression sources may use besides NumPy and scipy.special ufuncs
+_EXPR_CALLABLES = {'select': np.select, 'where': np.where, 'sinc': np.sinc, 'reduce': functools.reduce}
+_EXPR_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.Call, ast.keyword,
+               ast.Name, ast.Load, ast.Constant, ast.List, ast.Tuple, ast.operator, ast.unaryop, ast.boolop,
+               ast.cmpop)
+
+def _expression_object(name):
+    """What name means in an expression source, or None if it is not allowed there."""
+    if name in _EXPR_CALLABLES:
+        return _EXPR_CALLABLES[name]
+    value = getattr(np, name, None)
+    if value is None:
+        import scipy.special
+        value = getattr(scipy.special, name, None)
+    return value if isinstance(value, (np.ufunc, float)) else None
+
+def _checked_expression(source):
+    """(code, namespace) for a NumPy expression source in x, or None if it is anything else.
+
+    Sources read back from disk are only run if they are plain arithmetic and
+    calls on whitelisted NumPy/scipy.special names; no attributes, subscripts
+    or other statements.
+    """
+    try:
+        tree = ast.parse(source, mode='eval')
+    except (SyntaxError, ValueError):
+        return None
+    namespace = {'__builtins__': {}}
+    for node in ast.walk(tree):
+        if not isinstance(node, _EXPR_NODES):
+            return None
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float, complex, bool)):
+            return None
+        if isinstance(node, ast.Name) and node.id != 'x':
+            value = _expression_object(node.id)
+            if value is None:
+                return None
+            namespace[node.id] = value
+    return compile(tree, '<initial condition>', 'eval'), namespace
+
+def _expression_source(init_expr, L):
+    """(NumPy source or None, lambdified function) for the expression with L substituted.
+
+    The source is only returned when it rebuilds exactly the function
+    lambdify made, so it can be cached on disk; otherwise the function is
+    used as it is. Expressions that fail on an array raise ValueError here,
+    before any window or request depends on them.
+    """
+    # sympy is slow to import, so only pay for it when an expression is parsed
+    import inspect
+    from sympy import sympify, symbols, lambdify
     x_sym, L_sym = symbols('x L')
     expr = sympify(init_expr)
     expr = expr.subs(L_sym, L)
-    f = lambdify(x_sym, expr, 'numpy')
-    return f
+    f = lambdify(x_sym, expr, ['numpy', 'scipy'])
+    try:
+        np.broadcast_to(f(np.linspace(0, L, 5)), (5,)).astype(float)
+    except Exception as e:
+        raise ValueError(f"'{init_expr}' cannot be evaluated on the grid: {e}") from e
+    lines = inspect.getsource(f).strip().splitlines()
+    source = None
+    if len(lines) == 2 and lines[1].strip().startswith('return '):
+        source = lines[1].strip()[len('return '):]
+        checked = _checked_expression(source)
+        if checked is None or any(f.__globals__.get(name) is not value
+                                  for name, value in checked[1].items() if name != '__builtins__'):
+            source = None
+    return source, f
+
+def _broadcasting(f, init_expr, L):
+    # Constant expressions ("50") evaluate to a scalar; always hand back one value per node
+    g = lambda x: np.broadcast_to(f(x), np.shape(x))
+    # What it was compiled from, so results computed with it can be cached by value
+    g.source = (init_expr, L)
+    return g
+
+@functools.lru_cache(maxsize=128)
+def _compile_expression(init_expr, L):
+    path = expression_cache_path()
+    key = f"{init_expr}|{L!r}"
+    source = _read_expression_cache(path).get(key) if path else None
+    # Anything in the file that is not a plain NumPy expression counts as a miss
+    checked = _checked_expression(source) if isinstance(source, str) else None
+    if checked is None:
+        source, f = _expression_source(init_expr, L)
+        if source is not None and path:
+            _write_expression_cache(path, key, source)
+        return _broadcasting(f, init_expr, L)
+    code, namespace = checked
+    return _broadcasting(lambda x: eval(code, namespace, {'x': x}), init_expr, L)
+
+def parse_initial_condition(init_expr, L):
+    """Vectorised f(x) for an expression in x and L.
+
+    Compiled functions are memoised on (expression, L) and their NumPy source
+    is kept on disk (see expression_cache_path), so repeated parses and
+    repeated launches skip sympy. f(x) always has the shape of x, and
+    f.source is the (expression, L) pair it was compiled from.
+    """
+    return _compile_expression(str(init_expr), float(L))
 
-def initialize_u(x, f, bc_type='neumann', bc_params=None):
-    u = f(x)
+def initialize_u(x, f, bc_type='neumann', bc_params=None, dtype=float):
+    # Copy: f may hand back x itself (e.g. "x"), and the steppers work in place
+    u = np.array(f(x), dtype=dtype)
     if bc_type == 'dirichlet':
         if bc_params is None:
             bc_params = {'left': 0, 'right': 0}
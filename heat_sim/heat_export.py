@@ -0,0 +1,242 @@
+# heat_export.py
+# Offline rendering of a recorded trajectory to MP4, GIF or numbered PNG frames.
+# Rasterizing runs on the Agg canvas without a window: each worker process sets
+# up one figure, draws its static parts once and then only redraws the line and
+# the clock for a contiguous chunk of frames. Chunks come back in order and go
+# straight to the encoder, with only a few in flight at a time.
+import io
+import os
+import shutil
+import subprocess
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from matplotlib import cm
+from matplotlib.colors import Normalize
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from PIL import Image
+from heat_io import open_trajectory
+from heat_plot import RodLine
+
+def export_format(output):
+    """'mp4', 'gif' or 'png' (a directory of frames) from the output name."""
+    ext = os.path.splitext(output)[1].lower()
+    if ext in ('.mp4', '.gif'):
+        return ext[1:]
+    if ext:
+        raise ValueError("Export to .mp4, .gif or a directory of PNG frames")
+    return 'png'
+
+def value_range(u, rows=256):
+    """(min, max) over all frames, read a block of rows at a time."""
+    lo, hi = np.inf, -np.inf
+    for i in range(0, len(u), rows):
+        block = np.asarray(u[i:i + rows])
+        lo, hi = min(lo, np.nanmin(block)), max(hi, np.nanmax(block))
+    return float(lo), float(hi)
+
+class FrameRenderer:
+    """Draws frames of a trajectory into an RGB array, off screen.
+
+    The axes, labels and colourbar are rendered once and kept as a background;
+    a frame restores it and draws only the rod and its time stamp.
+    """
+
+    def __init__(self, path, limits, dpi=100, figsize=(9, 5)):
+        self.t, self.u, meta = open_trajectory(path)
+        if self.u.ndim != 2:
+            raise ValueError("Only single-rod trajectories can be exported")
+        x = np.asarray(meta['x'])
+        job = meta.get('job', meta)
+        lo, hi = limits
+        self.fig = Figure(figsize=figsize, dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.fig)
+        ax = self.ax = self.fig.add_subplot()
+        ax.set_xlim(x[0], x[-1])
+        ax.set_ylim(lo - 1, hi + 1)
+        ax.set_xlabel('Position (x)')
+        ax.set_ylabel('Temperature (u(x,t))')
+        ax.set_title(f"Heat Distribution Over Time ({str(job.get('bc_type', 'neumann')).capitalize()})")
+        self.line = RodLine(ax, x, self.u[0], cmap=cm.jet, norm=Normalize(lo, hi), linewidth=3)
+        self.line.lc.set_animated(True)
+        self.fig.colorbar(self.line.lc, ax=ax, pad=0.1).set_label('Temperature')
+        self.status = ax.text(0.99, 0.02, '', transform=ax.transAxes, ha='right', va='bottom', fontsize=8,
+                              color='#455A64', animated=True)
+        self.fig.tight_layout()
+        self.canvas.draw()
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+
+    @property
+    def size(self):
+        """(width, height) in pixels."""
+        return self.canvas.get_width_height()
+
+    def render(self, index):
+        """RGB pixels of frame index; a view that the next call overwrites."""
+        self.canvas.restore_region(self._background)
+        self.line.update(self.u[index])
+        self.status.set_text(f't = {self.t[index]:.4g} s')
+        self.ax.draw_artist(self.line.lc)
+        self.ax.draw_artist(self.status)
+        return np.asarray(self.canvas.buffer_rgba())[..., :3]
+
+def make_palette(renderer, colors=256):
+    """Shared GIF palette: the first frame plus the full colormap, median-cut."""
+    frame = renderer.render(0)
+    strip = (cm.jet(np.linspace(0, 1, frame.shape[1]))[:, :3] * 255).astype(np.uint8)
+    sample = np.concatenate([frame, np.broadcast_to(strip, (16,) + strip.shape)])
+    return Image.fromarray(sample).quantize(colors, method=Image.Quantize.MEDIANCUT)
+
+def _gif_blocks(data):
+    """(header up to the global colour table, image block) of a one-frame GIF."""
+    flags = data[10]
+    pos = 13 + (3 << ((flags & 7) + 1) if flags & 0x80 else 0)
+    head, image = data[:pos], None
+    while data[pos] != 0x3B:
+        start = pos
+        if data[pos] == 0x21:
+            pos += 2
+        else:
+            local = data[pos + 9]
+            pos += 10 + (3 << ((local & 7) + 1) if local & 0x80 else 0) + 1
+        # Data sub-blocks run until a zero length byte
+        while data[pos]:
+            pos += data[pos] + 1
+        pos += 1
+        if data[start] == 0x2C:
+            image = data[start:pos]
+    return head, image
+
+def gif_frame(rgb, palette):
+    """Encoded image block of one frame, quantized to the shared palette."""
+    buf = io.BytesIO()
+    Image.fromarray(rgb).quantize(palette=palette, dither=Image.Dither.NONE).save(buf, 'GIF', optimize=False)
+    return _gif_blocks(buf.getvalue())
+
+class GifWriter:
+    """Animated GIF written frame by frame from pre-encoded image blocks."""
+
+    def __init__(self, path, head, fps):
+        self._fh = open(path, 'wb')
+        # Delay in hundredths of a second; loop forever
+        self._control = b'\x21\xf9\x04\x04' + max(2, round(100 / fps)).to_bytes(2, 'little') + b'\x00\x00'
+        self._fh.write(b'GIF89a' + head[6:] + b'\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00')
+
+    def write(self, blocks):
+        for image in blocks:
+            self._fh.write(self._control + image)
+
+    def close(self):
+        self._fh.write(b'\x3b')
+        self._fh.close()
+
+class Mp4Writer:
+    """H.264 through an ffmpeg subprocess fed raw RGB frames on stdin."""
+
+    def __init__(self, path, size, fps):
+        ffmpeg = shutil.which('ffmpeg')
+        if ffmpeg is None:
+            raise ValueError("MP4 export needs ffmpeg on the PATH; export a .gif or PNG frames instead")
+        width, height = size
+        self._proc = subprocess.Popen(
+            [ffmpeg, '-y', '-loglevel', 'error', '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+             '-s', f'{width}x{height}', '-r', str(fps), '-i', '-',
+             # yuv420p wants even dimensions
+             '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-c:v', 'libx264', '-pix_fmt', 'yuv420p', path],
+            stdin=subprocess.PIPE)
+
+    def write(self, blocks):
+        for frame in blocks:
+            self._proc.stdin.write(frame)
+
+    def close(self):
+        self._proc.stdin.close()
+        if self._proc.wait():
+            raise OSError(f"ffmpeg exited with status {self._proc.returncode}")
+
+class PngWriter:
+    """Frames are written by the workers themselves; nothing left to do here."""
+
+    def write(self, blocks):
+        pass
+
+    def close(self):
+        pass
+
+# Per-process renderer, set up once by _init_worker
+_worker = None
+
+def _init_worker(path, limits, dpi, fmt, palette, output):
+    global _worker
+    renderer = FrameRenderer(path, limits, dpi)
+    if palette is not None:
+        image = Image.new('P', (1, 1))
+        image.putpalette(palette)
+        palette = image
+    _worker = (renderer, fmt, palette, output)
+
+def _render_chunk(indices):
+    """Render the frames of one chunk into what its writer takes."""
+    renderer, fmt, palette, output = _worker
+    blocks = []
+    for i in indices:
+        rgb = renderer.render(i)
+        if fmt == 'gif':
+            blocks.append(gif_frame(rgb, palette)[1])
+        elif fmt == 'mp4':
+            blocks.append(rgb.tobytes())
+        else:
+            Image.fromarray(rgb).save(os.path.join(output, f'frame_{i:05d}.png'))
+    return blocks
+
+def export_trajectory(path, output, fps=20, workers=None, chunk=None, dpi=100, every=1):
+    """Render the trajectory directory path to output (.mp4, .gif or a PNG frame directory).
+
+    every keeps one snapshot in every; frames are split into contiguous
+    chunks (chunk frames each, by default about four per worker) rendered by
+    a pool of workers processes (all cores by default, 1 renders in this
+    process). Returns {'frames', 'seconds', 'workers', 'format'}.
+    """
+    t0 = time.perf_counter()
+    fmt = export_format(output)
+    t, u, _ = open_trajectory(path)
+    indices = list(range(0, len(t), max(1, every)))
+    if not indices:
+        raise ValueError(f"{path} holds no snapshots yet")
+    limits = value_range(u)
+    workers = workers or os.cpu_count() or 1
+    chunk = chunk or max(1, min(16, -(-len(indices) // (4 * workers))))
+    chunks = [indices[i:i + chunk] for i in range(0, len(indices), chunk)]
+
+    renderer = FrameRenderer(path, limits, dpi)
+    palette = None
+    if fmt == 'gif':
+        palette = make_palette(renderer)
+        writer = GifWriter(output, gif_frame(renderer.render(0), palette)[0], fps)
+        palette = palette.getpalette()
+    elif fmt == 'mp4':
+        writer = Mp4Writer(output, renderer.size, fps)
+    else:
+        os.makedirs(output, exist_ok=True)
+        writer = PngWriter()
+    init = (path, limits, dpi, fmt, palette, output)
+    try:
+        if workers == 1:
+            _init_worker(*init)
+            for c in chunks:
+                writer.write(_render_chunk(c))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init) as pool:
+                # Keep two chunks per worker in flight; finished ones are written in order
+                pending = deque()
+                for c in chunks:
+                    pending.append(pool.submit(_render_chunk, c))
+                    if len(pending) >= 2 * workers:
+                        writer.write(pending.popleft().result())
+                while pending:
+                    writer.write(pending.popleft().result())
+    finally:
+        writer.close()
+    return {'frames': len(indices), 'seconds': time.perf_counter() - t0, 'workers': workers, 'format': fmt}
@@ -0,0 +1,198 @@
+# heat_fit.py
+# Estimating alpha (and the end temperatures of a Dirichlet rod) from measured
+# probe temperatures. The forward model is the Crank-Nicolson scheme of
+# heat_core; it carries its tangent-linear sensitivities along as extra
+# right-hand sides of the same factorization, so the gradient costs a second
+# triangular solve per step instead of one forward run per parameter. Candidate
+# alphas are laid end to end as one block-diagonal system, like an Ensemble.
+import csv
+import time
+import numpy as np
+from scipy.linalg import get_lapack_funcs
+from scipy.optimize import least_squares
+from heat_core import metals, setup_banded, parse_initial_condition
+from heat_io import probe_weights
+
+def load_probe_csv(path):
+    """(times, probe positions, temperatures[time, probe]) from a CSV whose header is t, x1, x2, ..."""
+    with open(path, newline='') as fh:
+        rows = list(csv.reader(fh))
+    if len(rows) < 2 or len(rows[0]) < 2:
+        raise ValueError(f"{path}: expected a header 't, x1, x2, ...' and at least one row")
+    probes = np.array([float(v) for v in rows[0][1:]])
+    values = np.array([[float(v) for v in row] for row in rows[1:] if row])
+    return values[:, 0], probes, values[:, 1:]
+
+class FitProblem:
+    """Probe measurements on a rod of length L whose initial profile is the expression init.
+
+    times must be multiples of the model step dt (by default the smallest
+    sample spacing over substeps). For bc_type 'dirichlet', bc_params holds
+    the end temperatures, which fit() can also estimate.
+    """
+
+    def __init__(self, L, init, probes, times, data, bc_type='neumann', bc_params=None, nx=101, substeps=4,
+                 dt=None):
+        self.times = np.asarray(times, dtype=float)
+        self.data = np.asarray(data, dtype=float)
+        if self.data.shape != (len(self.times), len(probes)):
+            raise ValueError("data must hold one row per time and one column per probe")
+        if bc_type not in ('neumann', 'dirichlet'):
+            raise ValueError("Unsupported boundary condition type")
+        if np.any(np.diff(self.times) <= 0) or self.times[0] < 0:
+            raise ValueError("Sample times must be increasing and not negative")
+        self.L = float(L)
+        self.nx = nx
+        self.bc_type = bc_type
+        self.bc_params = bc_params or {'left': 0.0, 'right': 0.0}
+        self.x = np.linspace(0, self.L, nx)
+        self.dx = self.L / (nx - 1)
+        if dt is None:
+            spacing = np.diff(np.concatenate([[0.0], self.times]))
+            dt = spacing[spacing > 0].min() / substeps
+        self.dt = dt
+        self.steps = np.rint(self.times / dt).astype(int)
+        if not np.allclose(self.steps * dt, self.times, rtol=1e-6, atol=1e-9 * self.times.max()):
+            raise ValueError("Sample times must be multiples of dt; resample the series or pass dt")
+        self.u0 = np.array(np.broadcast_to(parse_initial_condition(init, L)(self.x), self.x.shape), dtype=float)
+        self._idx, self._w = probe_weights(self.x, probes)
+        self.evaluations = 0
+
+    @property
+    def n_samples(self):
+        return self.data.size
+
+    def simulate(self, alpha, left=None, right=None, tangents=True):
+        """Probe temperatures of a batch of candidates and their sensitivities.
+
+        alpha (and for Dirichlet rods left and right) are arrays of C
+        candidates. Returns pred (C, times, probes) and, with tangents, jac
+        (C, times, probes, n) holding d/d(log alpha), then d/d(left) and
+        d/d(right) for Dirichlet rods.
+        """
+        alpha = np.atleast_1d(np.asarray(alpha, dtype=float))
+        C, nx = len(alpha), self.nx
+        dirichlet = self.bc_type == 'dirichlet'
+        r = alpha * self.dt / self.dx**2
+        bands = [setup_banded(nx, rc, self.bc_type) for rc in r]
+        ab_imp = np.concatenate([b[0] for b in bands], axis=1)
+        ab_exp = np.concatenate([b[1] for b in bands], axis=1)
+        gttrf, gttrs = get_lapack_funcs(('gttrf', 'gttrs'), (ab_imp,))
+        *lu, info = gttrf(ab_imp[2, :-1], ab_imp[1], ab_imp[0, 1:])
+        if info != 0:
+            raise np.linalg.LinAlgError("Implicit matrix is singular")
+        upper, diag, lower = ab_exp[0, 1:, None], ab_exp[1, :, None], ab_exp[2, :-1, None]
+
+        # Columns: u, then d/d(left) and d/d(right), then d/d(log alpha) last
+        n_ends = 2 if dirichlet and tangents else 0
+        cols = 1 + n_ends + (1 if tangents else 0)
+        Y = np.zeros((C * nx, cols), order='F')
+        Y[:, 0] = np.tile(self.u0, C)
+        first, last = np.arange(C) * nx, np.arange(C) * nx + nx - 1
+        if dirichlet:
+            Y[first, 0] = np.broadcast_to(self.bc_params['left'] if left is None else left, C)
+            Y[last, 0] = np.broadcast_to(self.bc_params['right'] if right is None else right, C)
+            if n_ends:
+                # The ends enter linearly: their sensitivities are rods held at 1 on one end
+                Y[first, 1] = 1
+                Y[last, 2] = 1
+        Z = np.empty_like(Y)
+        tmp = np.empty((C * nx - 1, cols), order='F')
+        u_prev = np.empty(C * nx)
+        solved = cols - 1 if tangents else 1
+
+        idx = (np.arange(C) * nx)[:, None] + self._idx
+        w = self._w
+        out = np.empty((len(self.steps), cols, C, len(w)))
+        k = 0
+        for step in range(self.steps[-1] + 1):
+            if step:
+                np.multiply(diag, Y, out=Z)
+                np.multiply(upper, Y[1:], out=tmp)
+                Z[:-1] += tmp
+                np.multiply(lower, Y[:-1], out=tmp)
+                Z[1:] += tmp
+                u_prev[...] = Y[:, 0]
+                Z[:, :solved], _ = gttrs(*lu, Z[:, :solved], overwrite_b=1)
+                if tangents:
+                    # d/d(log alpha) of A(r) u' = B(r) u: A w' = B w + (u' - u)
+                    Z[:, -1] += Z[:, 0] - u_prev
+                    Z[:, -1:], _ = gttrs(*lu, Z[:, -1:], overwrite_b=1)
+                Y, Z = Z, Y
+            while k < len(self.steps) and self.steps[k] == step:
+                out[k] = (1 - w) * Y[idx].transpose(2, 0, 1) + w * Y[idx + 1].transpose(2, 0, 1)
+                k += 1
+        self.evaluations += C
+        pred = out[:, 0].transpose(1, 0, 2)
+        if not tangents:
+            return pred, None
+        jac = np.concatenate([out[:, -1:], out[:, 1:1 + n_ends]], axis=1)
+        return pred, jac.transpose(2, 0, 3, 1)
+
+def fit(problem, fit_ends=False, candidates=16, alpha_range=None, tol=1e-10):
+    """Least-squares alpha (and ends) for the problem's measurements.
+
+    A batch of candidates log-spaced over alpha_range (default: a quarter of
+    the slowest to four times the fastest metal) is evaluated as one system;
+    for Dirichlet rods with fit_ends the best ends of every candidate follow
+    exactly from their sensitivities, since u is affine in them. The best
+    candidate then starts a trust-region Gauss-Newton refinement with
+    tangent-linear Jacobians. Returns a dict with alpha, left/right, their
+    standard errors, the RMS residual and the number of forward evaluations.
+    """
+    t0 = time.perf_counter()
+    problem.evaluations = 0
+    dirichlet = problem.bc_type == 'dirichlet'
+    fit_ends = fit_ends and dirichlet
+    lo, hi = alpha_range or (min(metals.values()) / 4, max(metals.values()) * 4)
+    alphas = np.geomspace(lo, hi, candidates)
+    left = np.full(candidates, float(problem.bc_params['left'])) if dirichlet else None
+    right = np.full(candidates, float(problem.bc_params['right'])) if dirichlet else None
+
+    pred, jac = problem.simulate(alphas, left, right, tangents=fit_ends)
+    resid = (pred - problem.data).reshape(candidates, -1)
+    if fit_ends:
+        for c in range(candidates):
+            J = jac[c, ..., 1:].reshape(-1, 2)
+            step = np.linalg.lstsq(J, -resid[c], rcond=None)[0]
+            left[c] += step[0]
+            right[c] += step[1]
+            resid[c] += J @ step
+    best = int(np.argmin((resid**2).sum(axis=1)))
+
+    p0 = [np.log(alphas[best])] + ([left[best], right[best]] if fit_ends else [])
+    last = {}
+    def evaluate(p):
+        key = tuple(p)
+        if last.get('key') != key:
+            ends = (p[1], p[2]) if fit_ends else (None, None)
+            pred, jac = problem.simulate(np.exp(p[:1]), *ends)
+            J = jac[0].reshape(problem.n_samples, -1)
+            last.update(key=key, resid=(pred[0] - problem.data).ravel(), jac=J if fit_ends else J[:, :1])
+        return last
+    res = least_squares(lambda p: evaluate(p)['resid'], p0, jac=lambda p: evaluate(p)['jac'],
+                        method='trf', x_scale='jac', xtol=tol, ftol=tol, gtol=tol)
+
+    # Standard errors from the Gauss-Newton covariance s^2 (J^T J)^-1
+    dof = max(problem.n_samples - len(res.x), 1)
+    s2 = 2 * res.cost / dof
+    try:
+        stderr = np.sqrt(np.diag(s2 * np.linalg.inv(res.jac.T @ res.jac)))
+    except np.linalg.LinAlgError:
+        stderr = np.full(len(res.x), np.nan)
+    alpha = float(np.exp(res.x[0]))
+    result = {
+        'alpha': alpha,
+        'alpha_stderr': alpha * float(stderr[0]),
+        'rms': float(np.sqrt(s2 * dof / problem.n_samples)),
+        'closest_metal': min(metals, key=lambda m: abs(np.log(metals[m] / alpha))),
+        'success': bool(res.success),
+        'evaluations': problem.evaluations,
+        'wall_s': time.perf_counter() - t0,
+    }
+    if dirichlet:
+        result['left'] = float(res.x[1]) if fit_ends else float(problem.bc_params['left'])
+        result['right'] = float(res.x[2]) if fit_ends else float(problem.bc_params['right'])
+        if fit_ends:
+            result['left_stderr'], result['right_stderr'] = float(stderr[1]), float(stderr[2])
+    return result
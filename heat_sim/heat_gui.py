@@ -1,33 +1,36 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from heat_core import metals, parse_initial_condition
-from heat_plot import run_plot, run_dual_plots
+from heat_plot import run_plot, run_comparison
 
 gui_root = None
 gui_widgets = {}
 
+# Most rods the comparison view takes; their panels share one window
+MAX_PANELS = 16
+
+def read_rod(fields, label='Rod'):
+    """(L, metal, alpha, f, bc_type, bc_params) from one set of rod input widgets."""
+    L = float(fields['length'].get())
+    if L <= 0:
+        raise ValueError(f"{label} length must be positive.")
+    metal = fields['metal'].get().lower()
+    alpha = metals.get(metal)
+    if alpha is None:
+        raise ValueError(f"Please select a metal for {label.lower()}.")
+    f = parse_initial_condition(fields['expr'].get(), L)
+    bc_type = 'dirichlet' if 'Dirichlet' in fields['bc_type'].get() else 'neumann'
+    bc_params = None
+    if bc_type == 'dirichlet':
+        bc_params = {
+            'left': float(fields['left_temp'].get()),
+            'right': float(fields['right_temp'].get())
+        }
+    return L, metal, alpha, f, bc_type, bc_params
+
 def start_simulation():
     try:
-        L = float(gui_widgets['length'].get())
-        if L <= 0:
-            raise ValueError("Length must be positive.")
-        metal = gui_widgets['metal'].get().lower()
-        alpha = metals.get(metal)
-        if alpha is None:
-            raise ValueError("Please select a metal.")
-        init_expr = gui_widgets['expr'].get()
-        f = parse_initial_condition(init_expr, L)
-
-        bc_selected = gui_widgets['bc_type'].get()
-        bc_type = 'dirichlet' if 'Dirichlet' in bc_selected else 'neumann'
-        if bc_type == 'dirichlet':
-            bc_params = {
-                'left': float(gui_widgets['left_temp'].get()),
-                'right': float(gui_widgets['right_temp'].get())
-            }
-        else:
-            bc_params = None
-
+        L, metal, alpha, f, bc_type, bc_params = read_rod(gui_widgets)
         gui_root.withdraw()
         run_plot(L, alpha, f, back_callback=gui_root.deiconify, bc_type=bc_type, bc_params=bc_params)
     except ValueError as ve:
@@ -36,60 +39,16 @@ def start_simulation():
         messagebox.showerror("Error",
             f"Invalid expression: {e}\n\nExample: sin(pi * x / L)")
 
-def start_dual_simulation():
+def start_comparison():
     try:
-        # Left simulation
-        L1 = float(gui_widgets['length1'].get())
-        if L1 <= 0:
-            raise ValueError("Left rod length must be positive.")
-        metal1 = gui_widgets['metal1'].get().lower()
-        alpha1 = metals.get(metal1)
-        if alpha1 is None:
-            raise ValueError("Please select a metal for left rod.")
-        init_expr1 = gui_widgets['expr1'].get()
-        f1 = parse_initial_condition(init_expr1, L1)
-
-        bc_selected1 = gui_widgets['bc_type1'].get()
-        bc_type1 = 'dirichlet' if 'Dirichlet' in bc_selected1 else 'neumann'
-        if bc_type1 == 'dirichlet':
-            bc_params1 = {
-                'left': float(gui_widgets['left_temp1'].get()),
-                'right': float(gui_widgets['right_temp1'].get())
-            }
-        else:
-            bc_params1 = None
-
-        # Right simulation
-        L2 = float(gui_widgets['length2'].get())
-        if L2 <= 0:
-            raise ValueError("Right rod length must be positive.")
-        metal2 = gui_widgets['metal2'].get().lower()
-        alpha2 = metals.get(metal2)
-        if alpha2 is None:
-            raise ValueError("Please select a metal for right rod.")
-        init_expr2 = gui_widgets['expr2'].get()
-        f2 = parse_initial_condition(init_expr2, L2)
-
-        bc_selected2 = gui_widgets['bc_type2'].get()
-        bc_type2 = 'dirichlet' if 'Dirichlet' in bc_selected2 else 'neumann'
-        if bc_type2 == 'dirichlet':
-            bc_params2 = {
-                'left': float(gui_widgets['left_temp2'].get()),
-                'right': float(gui_widgets['right_temp2'].get())
-            }
-        else:
-            bc_params2 = None
-
+        rods = []
+        for i, fields in enumerate(gui_widgets['rods']):
+            L, metal, alpha, f, bc_type, bc_params = read_rod(fields, f"Rod {i + 1}")
+            rods.append({'L': L, 'alpha': alpha, 'f': f, 'name': metal, 'bc_type': bc_type, 'bc_params': bc_params})
         gui_root.withdraw()
 
-        # Run two plots side-by-side simultaneously
-        run_dual_plots(
-            L1, alpha1, f1, metal1,
-            L2, alpha2, f2, metal2,
-            back_callback=gui_root.deiconify,
-            bc_type1=bc_type1, bc_params1=bc_params1,
-            bc_type2=bc_type2, bc_params2=bc_params2
-        )
+        # All rods side by side in one window, on one clock
+        run_comparison(rods, back_callback=gui_root.deiconify)
 
     except ValueError as ve:
         messagebox.showerror("Input Error", str(ve))
@@ -97,17 +56,83 @@ def start_dual_simulation():
         messagebox.showerror("Error",
             f"Invalid expression: {e}\n\nExample: sin(pi * x / L)")
 
+def fit_window():
+    # The comparison table grows with its rows
+    rows = len(gui_widgets['rods']) if gui_widgets['compare_frame'].winfo_ismapped() else 0
+    gui_root.geometry(f"600x{max(680, 330 + 30 * rows)}")
+
 def show_single_mode():
     gui_widgets['single_frame'].pack(pady=20)
-    gui_widgets['dual_frame'].pack_forget()
+    gui_widgets['compare_frame'].pack_forget()
     gui_widgets['start_single_btn'].pack(pady=25)
-    gui_widgets['start_dual_btn'].pack_forget()
+    gui_widgets['start_compare_btn'].pack_forget()
+    gui_root.geometry("600x680")
 
-def show_dual_mode():
+def show_compare_mode():
     gui_widgets['single_frame'].pack_forget()
-    gui_widgets['dual_frame'].pack(pady=20)
+    gui_widgets['compare_frame'].pack(pady=20)
     gui_widgets['start_single_btn'].pack_forget()
-    gui_widgets['start_dual_btn'].pack(pady=25)
+    gui_widgets['start_compare_btn'].pack(pady=25)
+    gui_root.update_idletasks()
+    fit_window()
+
+def add_rod_row(table, metal=None):
+    """One row of rod inputs in the comparison table."""
+    rods = gui_widgets['rods']
+    if len(rods) >= MAX_PANELS:
+        return
+    row = len(rods) + 1
+    entry = dict(width=6, font=('Consolas', 10), bg='#424242', fg='#FFFFFF', insertbackground='#FFFFFF',
+                 disabledbackground='#303030')
+    fields = {}
+    fields['label'] = tk.Label(table, text=f"{row}", bg='#212121', fg='#4FC3F7', font=('Helvetica', 10, 'bold'))
+    fields['length'] = tk.Entry(table, **entry)
+    fields['length'].insert(0, "1.0")
+    fields['metal'] = ttk.Combobox(table, values=list(metals.keys()), state="readonly", width=9)
+    fields['metal'].set(metal or list(metals)[(row - 1) % len(metals)])
+    fields['expr'] = tk.Entry(table, **dict(entry, width=18))
+    fields['expr'].insert(0, "sin(pi * x / L)")
+    fields['bc_type'] = ttk.Combobox(table, values=['Neumann', 'Dirichlet'], state="readonly", width=9)
+    fields['bc_type'].set('Neumann')
+    fields['left_temp'] = tk.Entry(table, **dict(entry, width=5))
+    fields['left_temp'].insert(0, "0")
+    fields['right_temp'] = tk.Entry(table, **dict(entry, width=5))
+    fields['right_temp'].insert(0, "0")
+    for column, key in enumerate(('label', 'length', 'metal', 'expr', 'bc_type', 'left_temp', 'right_temp')):
+        fields[key].grid(row=row, column=column, padx=3, pady=2)
+
+    def toggle_dir(event=None):
+        state = 'normal' if 'Dirichlet' in fields['bc_type'].get() else 'disabled'
+        fields['left_temp'].configure(state=state)
+        fields['right_temp'].configure(state=state)
+    fields['bc_type'].bind('<<ComboboxSelected>>', toggle_dir)
+    toggle_dir()
+    rods.append(fields)
+    fit_window()
+
+def remove_rod_row():
+    rods = gui_widgets['rods']
+    if len(rods) <= 1:
+        return
+    for widget in rods.pop().values():
+        widget.destroy()
+    fit_window()
+
+def create_start_button(text, command):
+    """Rounded start button on its own canvas."""
+    canvas = tk.Canvas(gui_root, width=200, height=50, bg='#212121', highlightthickness=0)
+    rect = create_rounded_rectangle(canvas, 10, 5, 190, 45, radius=20, fill='#4FC3F7')
+    label = canvas.create_text(100, 25, text=text, fill='white', font=('Helvetica', 12, 'bold'))
+
+    def on_enter(e): canvas.itemconfig(rect, fill='#29B6F6')
+    def on_leave(e): canvas.itemconfig(rect, fill='#4FC3F7')
+    def on_click(e): command()
+
+    for item in (rect, label):
+        canvas.tag_bind(item, '<Enter>', on_enter)
+        canvas.tag_bind(item, '<Leave>', on_leave)
+        canvas.tag_bind(item, '<Button-1>', on_click)
+    return canvas
 
 def create_rounded_rectangle(canvas, x1, y1, x2, y2, radius=20, **kwargs):
     points = [x1 + radius, y1,
@@ -152,8 +177,8 @@ def create_gui():
     tk.Label(mode_frame, text="Mode:", bg='#212121', fg='#FFFFFF', font=('Helvetica', 11, 'bold')).pack(side='left')
     btn_single = tk.Button(mode_frame, text="Single View", bg='#424242', fg='#FFFFFF', relief='flat', command=show_single_mode)
     btn_single.pack(side='left', padx=10)
-    btn_dual = tk.Button(mode_frame, text="Dual-View Comparison", bg='#424242', fg='#FFFFFF', relief='flat', command=show_dual_mode)
-    btn_dual.pack(side='left', padx=10)
+    btn_compare = tk.Button(mode_frame, text="Comparison (up to 16)", bg='#424242', fg='#FFFFFF', relief='flat', command=show_compare_mode)
+    btn_compare.pack(side='left', padx=10)
 
     # === Single Mode Frame ===
     single_frame = tk.Frame(gui_root, bg='#212121')
@@ -208,133 +233,27 @@ def create_gui():
 
     gui_widgets['single_frame'] = single_frame
 
-    # === Dual Mode Frame ===
-    dual_frame = tk.Frame(gui_root, bg='#212121')
-
-    # Left side
-    left_frame = tk.LabelFrame(dual_frame, text=" Left Simulation ", bg='#212121', fg='#4FC3F7', font=('Helvetica', 10, 'bold'))
-    left_frame.pack(side='left', padx=15, pady=10)
-
-    tk.Label(left_frame, text="Length (m):").pack(pady=(10,5))
-    e1 = tk.Entry(left_frame, width=15, font=('Consolas', 10), bg='#424242', fg='#FFFFFF', insertbackground='#FFFFFF')
-    e1.pack(pady=5); e1.insert(0, "1.0")
-    gui_widgets['length1'] = e1
-
-    tk.Label(left_frame, text="Metal:").pack(pady=(10,5))
-    c1 = ttk.Combobox(left_frame, values=list(metals.keys()), state="readonly", width=13)
-    c1.pack(pady=5); c1.set("iron")
-    gui_widgets['metal1'] = c1
-
-    tk.Label(left_frame, text="f(x):").pack(pady=(10,5))
-    ex1 = tk.Entry(left_frame, width=25, font=('Consolas', 10), bg='#424242', fg='#FFFFFF', insertbackground='#FFFFFF')
-    ex1.pack(pady=5); ex1.insert(0, "sin(pi * x / L)")
-    gui_widgets['expr1'] = ex1
-
-    tk.Label(left_frame, text="BC:").pack(pady=(10,5))
-    combo_bc1 = ttk.Combobox(left_frame, values=['Neumann (Insulated)', 'Dirichlet (Fixed Temp)'], state="readonly", width=18)
-    combo_bc1.pack(pady=5)
-    combo_bc1.set('Neumann (Insulated)')
-    gui_widgets['bc_type1'] = combo_bc1
-
-    dir_frame1 = tk.Frame(left_frame, bg='#212121')
-    tk.Label(dir_frame1, text="Left:").pack(side='left', padx=2)
-    entry_left1 = tk.Entry(dir_frame1, width=6, font=('Consolas', 10), bg='#424242', fg='#FFFFFF', insertbackground='#FFFFFF')
-    entry_left1.pack(side='left', padx=2); entry_left1.insert(0, "0")
-    gui_widgets['left_temp1'] = entry_left1
-    tk.Label(dir_frame1, text="Right:").pack(side='left', padx=2)
-    entry_right1 = tk.Entry(dir_frame1, width=6, font=('Consolas', 10), bg='#424242', fg='#FFFFFF', insertbackground='#FFFFFF')
-    entry_right1.pack(side='left', padx=2); entry_right1.insert(0, "0")
-    gui_widgets['right_temp1'] = entry_right1
-    gui_widgets['dir_frame1'] = dir_frame1
-
-    def toggle_dir1(event=None):
-        if 'Dirichlet' in gui_widgets['bc_type1'].get():
-            dir_frame1.pack(pady=5)
-        else:
-            dir_frame1.pack_forget()
-    combo_bc1.bind('<<ComboboxSelected>>', toggle_dir1)
-    toggle_dir1()
-
-    # Right side
-    right_frame = tk.LabelFrame(dual_frame, text=" Right Simulation ", bg='#212121', fg='#4FC3F7', font=('Helvetica', 10, 'bold'))
-    right_frame.pack(side='right', padx=15, pady=10)
-
-    tk.Label(right_frame, text="Length (m):").pack(pady=(10,5))
-    e2 = tk.Entry(right_frame, width=15, font=('Consolas', 10), bg='#424242', fg='#FFFFFF', insertbackground='#FFFFFF')
-    e2.pack(pady=5); e2.insert(0, "1.0")
-    gui_widgets['length2'] = e2
-
-    tk.Label(right_frame, text="Metal:").pack(pady=(10,5))
-    c2 = ttk.Combobox(right_frame, values=list(metals.keys()), state="readonly", width=13)
-    c2.pack(pady=5); c2.set("copper")
-    gui_widgets['metal2'] = c2
-
-    tk.Label(right_frame, text="f(x):").pack(pady=(10,5))
-    ex2 = tk.Entry(right_frame, width=25, font=('Consolas', 10), bg='#424242', fg='#FFFFFF', insertbackground='#FFFFFF')
-    ex2.pack(pady=5); ex2.insert(0, "sin(pi * x / L)")
-    gui_widgets['expr2'] = ex2
-
-    tk.Label(right_frame, text="BC:").pack(pady=(10,5))
-    combo_bc2 = ttk.Combobox(right_frame, values=['Neumann (Insulated)', 'Dirichlet (Fixed Temp)'], state="readonly", width=18)
-    combo_bc2.pack(pady=5)
-    combo_bc2.set('Neumann (Insulated)')
-    gui_widgets['bc_type2'] = combo_bc2
-
-    dir_frame2 = tk.Frame(right_frame, bg='#212121')
-    tk.Label(dir_frame2, text="Left:").pack(side='left', padx=2)
-    entry_left2 = tk.Entry(dir_frame2, width=6, font=('Consolas', 10), bg='#424242', fg='#FFFFFF', insertbackground='#FFFFFF')
-    entry_left2.pack(side='left', padx=2); entry_left2.insert(0, "0")
-    gui_widgets['left_temp2'] = entry_left2
-    tk.Label(dir_frame2, text="Right:").pack(side='left', padx=2)
-    entry_right2 = tk.Entry(dir_frame2, width=6, font=('Consolas', 10), bg='#424242', fg='#FFFFFF', insertbackground='#FFFFFF')
-    entry_right2.pack(side='left', padx=2); entry_right2.insert(0, "0")
-    gui_widgets['right_temp2'] = entry_right2
-    gui_widgets['dir_frame2'] = dir_frame2
-
-    def toggle_dir2(event=None):
-        if 'Dirichlet' in gui_widgets['bc_type2'].get():
-            dir_frame2.pack(pady=5)
-        else:
-            dir_frame2.pack_forget()
-    combo_bc2.bind('<<ComboboxSelected>>', toggle_dir2)
-    toggle_dir2()
-
-    gui_widgets['dual_frame'] = dual_frame
+    # === Comparison Mode Frame ===
+    compare_frame = tk.Frame(gui_root, bg='#212121')
+    table = tk.Frame(compare_frame, bg='#212121')
+    table.pack()
+    for column, heading in enumerate(('#', 'Length (m)', 'Metal', 'f(x)', 'BC', 'Left', 'Right')):
+        tk.Label(table, text=heading, bg='#212121', fg='#FFFFFF', font=('Helvetica', 10, 'bold')).grid(row=0, column=column, padx=3, pady=(0, 4))
+    gui_widgets['compare_frame'] = compare_frame
+    gui_widgets['rods'] = []
+    add_rod_row(table, 'iron')
+    add_rod_row(table, 'copper')
+
+    rows_frame = tk.Frame(compare_frame, bg='#212121')
+    rows_frame.pack(pady=10)
+    tk.Button(rows_frame, text="+ Add Rod", bg='#424242', fg='#FFFFFF', relief='flat',
+              command=lambda: add_rod_row(table)).pack(side='left', padx=10)
+    tk.Button(rows_frame, text="- Remove Rod", bg='#424242', fg='#FFFFFF', relief='flat',
+              command=remove_rod_row).pack(side='left', padx=10)
 
     # === Start Buttons ===
-    start_single_btn = tk.Canvas(gui_root, width=200, height=50, bg='#212121', highlightthickness=0)
-    btn_rect1 = create_rounded_rectangle(start_single_btn, 10, 5, 190, 45, radius=20, fill='#4FC3F7')
-    btn_text1 = start_single_btn.create_text(100, 25, text="Start Simulation", fill='white',
-                                             font=('Helvetica', 12, 'bold'))
-
-    def on_enter1(e): start_single_btn.itemconfig(btn_rect1, fill='#29B6F6')
-    def on_leave1(e): start_single_btn.itemconfig(btn_rect1, fill='#4FC3F7')
-    def on_click1(e): start_simulation()
-
-    start_single_btn.tag_bind(btn_rect1, '<Enter>', on_enter1)
-    start_single_btn.tag_bind(btn_rect1, '<Leave>', on_leave1)
-    start_single_btn.tag_bind(btn_rect1, '<Button-1>', on_click1)
-    start_single_btn.tag_bind(btn_text1, '<Enter>', on_enter1)
-    start_single_btn.tag_bind(btn_text1, '<Leave>', on_leave1)
-    start_single_btn.tag_bind(btn_text1, '<Button-1>', on_click1)
-    gui_widgets['start_single_btn'] = start_single_btn
-
-    start_dual_btn = tk.Canvas(gui_root, width=200, height=50, bg='#212121', highlightthickness=0)
-    btn_rect2 = create_rounded_rectangle(start_dual_btn, 10, 5, 190, 45, radius=20, fill='#4FC3F7')
-    btn_text2 = start_dual_btn.create_text(100, 25, text="Start Dual Comparison", fill='white',
-                                           font=('Helvetica', 12, 'bold'))
-
-    def on_enter2(e): start_dual_btn.itemconfig(btn_rect2, fill='#29B6F6')
-    def on_leave2(e): start_dual_btn.itemconfig(btn_rect2, fill='#4FC3F7')
-    def on_click2(e): start_dual_simulation()
-
-    start_dual_btn.tag_bind(btn_rect2, '<Enter>', on_enter2)
-    start_dual_btn.tag_bind(btn_rect2, '<Leave>', on_leave2)
-    start_dual_btn.tag_bind(btn_rect2, '<Button-1>', on_click2)
-    start_dual_btn.tag_bind(btn_text2, '<Enter>', on_enter2)
-    start_dual_btn.tag_bind(btn_text2, '<Leave>', on_leave2)
-    start_dual_btn.tag_bind(btn_text2, '<Button-1>', on_click2)
-    gui_widgets['start_dual_btn'] = start_dual_btn
+    gui_widgets['start_single_btn'] = create_start_button("Start Simulation", start_simulation)
+    gui_widgets['start_compare_btn'] = create_start_button("Start Comparison", start_comparison)
 
     # === Default: Show Single Mode ===
     show_single_mode()
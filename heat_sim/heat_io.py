@@ -0,0 +1,264 @@
+# heat_io.py
+# Streaming trajectory output: a directory holding meta.json, u.npy and t.npy.
+# Both .npy files are preallocated up front, so readers can memory-map them while
+# a run is still appending. Also checkpoints: a single binary file with a small
+# JSON header, written from a background thread.
+import json
+import os
+import struct
+import threading
+import zlib
+import numpy as np
+
+def probe_weights(x, probes):
+    """Indices and weights for linear interpolation of u at the probe positions."""
+    probes = np.asarray(probes, dtype=float)
+    if probes.size and (probes.min() < x[0] or probes.max() > x[-1]):
+        raise ValueError("Probe positions must lie on the rod")
+    idx = np.clip(np.searchsorted(x, probes, side='right') - 1, 0, len(x) - 2)
+    w = (probes - x[idx]) / (x[idx + 1] - x[idx])
+    return idx, w
+
+class TrajectoryWriter:
+    """Append a snapshot every stride steps to preallocated, memory-mapped .npy files.
+
+    With probes given, only the temperatures at those positions are stored, so a
+    row costs len(probes) values instead of nx. batch adds a leading member axis
+    for Ensemble states. With grow=True a full writer doubles its files instead
+    of refusing the next row, for runs whose length is not known up front.
+    """
+
+    def __init__(self, path, x, n_snapshots, probes=None, batch=None, meta=None, dtype=float, grow=False):
+        self.path = path
+        self.grow = grow
+        self.x = np.asarray(x, dtype=float)
+        if probes is None:
+            self._probe = None
+            columns = self.x
+        else:
+            self._probe = probe_weights(self.x, probes)
+            columns = np.asarray(probes, dtype=float)
+        row_shape = (len(columns),) if batch is None else (batch, len(columns))
+
+        os.makedirs(path, exist_ok=True)
+        info = dict(meta or {})
+        info.update({'x': columns.tolist(), 'capacity': n_snapshots, 'probes': probes is not None})
+        with open(os.path.join(path, 'meta.json'), 'w') as fh:
+            json.dump(info, fh)
+        open_memmap = np.lib.format.open_memmap
+        self.u = open_memmap(os.path.join(path, 'u.npy'), mode='w+', dtype=dtype,
+                             shape=(n_snapshots,) + row_shape)
+        self.t = open_memmap(os.path.join(path, 't.npy'), mode='w+', dtype=float, shape=(n_snapshots,))
+        # NaN marks rows not written yet; a row counts once its time lands
+        self.t[:] = np.nan
+        self.count = 0
+
+    @classmethod
+    def reopen(cls, path, x, t, probes=None):
+        """Continue an existing trajectory after time t, dropping any rows past it."""
+        writer = cls.__new__(cls)
+        writer.path = path
+        writer.x = np.asarray(x, dtype=float)
+        writer._probe = None if probes is None else probe_weights(writer.x, probes)
+        writer.u = np.load(os.path.join(path, 'u.npy'), mmap_mode='r+')
+        writer.t = np.load(os.path.join(path, 't.npy'), mmap_mode='r+')
+        written = np.isfinite(writer.t) & (writer.t <= t)
+        writer.count = int(np.count_nonzero(written))
+        writer.t[writer.count:] = np.nan
+        writer.grow = False
+        return writer
+
+    def _grow(self):
+        """Double the capacity: copy both arrays into larger files and map those instead."""
+        capacity = 2 * len(self.t)
+        for name in ('u', 't'):
+            old = getattr(self, name)
+            path = os.path.join(self.path, name + '.npy')
+            tmp = os.path.join(self.path, name + '.grow.npy')
+            new = np.lib.format.open_memmap(tmp, mode='w+', dtype=old.dtype, shape=(capacity,) + old.shape[1:])
+            new[:len(old)] = old
+            if name == 't':
+                new[len(old):] = np.nan
+            new.flush()
+            # Unmap both before the rename, which some platforms refuse on mapped files
+            del new, old
+            setattr(self, name, None)
+            os.replace(tmp, path)
+            setattr(self, name, np.load(path, mmap_mode='r+'))
+        meta_path = os.path.join(self.path, 'meta.json')
+        with open(meta_path) as fh:
+            info = json.load(fh)
+        info['capacity'] = capacity
+        with open(meta_path, 'w') as fh:
+            json.dump(info, fh)
+
+    def append(self, t, u):
+        if self.count >= len(self.t):
+            if not self.grow:
+                raise ValueError("Trajectory is full")
+            self._grow()
+        row = self.u[self.count]
+        if self._probe is None:
+            row[...] = u
+        else:
+            idx, w = self._probe
+            row[...] = (1 - w) * u[..., idx] + w * u[..., idx + 1]
+        self.t[self.count] = t
+        self.count += 1
+
+    def flush(self):
+        self.u.flush()
+        self.t.flush()
+
+    def close(self):
+        if self.u is not None:
+            self.flush()
+            self.u = self.t = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def advance_recorded(advance, u, n_steps, stride, writer, dt, t0=0.0, start=0, on_chunk=None):
+    """Run advance(u, k) for n_steps, appending u to writer at t0 and every stride steps.
+
+    start resumes a run that has already done that many of its n_steps (the
+    initial row is then not written again); writer may be None.
+    on_chunk(done, u) runs after every stride.
+    """
+    if writer is not None and start == 0:
+        writer.append(t0, u)
+    done = start
+    while done < n_steps:
+        k = min(stride, n_steps - done)
+        u = advance(u, k)
+        done += k
+        if writer is not None:
+            writer.append(t0 + done * dt, u)
+        if on_chunk is not None:
+            on_chunk(done, u)
+    return u
+
+def open_trajectory(path):
+    """Memory-map a trajectory (finished or still running) without copying.
+
+    Returns (t, u, meta) trimmed to the rows written so far.
+    """
+    with open(os.path.join(path, 'meta.json')) as fh:
+        meta = json.load(fh)
+    t = np.load(os.path.join(path, 't.npy'), mmap_mode='r')
+    u = np.load(os.path.join(path, 'u.npy'), mmap_mode='r')
+    count = int(np.count_nonzero(np.isfinite(t)))
+    return t[:count], u[:count], meta
+
+# Checkpoint file: magic, format version and header length, then the JSON
+# header (step, t, dtype, shape, CRC-32 of the state, config) and the raw state.
+CHECKPOINT_MAGIC = b'HEATCKPT'
+CHECKPOINT_VERSION = 1
+_PREFIX = struct.Struct('<8sHI')
+
+def write_checkpoint(path, u, step, t, config, extra=None):
+    """Write the state u at (step, t) with its run configuration, atomically."""
+    u = np.ascontiguousarray(u)
+    data = u.tobytes()
+    header = json.dumps({
+        'step': int(step), 't': float(t), 'dtype': u.dtype.str, 'shape': list(u.shape),
+        'crc32': zlib.crc32(data), 'config': config, 'extra': extra or {},
+    }).encode()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as fh:
+        fh.write(_PREFIX.pack(CHECKPOINT_MAGIC, CHECKPOINT_VERSION, len(header)))
+        fh.write(header)
+        fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+    # A crash mid-write leaves the previous checkpoint in place
+    os.replace(tmp, path)
+
+def read_checkpoint(path):
+    """Load a checkpoint: returns a dict with u, step, t, config and extra."""
+    with open(path, 'rb') as fh:
+        prefix = fh.read(_PREFIX.size)
+        if len(prefix) < _PREFIX.size:
+            raise ValueError(f"{path} is not a checkpoint file")
+        magic, version, header_len = _PREFIX.unpack(prefix)
+        if magic != CHECKPOINT_MAGIC:
+            raise ValueError(f"{path} is not a checkpoint file")
+        if version != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version {version}")
+        header = json.loads(fh.read(header_len))
+        data = fh.read()
+    if zlib.crc32(data) != header['crc32']:
+        raise ValueError(f"Checkpoint {path} is corrupt (checksum mismatch)")
+    u = np.frombuffer(data, dtype=header['dtype']).reshape(header['shape']).copy()
+    return {'u': u, 'step': header['step'], 't': header['t'], 'config': header['config'],
+            'extra': header['extra']}
+
+class CheckpointWriter:
+    """Write checkpoints from a background thread so stepping never waits on disk.
+
+    submit() copies the state into a spare buffer and returns at once. If the
+    previous checkpoint is still being written, the one waiting in line is
+    replaced by the newer state, so at most one write is ever queued.
+    """
+
+    def __init__(self, path, config, extra=None):
+        self.path = path
+        self.config = config
+        self.extra = extra
+        self.written = 0
+        self.error = None
+        self._pending = None
+        self._spare = []
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='heat-checkpoint', daemon=True)
+        self._thread.start()
+
+    def submit(self, u, step, t):
+        with self._cond:
+            if self._pending is not None:
+                # Superseded before it was written; reuse its buffer
+                self._spare.append(self._pending[0])
+            buf = self._spare.pop() if self._spare else None
+            if buf is None or buf.shape != np.shape(u) or buf.dtype != np.asarray(u).dtype:
+                buf = np.empty_like(u)
+            buf[...] = u
+            self._pending = (buf, step, t)
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._pending is None:
+                    return
+                buf, step, t = self._pending
+                self._pending = None
+            try:
+                write_checkpoint(self.path, buf, step, t, self.config, self.extra)
+                self.written += 1
+            except Exception as exc:
+                # Kept for close() to raise; later states still get their turn
+                self.error = exc
+            with self._cond:
+                self._spare.append(buf)
+
+    def close(self):
+        """Finish the queued write; raises if any write failed."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,200 @@
+# heat_playback.py
+# Runs the solver away from the GUI thread. A FrameProducer steps the simulation
+# in a background thread into a bounded ring buffer of snapshots; a Playback
+# play head walks that buffer for the animation, so pausing, speeding up and
+# scrubbing never recompute anything.
+import threading
+import numpy as np
+
+class FrameProducer:
+    """Snapshots of advance(u, steps_per_frame), computed ahead into a ring buffer.
+
+    Frame k (time k * steps_per_frame * dt) sits in slot k % capacity until it is
+    overwritten. The producer runs at most `lead` frames ahead of `cursor` (the
+    frame on screen), so the other capacity - lead slots hold frames already
+    shown, for scrubbing back. until(u, u_prev, t) ends production when it
+    returns True; on_frame(t, u) sees every new frame (e.g. a TrajectoryWriter).
+    Both run on the producer thread, as does advance; NumPy and LAPACK release
+    the GIL for the heavy parts of a step. The buffer is capped at max_bytes,
+    so very fine grids get fewer slots.
+
+    With threaded=False nothing runs in the background and frames are
+    computed on demand by fill(), which keeps headless runs deterministic.
+    """
+
+    def __init__(self, advance, u, dt, steps_per_frame=10, capacity=256, lead=None,
+                 until=None, on_frame=None, stats=None, threaded=True, max_bytes=256 * 2**20):
+        u = np.asarray(u)
+        # Frames keep the state's dtype, so float32 runs buffer twice as many
+        capacity = max(4, min(capacity, max_bytes // max(u.nbytes, 1)))
+        if lead is None:
+            lead = capacity // 2
+        lead = min(lead, capacity - 1)
+        if lead < 1:
+            raise ValueError("lead must be at least 1")
+        self._advance = advance
+        self.dt = dt
+        self.steps_per_frame = steps_per_frame
+        self.capacity = capacity
+        self.lead = lead
+        self._until = until
+        self._on_frame = on_frame
+        self._stats = stats
+        self._frames = np.empty((capacity,) + u.shape, dtype=u.dtype)
+        self._times = np.empty(capacity)
+        self._frames[0] = u
+        self._times[0] = 0.0
+        self._u = u.copy()
+        self._u_prev = np.empty_like(self._u)
+        self.produced = 1
+        self.cursor = 0
+        self.finished = False
+        self.error = None
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='heat-producer', daemon=True) if threaded else None
+
+    def start(self):
+        if self._thread is not None:
+            self._thread.start()
+        return self
+
+    def close(self):
+        """Stop the producer thread and wait for the step in progress."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join()
+
+    def _produce(self):
+        self._u_prev[...] = self._u
+        if self._stats is not None:
+            with self._stats.phase('step'):
+                self._u = self._advance(self._u, self.steps_per_frame)
+            self._stats.add_steps(self.steps_per_frame)
+        else:
+            self._u = self._advance(self._u, self.steps_per_frame)
+        t = self.produced * self.steps_per_frame * self.dt
+        done = self._until is not None and self._until(self._u, self._u_prev, t)
+        if self._on_frame is not None:
+            self._on_frame(t, self._u)
+        with self._cond:
+            slot = self.produced % self.capacity
+            self._frames[slot] = self._u
+            self._times[slot] = t
+            self.produced += 1
+            self.finished = bool(done)
+            self._cond.notify_all()
+
+    def _run(self):
+        try:
+            while True:
+                with self._cond:
+                    while not self._closed and self.produced - 1 - self.cursor >= self.lead:
+                        self._cond.wait()
+                    if self._closed or self.finished:
+                        return
+                self._produce()
+        except Exception as exc:
+            # Surface solver errors on the GUI side instead of dying silently
+            self.error = exc
+
+    def fill(self, index):
+        """Synchronously compute frames up to index (threaded=False)."""
+        while self.produced <= index and not self.finished:
+            self._produce()
+
+    def available(self):
+        """(first, last) frame indices still held in the buffer."""
+        with self._cond:
+            return max(0, self.produced - self.capacity), self.produced - 1
+
+    def set_cursor(self, index):
+        with self._cond:
+            self.cursor = index
+            self._cond.notify_all()
+
+    def read(self, index, out):
+        """Copy frame index into out and return its time."""
+        with self._cond:
+            if not max(0, self.produced - self.capacity) <= index < self.produced:
+                raise IndexError(f"frame {index} is not in the buffer")
+            slot = index % self.capacity
+            out[...] = self._frames[slot]
+            return self._times[slot]
+
+
+class Playback:
+    """Play head over a FrameProducer.
+
+    tick() moves speed frames forward unless paused and holds at the newest
+    frame when the solver falls behind; step() and seek() scrub within what
+    the buffer still holds.
+    """
+
+    MIN_SPEED = 0.125
+    MAX_SPEED = 64.0
+
+    def __init__(self, producer, speed=1.0):
+        self.producer = producer
+        self.speed = speed
+        self.paused = False
+        self.position = 0.0
+
+    @property
+    def frame(self):
+        return int(self.position)
+
+    def _move(self, position):
+        if self.producer._thread is None:
+            self.producer.fill(int(position))
+        first, last = self.producer.available()
+        self.position = min(max(position, first), last)
+        self.producer.set_cursor(self.frame)
+        return self.frame
+
+    def tick(self):
+        """Frame index to show next."""
+        if self.producer.error is not None:
+            raise self.producer.error
+        return self._move(self.position if self.paused else self.position + self.speed)
+
+    def toggle_pause(self):
+        self.paused = not self.paused
+
+    def faster(self):
+        self.speed = min(self.speed * 2, self.MAX_SPEED)
+
+    def slower(self):
+        self.speed = max(self.speed / 2, self.MIN_SPEED)
+
+    def step(self, frames):
+        """Scrub by a number of frames (negative goes back)."""
+        return self._move(self.frame + frames)
+
+    def seek(self, index):
+        return self._move(index)
+
+    @property
+    def at_end(self):
+        return self.producer.finished and self.frame == self.producer.produced - 1
+
+    def on_key(self, event):
+        """matplotlib key_press_event handler: space, left/right, up/down, home/end."""
+        if event.key == ' ':
+            self.toggle_pause()
+        elif event.key == 'up':
+            self.faster()
+        elif event.key == 'down':
+            self.slower()
+        elif event.key in ('left', 'right'):
+            self.step((-1 if event.key == 'left' else 1) * max(1, int(self.speed)))
+        elif event.key == 'home':
+            self.seek(0)
+        elif event.key == 'end':
+            self.seek(self.producer.produced - 1)
+
+    def status(self, t):
+        state = 'paused' if self.paused else f'{self.speed:g}x'
+        return f't = {t:.4g} s  [{state}]'
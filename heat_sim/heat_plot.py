@@ -1,20 +1,204 @@
+import logging
+import os
+from contextlib import nullcontext
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 from matplotlib.widgets import Button
 from matplotlib.collections import LineCollection
 from matplotlib import cm
-from heat_core import setup_matrices, compute_next_u, initialize_u
+from matplotlib.colors import Normalize
+from matplotlib.transforms import IdentityTransform
+from heat_core import Ensemble, make_solver, initialize_u, settling_rate, face_diffusivity, precision_dtypes
+from heat_io import TrajectoryWriter
+from heat_spectral import SpectralSolver
+from heat_stats import SimStats
+from heat_playback import FrameProducer, Playback
+from heat_cache import CachedRun, default_cache
 
-def run_plot(L, alpha, f, back_callback, bc_type='neumann', bc_params=None, title_suffix=''):
-    nx = 101
+def _plot_stats(stats, overlay, interval):
+    # HEAT_SIM_STATS=1 turns instrumentation on for GUI launches: overlay plus a log line every 5 s
+    if stats is None and os.environ.get('HEAT_SIM_STATS'):
+        logging.basicConfig(level=logging.INFO)
+        stats = SimStats(log_every=5.0)
+        overlay = True
+    if stats is not None and stats.requested_fps is None:
+        stats.requested_fps = 1000 / interval
+    return stats, overlay
+
+def _cached_run(use_cache, spec, u, every):
+    # Only runs whose initial profile came from parse_initial_condition can be keyed by value
+    cache = default_cache() if use_cache else None
+    if cache is None or spec is None:
+        return None
+    return CachedRun(cache, spec, u, every)
+
+def _rod_spec(L, alpha, f, bc_type, bc_params, nx):
+    source = getattr(f, 'source', None)
+    if source is None or callable(alpha):
+        return None
+    return {'L': L, 'alpha': alpha, 'init': source, 'bc_type': bc_type, 'bc_params': bc_params, 'nx': nx}
+
+def _add_overlay(ax):
+    return ax.text(0.01, 0.98, '', transform=ax.transAxes, va='top', family='monospace', fontsize=8)
+
+def _add_status(ax):
+    # Playback clock; space pauses, left/right scrub, up/down change speed, home/end jump
+    return ax.text(0.99, 0.02, '', transform=ax.transAxes, ha='right', va='bottom', fontsize=8, color='#455A64')
+
+class RodLine:
+    """Coloured line of a rod whose frames are drawn without allocating.
+
+    The (n-1, 2, 2) segments buffer is built once and handed to the
+    LineCollection, whose paths are views into it; x never changes, so a frame
+    only writes y-coordinates and colours in place. Grids with more nodes than
+    max_points are decimated: each bucket of nodes is drawn as its min and max
+    in the order they occur, so spikes narrower than a pixel stay visible and
+    the frame cost no longer grows with nx.
+    """
+
+    def __init__(self, ax, x, u, max_points=None, **kwargs):
+        x = np.asarray(x, dtype=float)
+        nx = len(x)
+        if max_points is None:
+            # two points per pixel column of the axes
+            max_points = 2 * max(int(ax.bbox.width), 1)
+        if nx <= max_points:
+            self._starts = None
+            px = x
+        else:
+            n_buckets = max_points // 2
+            self._starts = np.linspace(0, nx, n_buckets + 1).astype(np.intp)[:-1]
+            self._ends = np.append(self._starts[1:], nx) - 1
+            # Reductions run in the state's own precision (float32 runs and trajectories)
+            dtype = np.asarray(u).dtype if np.asarray(u).dtype.kind == 'f' else float
+            self._lo = np.empty(n_buckets, dtype=dtype)
+            self._hi = np.empty(n_buckets, dtype=dtype)
+            self._first = np.empty(n_buckets, dtype=dtype)
+            self._last = np.empty(n_buckets, dtype=dtype)
+            self._rising = np.empty(n_buckets, dtype=bool)
+            px = np.empty(2 * n_buckets)
+            px[0::2] = x[self._starts]
+            px[1::2] = x[self._ends]
+        self._py = np.empty(len(px))
+        self.segments = np.empty((len(px) - 1, 2, 2))
+        self.segments[:, 0, 0] = px[:-1]
+        self.segments[:, 1, 0] = px[1:]
+        self._fill(u)
+        self.lc = LineCollection(self.segments, **kwargs)
+        self.lc.set_array(self._py[:-1])
+        # set_array keeps its own copy; colours are written straight into it
+        self._colors = self.lc.get_array()
+        ax.add_collection(self.lc)
+
+    def _fill(self, u):
+        if self._starts is None:
+            self._py[...] = u
+        else:
+            self._decimate(u)
+        self.segments[:, 0, 1] = self._py[:-1]
+        self.segments[:, 1, 1] = self._py[1:]
+
+    def _decimate(self, u):
+        u = np.asarray(u, dtype=self._lo.dtype)
+        np.minimum.reduceat(u, self._starts, out=self._lo)
+        np.maximum.reduceat(u, self._starts, out=self._hi)
+        np.take(u, self._starts, out=self._first)
+        np.take(u, self._ends, out=self._last)
+        np.less_equal(self._first, self._last, out=self._rising)
+        first, second = self._py[0::2], self._py[1::2]
+        np.copyto(first, self._hi)
+        np.copyto(first, self._lo, where=self._rising)
+        np.copyto(second, self._lo)
+        np.copyto(second, self._hi, where=self._rising)
+
+    def update(self, u):
+        """Show the profile u; returns the artist for blitting."""
+        self._fill(u)
+        self._colors[...] = self._py[:-1]
+        self.lc.stale = True
+        return self.lc
+
+def run_plot(L, alpha, f, back_callback, bc_type='neumann', bc_params=None, title_suffix='', solver='banded',
+             record_path=None, steady_tol=1e-4, nx=101, show=True, stats=None, stats_overlay=False,
+             threaded=True, precision='float64', use_cache=True):
+    """Animate one rod; with show=False return (fig, update) instead of opening the window.
+
+    alpha may also be a list of (metal or alpha, length) segments or a function
+    alpha(x), for composite rods (see heat_core.face_diffusivity). precision
+    ('float64', 'float32' or 'mixed') applies to the banded solver.
+
+    The solver runs in a background thread (threaded=False computes frames on
+    demand inside update instead). stats (a heat_stats.SimStats) times the
+    phases of every frame callback; stats_overlay also prints its summary
+    line on the plot.
+
+    record_path, if given, receives every computed frame as a trajectory
+    (heat_io.TrajectoryWriter). There is no frame cap: the files grow until
+    the rod settles or the window closes, about nx values per frame.
+    """
     dx = L / (nx - 1)
     x = np.linspace(0, L, nx)
-    u = initialize_u(x, f, bc_type, bc_params)
+    state_dtype = precision_dtypes(precision)[0] if solver == 'banded' else float
+    u = initialize_u(x, f, bc_type, bc_params, dtype=state_dtype)
+    spec = _rod_spec(L, alpha, f, bc_type, bc_params, nx)
+    kappa = None
+    if callable(alpha) or np.ndim(alpha) > 0:
+        # Composite or varying rod: dt follows the fastest material
+        if solver == 'spectral':
+            raise ValueError("The spectral solver needs a constant alpha")
+        alpha_face = face_diffusivity(x, alpha)
+        alpha = alpha_face.max()
+        kappa = alpha_face / alpha
+        # Diffusion time of the rod as a whole: L^2 over its series-mean alpha
+        time_scale = L * np.sum(dx / alpha_face)
+    else:
+        time_scale = L**2 / alpha
     sigma = 0.5
     dt = sigma * dx**2 / alpha
     r = alpha * dt / dx**2
-    M_imp, M_exp = setup_matrices(nx, r, bc_type)
+    if solver == 'spectral':
+        spectral = SpectralSolver(x, u, alpha, bc_type, bc_params, dt=dt)
+        advance = lambda v, n_steps: spectral.advance(v, n_steps, out=v)
+    else:
+        advance = make_solver(nx, r, bc_type, bc_params, solver, kappa, precision)
+    steps_per_frame = 10
+    # Frames the recording has room for at first; it doubles whenever it fills up
+    num_frames = 200
+    if spec is not None:
+        spec.update(kind='rod', solver=solver, precision=precision)
+    cached = _cached_run(use_cache, spec, u, steps_per_frame)
+    if cached is not None:
+        advance = cached.wrap(advance)
+    interval = 50
+    stats, stats_overlay = _plot_stats(stats, stats_overlay, interval)
+    phase = stats.phase if stats is not None else (lambda name: nullcontext())
+    
+    # Optional trajectory recording, one snapshot per computed frame. The producer
+    # runs until equilibrium (or the window closes), so the files grow as needed
+    writer = None
+    record = None
+    if record_path is not None:
+        writer = TrajectoryWriter(record_path, x, num_frames + 1, dtype=u.dtype, grow=True,
+                                  meta={'L': L, 'alpha': alpha, 'bc_type': bc_type, 'bc_params': bc_params,
+                                        'dt': dt, 'stride': steps_per_frame})
+        writer.append(0.0, u)
+        def append_frame(t, v):
+            if writer.u is not None:
+                writer.append(t, v)
+        record = append_frame
+    
+    # Equilibrium monitoring: the producer stops once the profile has stopped changing
+    spread = max(np.ptp(u), 1e-12)
+    until = None
+    if steady_tol:
+        until = lambda v, v_prev, t: settling_rate(v, v_prev, steps_per_frame * dt, time_scale, spread) <= steady_tol
+    
+    # The solver runs ahead in a background thread; the animation plays the buffer
+    producer = FrameProducer(advance, u, dt, steps_per_frame, until=until, on_frame=record, stats=stats,
+                             threaded=threaded)
+    playback = Playback(producer)
+    shown = u.copy()
     
     # Plot
     fig, ax = plt.subplots(figsize=(9, 5))
@@ -29,11 +213,10 @@ def run_plot(L, alpha, f, back_callback, bc_type='neumann', bc_params=None, titl
     # Gradient-colored line
     norm = plt.Normalize(global_min, global_max)
     cmap = cm.jet
-    points = np.array([x, u]).T.reshape(-1, 1, 2)
-    segments = np.concatenate([points[:-1], points[1:]], axis=1)
-    lc = LineCollection(segments, cmap=cmap, norm=norm, linewidth=3)
-    lc.set_array(u)
-    ax.add_collection(lc)
+    line = RodLine(ax, x, u, cmap=cmap, norm=norm, linewidth=3)
+    lc = line.lc
+    overlay = _add_overlay(ax) if stats_overlay else None
+    status = _add_status(ax)
     
     # Colorbar
     cb = fig.colorbar(lc, ax=ax, pad=0.1)
@@ -55,100 +238,219 @@ def run_plot(L, alpha, f, back_callback, bc_type='neumann', bc_params=None, titl
         back_callback()
     
     back_btn.on_clicked(on_back_click)
+    fig.canvas.mpl_connect('key_press_event', playback.on_key)
     
-    # Animation
-    steps_per_frame = 10
-    num_frames = 200
+    def on_close(event):
+        ani.event_source.stop()
+        producer.close()
+        if writer is not None:
+            writer.close()
+        if cached is not None:
+            cached.save()
+    fig.canvas.mpl_connect('close_event', on_close)
     
+    # Animation
+    equilibrium_shown = False
     def update(frame):
-        nonlocal u
-        for _ in range(steps_per_frame):
-            u = compute_next_u(u, M_imp, M_exp)
-            if bc_type == 'dirichlet':
-                u[0] = bc_params['left']
-                u[-1] = bc_params['right']
-        points = np.array([x, u]).T.reshape(-1, 1, 2)
-        segments = np.concatenate([points[:-1], points[1:]], axis=1)
-        lc.set_segments(segments)
-        lc.set_array(u)
-        return lc,
+        nonlocal equilibrium_shown
+        if stats is not None:
+            stats.begin_frame()
+        with phase('monitor'):
+            t = producer.read(playback.tick(), shown)
+            status.set_text(playback.status(t))
+            if playback.at_end and steady_tol and not equilibrium_shown:
+                equilibrium_shown = True
+                ax.set_title(ax.get_title() + f'\nEquilibrium reached at t = {t:.4g} s')
+                fig.canvas.draw_idle()
+        with phase('segments'):
+            line.update(shown)
+        if stats is None:
+            return lc, status
+        stats.end_frame()
+        if overlay is None:
+            return lc, status
+        overlay.set_text(stats.format(sep='\n'))
+        return lc, status, overlay
     
-    ani = FuncAnimation(fig, update, frames=num_frames, interval=50, blit=True)
+    ani = FuncAnimation(fig, update, interval=interval, blit=True, cache_frame_data=False)
     plt.tight_layout()
+    producer.start()
+    if not show:
+        # Headless use (benchmarks): the caller drives update() itself
+        return fig, update
     plt.show()
+    on_close(None)
 
 
-def run_dual_plots(L1, alpha1, f1, metal1, L2, alpha2, f2, metal2, back_callback, bc_type1='neumann', bc_params1=None, bc_type2='neumann', bc_params2=None):
-    """Run two simulations side-by-side in the same window"""
-    
-    # Setup for left simulation
-    nx1 = 101
-    dx1 = L1 / (nx1 - 1)
-    x1 = np.linspace(0, L1, nx1)
-    u1 = initialize_u(x1, f1, bc_type1, bc_params1)
-    sigma1 = 0.5
-    dt1 = sigma1 * dx1**2 / alpha1
-    r1 = alpha1 * dt1 / dx1**2
-    M_imp1, M_exp1 = setup_matrices(nx1, r1, bc_type1)
-    
-    # Setup for right simulation
-    nx2 = 101
-    dx2 = L2 / (nx2 - 1)
-    x2 = np.linspace(0, L2, nx2)
-    u2 = initialize_u(x2, f2, bc_type2, bc_params2)
-    sigma2 = 0.5
-    dt2 = sigma2 * dx2**2 / alpha2
-    r2 = alpha2 * dt2 / dx2**2
-    M_imp2, M_exp2 = setup_matrices(nx2, r2, bc_type2)
-    
-    # Create single figure with 2 subplots side-by-side
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 5))
+class PanelLines:
+    """The rods of all panels of a figure drawn as one LineCollection in pixels.
+
+    Every panel keeps a hidden RodLine, which decimates its profile and backs
+    its colourbar; its segments are mapped through the panel's data-to-pixel
+    scaling into one shared buffer, and its colours through its own norm
+    onto [0, 1]. A frame therefore draws a single artist however many panels
+    there are. relayout() refreshes the scalings after the figure is redrawn.
+    """
+
+    def __init__(self, fig, lines, cmap, **kwargs):
+        self._lines = lines
+        ends = np.cumsum([len(line.segments) for line in lines])
+        self._slices = [slice(start, end) for start, end in zip(np.append(0, ends[:-1]), ends)]
+        self.segments = np.zeros((ends[-1], 2, 2))
+        self._scales = [None] * len(lines)
+        for line in lines:
+            line.lc.set_visible(False)
+        self.lc = LineCollection(self.segments, transform=IdentityTransform(), cmap=cmap, norm=Normalize(0, 1),
+                                 animated=True, **kwargs)
+        self.lc.set_array(np.zeros(ends[-1]))
+        self._colors = self.lc.get_array()
+        fig.add_artist(self.lc)
+
+    def relayout(self):
+        for i, line in enumerate(self._lines):
+            origin, unit = line.lc.axes.transData.transform([[0, 0], [1, 1]])
+            self._scales[i] = (unit - origin, origin)
+            self._place(i)
+
+    def _place(self, i):
+        line, block = self._lines[i], self.segments[self._slices[i]]
+        (scale, offset), norm = self._scales[i], line.lc.norm
+        np.multiply(line.segments, scale, out=block)
+        block += offset
+        colors = self._colors[self._slices[i]]
+        np.subtract(line.lc.get_array(), norm.vmin, out=colors)
+        colors /= max(norm.vmax - norm.vmin, 1e-12)
+
+    def update(self, U):
+        """Show profile U[i] in panel i; returns the artist for blitting."""
+        for i, line in enumerate(self._lines):
+            line.update(U[i])
+            if self._scales[i] is not None:
+                self._place(i)
+        self.lc.stale = True
+        return self.lc
+
+class Blitter:
+    """Redraws the animated artists of a whole figure over one cached background.
+
+    The background (everything not animated: axes, labels, colourbars) is
+    copied once per full draw of the figure and shared by all panels. A frame
+    restores it, draws the artists and blits the figure once. on_draw runs
+    before the copy, e.g. to follow a resize.
+    """
+
+    def __init__(self, fig, artists, on_draw=None):
+        self.fig = fig
+        self.artists = list(artists)
+        for artist in self.artists:
+            artist.set_animated(True)
+        self._on_draw = on_draw
+        self._background = None
+        fig.canvas.mpl_connect('draw_event', self._capture)
+
+    def _capture(self, event):
+        if self._on_draw is not None:
+            self._on_draw()
+        self._background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_artists()
+
+    def _draw_artists(self):
+        for artist in self.artists:
+            self.fig.draw_artist(artist)
+
+    def frame(self):
+        canvas = self.fig.canvas
+        if self._background is None:
+            # The first full draw captures the background
+            canvas.draw()
+            return
+        canvas.restore_region(self._background)
+        self._draw_artists()
+        canvas.blit(self.fig.bbox)
+
+def panel_grid(n):
+    """(rows, cols) for n panels, as square as possible."""
+    cols = int(np.ceil(np.sqrt(n)))
+    return -(-n // cols), cols
+
+def run_comparison(rods, back_callback, steady_tol=1e-4, nx=101, stats=None, stats_overlay=False, threaded=True,
+                   show=True, precision='float64', use_cache=True):
+    """Animate several rods in a grid of panels on one clock; with show=False return (fig, update).
+
+    rods is a list of dicts with L, alpha and f (as for run_plot) and
+    optionally name (shown with alpha in the panel title), bc_type and
+    bc_params. All rods advance as one Ensemble with a common dt, the one
+    sigma = 0.5 gives the fastest rod, so every panel shows the same time.
+    All panels are redrawn by a single blit over a shared background; the
+    other arguments are as in run_plot.
+    """
+    n = len(rods)
+    if n < 1:
+        raise ValueError("Compare at least one rod")
+    bc_types = [rod.get('bc_type', 'neumann') for rod in rods]
+    bc_params = [rod.get('bc_params') for rod in rods]
+    lengths = np.array([rod['L'] for rod in rods], dtype=float)
+    alphas = np.array([rod['alpha'] for rod in rods], dtype=float)
+    dt = 0.5 * np.min((lengths / (nx - 1))**2 / alphas)
+    ensemble = Ensemble(nx, alphas, lengths, bc_types, bc_params, dt=dt, precision=precision)
+    U = np.stack([initialize_u(x, rod['f'], bc, params)
+                  for x, rod, bc, params in zip(ensemble.x, rods, bc_types, bc_params)]).astype(ensemble.dtype)
+    steps_per_frame = 10
+    interval = 50
+    advance = lambda V, k: ensemble.advance(V, k, out=V)
+    specs = [_rod_spec(rod['L'], rod['alpha'], rod['f'], bc, params, nx)
+             for rod, bc, params in zip(rods, bc_types, bc_params)]
+    cached = _cached_run(use_cache, None if None in specs else {'kind': 'panels', 'rods': specs, 'dt': dt,
+                                                                 'precision': precision}, U, steps_per_frame)
+    if cached is not None:
+        advance = cached.wrap(advance)
+    stats, stats_overlay = _plot_stats(stats, stats_overlay, interval)
+    phase = stats.phase if stats is not None else (lambda name: nullcontext())
+
+    # Equilibrium monitoring per rod; the producer stops once all have settled
+    spread = np.maximum(np.ptp(U, axis=1), 1e-12)
+    time_scale = ensemble.L**2 / ensemble.alpha
+    eq_time = [None] * n
+    def until(V, V_prev, t):
+        rate = settling_rate(V, V_prev, steps_per_frame * dt, time_scale, spread)
+        for i in range(n):
+            if eq_time[i] is None and rate[i] <= steady_tol:
+                eq_time[i] = t
+        return None not in eq_time
+
+    producer = FrameProducer(advance, U, dt, steps_per_frame,
+                             until=until if steady_tol else None, stats=stats, threaded=threaded)
+    playback = Playback(producer)
+    shown = U.copy()
+    eq_shown = [False] * n
+
+    rows, cols = panel_grid(n)
+    fig = plt.figure(figsize=(min(8 * cols, 16), min(5 * rows, 10)))
     fig.suptitle('Heat Distribution Comparison', fontsize=14, fontweight='bold')
-    
-    # Setup left subplot
-    ax1.set_xlim(0, L1)
-    global_min1 = np.min(u1)
-    global_max1 = np.max(u1)
-    ax1.set_ylim(global_min1 - 1, global_max1 + 1)
-    ax1.set_xlabel('Position (x)', fontsize=10)
-    ax1.set_ylabel('Temperature (u(x,t))', fontsize=10)
-    ax1.set_title(f'{metal1.capitalize()} (α={alpha1:.2e} m²/s, {bc_type1.capitalize()})', fontsize=11, fontweight='bold')
-    
-    norm1 = plt.Normalize(global_min1, global_max1)
-    cmap1 = cm.jet
-    points1 = np.array([x1, u1]).T.reshape(-1, 1, 2)
-    segments1 = np.concatenate([points1[:-1], points1[1:]], axis=1)
-    lc1 = LineCollection(segments1, cmap=cmap1, norm=norm1, linewidth=3)
-    lc1.set_array(u1)
-    ax1.add_collection(lc1)
-    
-    # Colorbar for left plot
-    cb1 = fig.colorbar(lc1, ax=ax1, pad=0.02, fraction=0.046)
-    cb1.set_label('Temperature', fontsize=9)
-    
-    # Setup right subplot
-    ax2.set_xlim(0, L2)
-    global_min2 = np.min(u2)
-    global_max2 = np.max(u2)
-    ax2.set_ylim(global_min2 - 1, global_max2 + 1)
-    ax2.set_xlabel('Position (x)', fontsize=10)
-    ax2.set_ylabel('Temperature (u(x,t))', fontsize=10)
-    ax2.set_title(f'{metal2.capitalize()} (α={alpha2:.2e} m²/s, {bc_type2.capitalize()})', fontsize=11, fontweight='bold')
-    
-    norm2 = plt.Normalize(global_min2, global_max2)
-    cmap2 = cm.jet
-    points2 = np.array([x2, u2]).T.reshape(-1, 1, 2)
-    segments2 = np.concatenate([points2[:-1], points2[1:]], axis=1)
-    lc2 = LineCollection(segments2, cmap=cmap2, norm=norm2, linewidth=3)
-    lc2.set_array(u2)
-    ax2.add_collection(lc2)
-    
-    # Colorbar for right plot
-    cb2 = fig.colorbar(lc2, ax=ax2, pad=0.02, fraction=0.046)
-    cb2.set_label('Temperature', fontsize=9)
-    
+    fontsize = 11 if cols <= 2 else 9
+    axes, lines = [], []
+    for i, rod in enumerate(rods):
+        ax = fig.add_subplot(rows, cols, i + 1)
+        lo, hi = np.min(shown[i]), np.max(shown[i])
+        ax.set_xlim(0, rod['L'])
+        ax.set_ylim(lo - 1, hi + 1)
+        ax.set_xlabel('Position (x)', fontsize=fontsize - 1)
+        ax.set_ylabel('Temperature (u(x,t))', fontsize=fontsize - 1)
+        name = str(rod.get('name', '')).capitalize()
+        ax.set_title(f"{name} (α={rod['alpha']:.2e} m²/s, {bc_types[i].capitalize()})".strip(),
+                     fontsize=fontsize, fontweight='bold')
+        line = RodLine(ax, ensemble.x[i], shown[i], cmap=cm.jet, norm=plt.Normalize(lo, hi), linewidth=3)
+        fig.colorbar(line.lc, ax=ax, pad=0.02, fraction=0.046).set_label('Temperature', fontsize=fontsize - 2)
+        axes.append(ax)
+        lines.append(line)
+    panel_lines = PanelLines(fig, lines, cm.jet, linewidth=3)
+    status = fig.text(0.99, 0.01, '', ha='right', va='bottom', fontsize=9, color='#455A64')
+    overlay = _add_overlay(axes[0]) if stats_overlay else None
+    blitter = Blitter(fig, [panel_lines.lc, status] + ([overlay] if overlay is not None else []),
+                      on_draw=panel_lines.relayout)
+
     # Back button (centered at bottom)
-    btn_ax = fig.add_axes([0.44, 0.02, 0.12, 0.04], facecolor='#37474F')
+    btn_ax = fig.add_axes([0.44, 0.01, 0.12, 0.04], facecolor='#37474F')
     back_btn = Button(btn_ax, 'Back to Input', color='#37474F', hovercolor='#455A64')
     for spine in btn_ax.spines.values():
         spine.set_color('#78909C')
@@ -156,45 +458,55 @@ def run_dual_plots(L1, alpha1, f1, metal1, L2, alpha2, f2, metal2, back_callback
     back_btn.label.set_color('white')
     back_btn.label.set_fontsize(10)
     back_btn.label.set_fontweight('bold')
-    
+
     def on_back_click(event):
         plt.close(fig)
         back_callback()
-    
+
     back_btn.on_clicked(on_back_click)
-    
-    # Animation for both plots
-    steps_per_frame = 10
-    num_frames = 200
-    
+    fig.canvas.mpl_connect('key_press_event', playback.on_key)
+
     def update(frame):
-        nonlocal u1, u2
-        
-        # Update left simulation
-        for _ in range(steps_per_frame):
-            u1 = compute_next_u(u1, M_imp1, M_exp1)
-            if bc_type1 == 'dirichlet':
-                u1[0] = bc_params1['left']
-                u1[-1] = bc_params1['right']
-        points1 = np.array([x1, u1]).T.reshape(-1, 1, 2)
-        segments1 = np.concatenate([points1[:-1], points1[1:]], axis=1)
-        lc1.set_segments(segments1)
-        lc1.set_array(u1)
-        
-        # Update right simulation
-        for _ in range(steps_per_frame):
-            u2 = compute_next_u(u2, M_imp2, M_exp2)
-            if bc_type2 == 'dirichlet':
-                u2[0] = bc_params2['left']
-                u2[-1] = bc_params2['right']
-        points2 = np.array([x2, u2]).T.reshape(-1, 1, 2)
-        segments2 = np.concatenate([points2[:-1], points2[1:]], axis=1)
-        lc2.set_segments(segments2)
-        lc2.set_array(u2)
-        
-        return lc1, lc2
-    
-    ani = FuncAnimation(fig, update, frames=num_frames, interval=50, blit=True)
-    
-    plt.tight_layout(rect=[0, 0.06, 1, 0.96])
-    plt.show()
\ No newline at end of file
+        if stats is not None:
+            stats.begin_frame()
+        with phase('monitor'):
+            t = producer.read(playback.tick(), shown)
+            status.set_text(playback.status(t))
+            for i, ax in enumerate(axes):
+                if eq_time[i] is not None and t >= eq_time[i] and not eq_shown[i]:
+                    eq_shown[i] = True
+                    ax.set_title(ax.get_title() + f'\nEquilibrium at t = {eq_time[i]:.4g} s',
+                                 fontsize=fontsize, fontweight='bold')
+                    fig.canvas.draw_idle()
+        with phase('segments'):
+            panel_lines.update(shown)
+        if stats is not None:
+            stats.end_frame()
+            if overlay is not None:
+                overlay.set_text(stats.format(sep='\n'))
+        blitter.frame()
+
+    timer = fig.canvas.new_timer(interval=interval)
+    timer.add_callback(update, None)
+
+    def on_close(event):
+        timer.stop()
+        producer.close()
+        if cached is not None:
+            cached.save()
+    fig.canvas.mpl_connect('close_event', on_close)
+
+    fig.tight_layout(rect=[0, 0.06, 1, 0.96])
+    producer.start()
+    if not show:
+        return fig, update
+    timer.start()
+    plt.show()
+    on_close(None)
+
+def run_dual_plots(L1, alpha1, f1, metal1, L2, alpha2, f2, metal2, back_callback, bc_type1='neumann', bc_params1=None, bc_type2='neumann', bc_params2=None, steady_tol=1e-4, stats=None, stats_overlay=False, threaded=True, show=True, precision='float64', use_cache=True):
+    """Run two simulations side-by-side in the same window (see run_comparison)"""
+    rods = [{'L': L1, 'alpha': alpha1, 'f': f1, 'name': metal1, 'bc_type': bc_type1, 'bc_params': bc_params1},
+            {'L': L2, 'alpha': alpha2, 'f': f2, 'name': metal2, 'bc_type': bc_type2, 'bc_params': bc_params2}]
+    return run_comparison(rods, back_callback, steady_tol=steady_tol, stats=stats, stats_overlay=stats_overlay,
+                          threaded=threaded, show=show, precision=precision, use_cache=use_cache)
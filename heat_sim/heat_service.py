@@ -0,0 +1,392 @@
+# heat_service.py
+# Local simulation server: POST a job (the same tables as a job file) as JSON
+# and read its snapshots back as newline-delimited JSON while they are computed.
+# Worker processes are started up front with NumPy, SciPy and sympy imported.
+# Requests arriving within a few milliseconds of each other on the same grid
+# are coalesced into one Ensemble solve.
+import http.client
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+import numpy as np
+from heat_core import metals, Ensemble, parse_initial_condition, initialize_u, precision_dtypes
+from heat_io import probe_weights
+from heat_cli import build_job
+
+# Job keys the service ignores: it never writes files
+_FILE_KEYS = ('output', 'trajectory', 'checkpoint', 'checkpoint_every', 'cache')
+
+def check_job(job):
+    """Reject jobs a batched fixed-step solve cannot run, or whose init does not parse."""
+    if job['solver'] != 'cn' or job['adaptive'] or job['mesh'] != 'uniform':
+        raise ValueError("The service runs the fixed-step 'cn' solver on a uniform mesh")
+    if job['segments'] is not None:
+        raise ValueError("Composite rods are not batched by the service")
+    if job['steady_tol'] is not None:
+        raise ValueError("steady_tol is not supported by the service; give steps")
+    if job['probes'] is not None:
+        probe_weights(np.linspace(0, job['L'], job['nx']), job['probes'])
+    # Parse here, so a bad expression is this request's 400 and never reaches a shared batch
+    try:
+        parse_initial_condition(job['init'], job['L'])
+    except Exception as e:
+        raise ValueError(f"init '{job['init']}': {e}") from e
+    return {k: v for k, v in job.items() if k not in _FILE_KEYS}
+
+def batch_key(job):
+    """Jobs with equal keys advance together as one ensemble."""
+    return job['nx'], job['precision'], job['stride']
+
+# Result queue of this worker process, set by _warm_worker
+_results = None
+
+def _warm_worker(results):
+    global _results
+    _results = results
+    # Pay for the imports and the first parse before any request arrives
+    import sympy  # noqa: F401
+    parse_initial_condition('sin(pi * x / L)', 1.0)
+
+def _ping():
+    return True
+
+def _solve_batch(ids, jobs):
+    """Advance jobs as one Ensemble, posting every stride-th state to the result queue.
+
+    Messages are ('frame', ids, times, rows) for the members still running,
+    ('done', ids) as members reach their step count and ('error', ids, text)
+    for a member that cannot start; finished and failed members leave the
+    system.
+    """
+    nx, precision, stride = batch_key(jobs[0])
+    # Set up every member on its own, so one bad member fails alone
+    starts, kept = [], []
+    for rid, j in zip(ids, jobs):
+        try:
+            x = j['L'] * np.linspace(0, 1, nx)  # as Ensemble.x
+            starts.append(initialize_u(x, parse_initial_condition(j['init'], j['L']), j['bc_type'], j['bc_params'],
+                                       dtype=precision_dtypes(precision)[0]))
+            kept.append((rid, j))
+        except Exception as e:
+            _results.put(('error', [rid], f"{type(e).__name__}: {e}"))
+    if not kept:
+        return 0
+    ids, jobs = [rid for rid, _ in kept], [j for _, j in kept]
+    ensemble = Ensemble(nx, [j['alpha'] for j in jobs], [j['L'] for j in jobs],
+                        [j['bc_type'] for j in jobs], [j['bc_params'] for j in jobs],
+                        dt=[j['dt'] for j in jobs], precision=precision)
+    U = np.stack(starts)
+    probes = [None if j['probes'] is None else probe_weights(x, j['probes']) for x, j in zip(ensemble.x, jobs)]
+    ids = np.asarray(ids)
+    steps = np.array([j['steps'] for j in jobs])
+    dt = ensemble.dt
+    active = np.arange(len(jobs))
+
+    def post(done):
+        rows = []
+        for i, m in enumerate(active):
+            if probes[m] is None:
+                rows.append(U[i].astype(float))
+            else:
+                idx, w = probes[m]
+                rows.append((1 - w) * U[i, idx] + w * U[i, idx + 1])
+        _results.put(('frame', ids[active].tolist(), (done * dt[active]).tolist(), rows))
+
+    done = 0
+    post(done)
+    while active.size:
+        k = min(stride, steps[active].min() - done)
+        ensemble.advance(U, k, out=U)
+        done += k
+        post(done)
+        finished = steps[active] <= done
+        if finished.any():
+            _results.put(('done', ids[active[finished]].tolist()))
+            keep = np.flatnonzero(~finished)
+            active = active[keep]
+            if active.size:
+                U = np.ascontiguousarray(U[keep])
+                ensemble = ensemble.subset(keep)
+    return len(jobs)
+
+class SimulationService:
+    """Worker pool plus the threads that coalesce requests and route their results.
+
+    submit(job) returns a queue.Queue that receives ('batch', size), then
+    ('frame', t, row) per snapshot, and finally ('done', None) or
+    ('error', message). Requests are gathered for window seconds (or until
+    max_batch) and grouped by batch_key; a group is handed to the pool only
+    when a worker is free, and until then later requests join it.
+    """
+
+    def __init__(self, workers=None, window=0.005, max_batch=64):
+        self.window = window
+        self.max_batch = max_batch
+        self._results = multiprocessing.Queue()
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker,
+                                         initargs=(self._results,))
+        # Start every worker now, so no request pays for a process launch or an import
+        for f in [self._pool.submit(_ping) for _ in range(self.workers)]:
+            f.result()
+        # check_job parses every init in this process too
+        parse_initial_condition('sin(pi * x / L)', 1.0)
+        self._incoming = queue.Queue()
+        # One slot per worker: a batch is only formed when a worker can start it
+        self._slots = threading.Semaphore(self.workers)
+        self._routes = {}
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self.batches = 0
+        self.coalesced = 0
+        self._closed = False
+        self._threads = [threading.Thread(target=self._batch_loop, name='heat-batcher', daemon=True),
+                         threading.Thread(target=self._route_loop, name='heat-router', daemon=True)]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, job):
+        out = queue.Queue()
+        with self._lock:
+            rid = self._next_id
+            self._next_id += 1
+            self._routes[rid] = out
+        self._incoming.put((rid, job))
+        return out
+
+    def _batch_loop(self):
+        groups, deadline = {}, None
+        while not self._closed:
+            try:
+                rid, job = self._incoming.get(timeout=0.001 if groups else 0.1)
+                if not groups:
+                    deadline = time.perf_counter() + self.window
+                groups.setdefault(batch_key(job), []).append((rid, job))
+            except queue.Empty:
+                pass
+            if not groups:
+                continue
+            # Once the window is over (or a group is full) a free worker takes the largest group.
+            # While every worker is busy, new requests keep joining the groups that wait.
+            key = max(groups, key=lambda k: len(groups[k]))
+            ready = time.perf_counter() >= deadline or len(groups[key]) >= self.max_batch
+            if not ready or not self._slots.acquire(blocking=False):
+                continue
+            members, rest = groups[key][:self.max_batch], groups[key][self.max_batch:]
+            if rest:
+                groups[key] = rest
+            else:
+                del groups[key]
+            ids = [rid for rid, _ in members]
+            for rid in ids:
+                self._send(rid, ('batch', len(ids)))
+            self.batches += 1
+            self.coalesced += len(ids)
+            future = self._pool.submit(_solve_batch, ids, [job for _, job in members])
+            future.add_done_callback(lambda f, ids=ids: self._finished(f, ids))
+
+    def _finished(self, future, ids):
+        self._slots.release()
+        self._failed(future, ids)
+
+    def _failed(self, future, ids):
+        exc = future.exception()
+        if exc is not None:
+            for rid in ids:
+                self._send(rid, ('error', f"{type(exc).__name__}: {exc}"), last=True)
+
+    def _send(self, rid, message, last=False):
+        with self._lock:
+            out = self._routes.pop(rid, None) if last else self._routes.get(rid)
+        if out is not None:
+            out.put(message)
+
+    def _route_loop(self):
+        while True:
+            message = self._results.get()
+            if message is None:
+                return
+            if message[0] == 'frame':
+                _, ids, times, rows = message
+                for rid, t, row in zip(ids, times, rows):
+                    self._send(rid, ('frame', t, row))
+            elif message[0] == 'error':
+                _, ids, text = message
+                for rid in ids:
+                    self._send(rid, ('error', text), last=True)
+            else:
+                for rid in message[1]:
+                    self._send(rid, ('done', None), last=True)
+
+    def close(self):
+        self._closed = True
+        self._pool.shutdown()
+        self._results.put(None)
+        for t in self._threads:
+            t.join()
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Bursts of clients queue in the listen backlog instead of being refused
+    request_queue_size = 256
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _chunk(self, obj):
+        data = json.dumps(obj).encode() + b'\n'
+        self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+
+    def do_GET(self):
+        service = self.server.service
+        if self.path == '/health':
+            self._reply(200, {'workers': service.workers, 'batches': service.batches,
+                              'requests': service.coalesced})
+        else:
+            self._reply(404, {'error': 'not found'})
+
+    def do_POST(self):
+        if self.path != '/simulate':
+            self._reply(404, {'error': 'not found'})
+            return
+        try:
+            cfg = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            if not isinstance(cfg, dict) or not all(isinstance(cfg.get(k, {}), dict) for k in ('rod', 'grid', 'run')):
+                raise ValueError("The body must be a JSON object of rod, grid and run tables")
+            job = check_job(build_job(cfg))
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            self._reply(400, {'error': str(e)})
+            return
+        results = self.server.service.submit(job)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        x = job['probes'] if job['probes'] is not None else np.linspace(0, job['L'], job['nx']).tolist()
+        self._chunk({'x': x, 'dt': job['dt'], 'steps': job['steps'], 'stride': job['stride']})
+        while True:
+            kind, *payload = results.get()
+            if kind == 'batch':
+                self._chunk({'batch': payload[0]})
+            elif kind == 'frame':
+                self._chunk({'t': payload[0], 'u': payload[1].tolist()})
+            elif kind == 'error':
+                self._chunk({'error': payload[0]})
+                break
+            else:
+                self._chunk({'done': True})
+                break
+        self.wfile.write(b'0\r\n\r\n')
+
+def serve(host='127.0.0.1', port=8765, workers=None, window=0.005, max_batch=64):
+    """Run the service until interrupted.
+
+    POST /simulate with a job config ({"rod": ..., "grid": ..., "run": ...})
+    streams one JSON line with x, then {"batch": n}, then {"t", "u"} per
+    snapshot and {"done": true}; GET /health reports the counters.
+    """
+    service = SimulationService(workers, window, max_batch)
+    server = _Server((host, port), _Handler)
+    server.service = service
+    print(f"serving on http://{host}:{server.server_port} ({service.workers} workers)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+def request(url, cfg, timeout=60):
+    """POST one job and return (lines, seconds to the first snapshot, seconds in total)."""
+    parts = urlsplit(url)
+    t0 = time.perf_counter()
+    conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=timeout)
+    try:
+        conn.request('POST', '/simulate', json.dumps(cfg), {'Content-Type': 'application/json'})
+        resp = conn.getresponse()
+        if resp.status != 200:
+            raise ValueError(json.loads(resp.read()).get('error', resp.reason))
+        lines, first = [], None
+        for raw in resp:
+            line = json.loads(raw)
+            if 'u' in line and first is None:
+                first = time.perf_counter() - t0
+            if 'error' in line:
+                raise ValueError(line['error'])
+            lines.append(line)
+    finally:
+        conn.close()
+    return lines, first, time.perf_counter() - t0
+
+def load_test(url, requests=200, concurrency=16, nx=101, steps=2000, stride=100):
+    """Fire requests jobs from concurrency client threads and summarise the latencies.
+
+    The jobs cycle through the metals and a few initial profiles on one grid,
+    so concurrent ones can be coalesced.
+    """
+    inits = ['sin(pi * x / L)', 'exp(-50 * (x / L - 0.5)**2)', 'x / L', '20 + 5 * cos(2 * pi * x / L)']
+    names = list(metals)
+    jobs = [{'rod': {'metal': names[i % len(names)], 'init': inits[i % len(inits)],
+                     'bc': 'dirichlet' if i % 3 == 0 else 'neumann'},
+             'grid': {'nx': nx}, 'run': {'steps': steps, 'stride': stride}} for i in range(requests)]
+    latencies, firsts, batches, errors = [], [], [], []
+    frames = 0
+    lock = threading.Lock()
+    todo = iter(jobs)
+
+    def client():
+        nonlocal frames
+        while True:
+            with lock:
+                cfg = next(todo, None)
+            if cfg is None:
+                return
+            try:
+                lines, first, total = request(url, cfg)
+            except (OSError, ValueError) as e:
+                with lock:
+                    errors.append(str(e))
+                continue
+            with lock:
+                latencies.append(total)
+                firsts.append(first)
+                frames += sum('u' in line for line in lines)
+                batches.extend(line['batch'] for line in lines if 'batch' in line)
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+    lat = np.array(latencies) if latencies else np.array([np.nan])
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'wall_s': wall,
+        'requests_per_s': len(latencies) / wall,
+        'snapshots_per_s': frames / wall,
+        'latency_p50_s': float(np.percentile(lat, 50)),
+        'latency_p99_s': float(np.percentile(lat, 99)),
+        'first_snapshot_p99_s': float(np.percentile(firsts, 99)) if firsts else float('nan'),
+        'mean_batch': float(np.mean(batches)) if batches else 0.0,
+    }
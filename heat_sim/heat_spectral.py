@@ -0,0 +1,70 @@
+# heat_spectral.py
+# Exact-in-time solver for constant alpha on a uniform grid.
+# Neumann ends expand u in cosines (DCT-I), Dirichlet ends expand u minus its linear
+# steady state in sines (DST-I); each mode then simply decays as exp(-alpha k^2 t).
+import numpy as np
+from scipy.fft import dct, idct, dst, idst
+
+class SpectralSolver:
+    """Jump-to-time solution of the heat equation from the sampled profile u0.
+
+    at(t) evaluates the state at any time (scalar or array of times) in
+    O(nx log nx) with no time stepping. advance(u, n_steps) mirrors
+    Stepper.advance for a fixed dt, so it can stand in for Crank-Nicolson.
+    """
+
+    def __init__(self, x, u0, alpha, bc_type='neumann', bc_params=None, dt=None):
+        x = np.asarray(x, dtype=float)
+        dx = np.diff(x)
+        if not np.allclose(dx, dx[0]):
+            raise ValueError("The spectral solver needs a uniform grid")
+        self.x = x
+        self.L = x[-1] - x[0]
+        self.bc_type = bc_type
+        self.dt = dt
+        n = len(x)
+
+        if bc_type == 'neumann':
+            self._lift = np.zeros(n)
+            k = np.arange(n) * np.pi / self.L
+        elif bc_type == 'dirichlet':
+            if bc_params is None:
+                bc_params = {'left': 0, 'right': 0}
+            # Lift out the linear steady state so the remainder has homogeneous ends
+            left, right = bc_params['left'], bc_params['right']
+            self._lift = left + (right - left) * (x - x[0]) / self.L
+            k = np.arange(1, n - 1) * np.pi / self.L
+        else:
+            raise ValueError("Unsupported boundary condition type")
+        self._rate = -alpha * k**2
+        self._coef = self._forward(np.asarray(u0, dtype=float))
+
+    def _forward(self, u):
+        if self.bc_type == 'neumann':
+            return dct(u, type=1, axis=-1)
+        return dst((u - self._lift)[..., 1:-1], type=1, axis=-1)
+
+    def _inverse(self, coef, out):
+        if self.bc_type == 'neumann':
+            out[...] = idct(coef, type=1, axis=-1)
+        else:
+            out[...] = self._lift
+            out[..., 1:-1] += idst(coef, type=1, axis=-1)
+        return out
+
+    def at(self, t, out=None):
+        """State at time t; an array of times gives one row per time."""
+        t = np.asarray(t, dtype=float)
+        coef = self._coef * np.exp(np.multiply.outer(t, self._rate))
+        if out is None:
+            out = np.empty(t.shape + self.x.shape)
+        return self._inverse(coef, out)
+
+    def advance(self, u, n_steps, out=None):
+        """Propagate an arbitrary state u by n_steps * dt exactly."""
+        if self.dt is None:
+            raise ValueError("advance() needs the solver to be built with dt")
+        if out is None:
+            out = np.empty_like(u, dtype=float)
+        coef = self._forward(u) * np.exp(self._rate * (n_steps * self.dt))
+        return self._inverse(coef, out)
@@ -0,0 +1,122 @@
+# heat_stats.py
+# Opt-in instrumentation for the stepping and render loops.
+# Nothing here runs unless a SimStats object is handed to a Stepper, Ensemble,
+# run_job or one of the heat_plot windows.
+import logging
+import time
+import tracemalloc
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+logger = logging.getLogger('heat_sim')
+
+class SimStats:
+    """Per-phase wall time, step and frame counters, allocations per frame and frame rate.
+
+    Phases are free-form names ('stencil', 'solve', 'boundary' from the stepper;
+    'step', 'monitor', 'segments' from the plot callbacks). With
+    track_allocations the peak bytes allocated inside each frame are recorded
+    via tracemalloc, which slows Python down noticeably. log_every (seconds)
+    emits summary lines through the 'heat_sim' logger.
+    """
+
+    def __init__(self, requested_fps=None, track_allocations=False, log_every=None, window=50):
+        self.phase_time = defaultdict(float)
+        self.phase_calls = defaultdict(int)
+        self.steps = 0
+        self.frames = 0
+        self.requested_fps = requested_fps
+        self.track_allocations = track_allocations
+        self.frame_alloc_bytes = 0
+        self.log_every = log_every
+        self._frame_stamps = deque(maxlen=window)
+        self._alloc_base = 0
+        # The clock starts with the first recorded phase or frame, not at construction
+        self._started = None
+        self._last_log = None
+
+    def _start(self):
+        if self._started is None:
+            self._started = self._last_log = time.perf_counter()
+
+    def _maybe_log(self):
+        if self.log_every is not None and time.perf_counter() - self._last_log >= self.log_every:
+            self._last_log = time.perf_counter()
+            logger.info(self.format())
+
+    def add(self, name, seconds):
+        self._start()
+        self.phase_time[name] += seconds
+        self.phase_calls[name] += 1
+
+    @contextmanager
+    def phase(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - t0)
+
+    def add_steps(self, n):
+        self._start()
+        self.steps += n
+        if not self._frame_stamps:
+            self._maybe_log()
+
+    def begin_frame(self):
+        self._start()
+        self._frame_stamps.append(time.perf_counter())
+        if self.track_allocations:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            self._alloc_base = tracemalloc.get_traced_memory()[0]
+
+    def end_frame(self):
+        self.frames += 1
+        if self.track_allocations:
+            self.frame_alloc_bytes = tracemalloc.get_traced_memory()[1] - self._alloc_base
+        self._maybe_log()
+
+    @property
+    def elapsed(self):
+        return 0.0 if self._started is None else time.perf_counter() - self._started
+
+    @property
+    def steps_per_second(self):
+        return self.steps / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def achieved_fps(self):
+        stamps = self._frame_stamps
+        if len(stamps) < 2:
+            return 0.0
+        return (len(stamps) - 1) / (stamps[-1] - stamps[0])
+
+    def summary(self):
+        """Plain-dict snapshot of every counter."""
+        return {
+            'elapsed_s': self.elapsed,
+            'steps': self.steps,
+            'steps_per_second': self.steps_per_second,
+            'frames': self.frames,
+            'achieved_fps': self.achieved_fps,
+            'requested_fps': self.requested_fps,
+            'frame_alloc_bytes': self.frame_alloc_bytes if self.track_allocations else None,
+            'phases': {name: {'seconds': self.phase_time[name], 'calls': self.phase_calls[name]}
+                       for name in self.phase_time},
+        }
+
+    def format(self, sep=' | '):
+        """One-line summary: rates first, then the share of time per phase."""
+        parts = [f"{self.steps_per_second:,.0f} steps/s"]
+        if self.frames:
+            fps = f"{self.achieved_fps:.1f}"
+            if self.requested_fps:
+                fps += f"/{self.requested_fps:.0f}"
+            parts.append(fps + " fps")
+        if self.track_allocations:
+            parts.append(f"{self.frame_alloc_bytes / 1024:.0f} KiB/frame")
+        total = sum(self.phase_time.values()) or 1.0
+        parts += [f"{name} {100 * seconds / total:.0f}%" for name, seconds in self.phase_time.items()]
+        return sep.join(parts)
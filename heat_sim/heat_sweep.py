@@ -0,0 +1,108 @@
+# heat_sweep.py
+# Parameter sweeps: expand a grid of metals x lengths x initial expressions x
+# boundary conditions and spread it over a process pool. Each task is a chunk of
+# runs that advance together as one Ensemble.
+import csv
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from heat_core import metals, parse_initial_condition, initialize_u, Ensemble
+
+SUMMARY_FIELDS = ['metal', 'alpha', 'length', 'init', 'bc_type', 'left', 'right',
+                  'u_min', 'u_max', 'u_mean', 'converged', 't_eq', 'steps', 'wall_s_share']
+
+def expand_grid(cfg):
+    """All run specs of a sweep config, in a stable order."""
+    sweep = cfg.get('sweep', {})
+    names = sweep.get('metals', 'all')
+    if names == 'all':
+        names = list(metals)
+    for name in names:
+        if name not in metals:
+            raise ValueError(f"Unknown metal '{name}'. Choose one of: {', '.join(metals)}")
+    lengths = [float(L) for L in sweep.get('lengths', [1.0])]
+    if min(lengths) <= 0:
+        raise ValueError("Lengths must be positive.")
+    inits = [str(e) for e in sweep.get('inits', ['sin(pi * x / L)'])]
+
+    bcs = []
+    for bc in sweep.get('bcs', ['neumann']):
+        if bc == 'neumann':
+            bcs.append(('neumann', None))
+        elif bc == 'dirichlet':
+            for left, right in sweep.get('dirichlet', [[0, 0]]):
+                bcs.append(('dirichlet', {'left': float(left), 'right': float(right)}))
+        else:
+            raise ValueError("Unsupported boundary condition type")
+
+    return [{'metal': name, 'alpha': metals[name], 'L': L, 'init': init,
+             'bc_type': bc_type, 'bc_params': bc_params}
+            for name, L, init, (bc_type, bc_params) in itertools.product(names, lengths, inits, bcs)]
+
+def run_chunk(specs, nx=101, sigma=0.5, steps=2000, steady_tol=None, precision='float64'):
+    """Run a list of specs as one ensemble and return their summary rows."""
+    t0 = time.perf_counter()
+    ensemble = Ensemble(nx, [s['alpha'] for s in specs], [s['L'] for s in specs],
+                        [s['bc_type'] for s in specs], [s['bc_params'] for s in specs], sigma=sigma,
+                        precision=precision)
+    U = np.stack([initialize_u(x, parse_initial_condition(s['init'], s['L']), s['bc_type'], s['bc_params'],
+                               dtype=ensemble.dtype)
+                  for x, s in zip(ensemble.x, specs)])
+    if steady_tol is not None:
+        res = ensemble.run_to_steady_state(U, tol=steady_tol, max_steps=steps)
+        U, converged, t_eq, n_steps = res['u'], res['converged'], res['t_eq'], res['steps']
+    else:
+        ensemble.advance(U, steps, out=U)
+        converged = np.zeros(len(specs), dtype=bool)
+        t_eq = np.full(len(specs), np.nan)
+        n_steps = np.full(len(specs), steps)
+    # Runs of a chunk share every step, so each gets an even share of its wall time
+    wall = (time.perf_counter() - t0) / len(specs)
+
+    rows = []
+    for m, s in enumerate(specs):
+        bc = s['bc_params'] or {}
+        rows.append({
+            'metal': s['metal'], 'alpha': s['alpha'], 'length': s['L'], 'init': s['init'],
+            'bc_type': s['bc_type'], 'left': bc.get('left', ''), 'right': bc.get('right', ''),
+            'u_min': U[m].min(), 'u_max': U[m].max(),
+            'u_mean': np.trapezoid(U[m], ensemble.x[m]) / s['L'],
+            'converged': bool(converged[m]), 't_eq': '' if np.isnan(t_eq[m]) else t_eq[m],
+            'steps': int(n_steps[m]), 'wall_s_share': wall,
+        })
+    return rows
+
+def _run_chunk_args(args):
+    return run_chunk(*args)
+
+# Tasks per worker when the chunk size is derived, so uneven chunks still balance
+TASKS_PER_WORKER = 4
+
+def default_chunk(n_runs, workers=None):
+    """Runs per task that give every worker TASKS_PER_WORKER tasks."""
+    workers = workers or os.cpu_count() or 1
+    return max(1, -(-n_runs // (TASKS_PER_WORKER * workers)))
+
+def run_sweep(specs, workers=None, chunk=None, nx=101, sigma=0.5, steps=2000, steady_tol=None, precision='float64'):
+    """Run all specs over a process pool, chunk runs per task; rows come back in spec order.
+
+    By default the chunk size gives every worker TASKS_PER_WORKER tasks, so
+    all cores get work however many runs the sweep has.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunk = chunk or default_chunk(len(specs), workers)
+    chunks = [(specs[i:i + chunk], nx, sigma, steps, steady_tol, precision) for i in range(0, len(specs), chunk)]
+    if workers == 1:
+        results = map(_run_chunk_args, chunks)
+        return [row for rows in results for row in rows]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [row for rows in pool.map(_run_chunk_args, chunks) for row in rows]
+
+def write_summary(path, rows):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', newline='') as fh:
+        writer = csv.DictWriter(fh, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
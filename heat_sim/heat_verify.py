@@ -0,0 +1,175 @@
+# heat_verify.py
+# Work-precision verification: every solver is run over a range of grid and
+# time resolutions and its error measured against the exact Fourier-series
+# solution from the README, evaluated to machine precision. The cheapest
+# setting that meets an error tolerance is then a lookup in the results.
+import time
+import numpy as np
+from heat_core import Stepper, AdaptiveStepper, parse_initial_condition, initialize_u
+from heat_spectral import SpectralSolver
+
+class FourierReference:
+    """Exact solution u(x, t) of the heat equation for constant alpha.
+
+    Dirichlet ends: the linear steady state plus a sine series of f minus it;
+    Neumann ends: a cosine series. The coefficients are integrals of f,
+    computed by composite Gauss-Legendre quadrature (panels x order points),
+    which is exact to round-off for smooth f. Modes are summed until
+    exp(-alpha k^2 t) drops below machine precision, so t must not be too
+    close to zero (max_modes bounds the series).
+    """
+
+    def __init__(self, f, L, alpha, bc_type='neumann', bc_params=None, panels=64, order=32, max_modes=1000):
+        if bc_type not in ('neumann', 'dirichlet'):
+            raise ValueError("Unsupported boundary condition type")
+        self.L = float(L)
+        self.alpha = float(alpha)
+        self.bc_type = bc_type
+        self.bc_params = bc_params or {'left': 0.0, 'right': 0.0}
+        self.max_modes = max_modes
+        nodes, weights = np.polynomial.legendre.leggauss(order)
+        h = self.L / panels
+        self._xq = (np.arange(panels)[:, None] * h + (nodes + 1) / 2 * h).ravel()
+        self._wq = np.tile(weights * h / 2, panels)
+        self._g = np.broadcast_to(f(self._xq), self._xq.shape).astype(float) - self._lift(self._xq)
+
+    def _lift(self, x):
+        if self.bc_type == 'neumann':
+            return np.zeros_like(x)
+        left, right = self.bc_params['left'], self.bc_params['right']
+        return left + (right - left) * x / self.L
+
+    def _basis(self, n, x):
+        k = np.multiply.outer(n, np.pi * np.asarray(x) / self.L)
+        return np.sin(k) if self.bc_type == 'dirichlet' else np.cos(k)
+
+    def coefficients(self, n):
+        """Series coefficients of modes n (sine for Dirichlet, cosine for Neumann)."""
+        n = np.asarray(n)
+        c = 2 / self.L * (self._basis(n, self._xq) @ (self._wq * self._g))
+        return np.where(n == 0, c / 2, c)
+
+    def modes(self, t, eps=1e-17):
+        """Number of modes whose decay factor at time t is above eps."""
+        n = int(np.ceil(self.L / np.pi * np.sqrt(-np.log(eps) / (self.alpha * t)))) + 1
+        if n > self.max_modes:
+            raise ValueError(f"t = {t:g} needs {n} modes; evaluate the reference at a later time")
+        return n
+
+    def __call__(self, x, t, block=256):
+        x = np.asarray(x, dtype=float)
+        u = self._lift(x)
+        first = 1 if self.bc_type == 'dirichlet' else 0
+        n_max = self.modes(t)
+        for start in range(first, n_max + 1, block):
+            n = np.arange(start, min(start + block, n_max + 1))
+            decay = np.exp(-self.alpha * (n * np.pi / self.L)**2 * t)
+            u += (self.coefficients(n) * decay) @ self._basis(n, x)
+        return u
+
+def _run_cn(x, u0, alpha, bc_type, bc_params, t_end, steps):
+    dt = t_end / steps
+    dx = x[1] - x[0]
+    return Stepper(len(x), alpha * dt / dx**2, bc_type, bc_params).advance(u0, steps)
+
+def _run_spectral(x, u0, alpha, bc_type, bc_params, t_end, steps):
+    return SpectralSolver(x, u0, alpha, bc_type, bc_params).at(t_end)
+
+def _run_adaptive(x, u0, alpha, bc_type, bc_params, t_end, tol):
+    return AdaptiveStepper(len(x), x[1] - x[0], alpha, bc_type, bc_params, tol=tol).integrate(u0, t_end)
+
+# name: (run(x, u0, alpha, bc_type, bc_params, t_end, setting), what the setting is)
+BACKENDS = {
+    'cn': (_run_cn, 'steps'),
+    'spectral': (_run_spectral, None),
+    'adaptive': (_run_adaptive, 'tol'),
+}
+
+def _time(run, repeat):
+    best, result = np.inf, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - t0)
+        if best > 1.0:
+            break
+    return best, result
+
+def work_precision(L, alpha, init, bc_type='neumann', bc_params=None, t_end=None,
+                   nxs=(26, 51, 101, 201, 401, 801, 1601), steps=(10, 20, 50, 100, 200, 500, 1000, 2000, 5000),
+                   tols=(1e-2, 1e-3, 1e-4, 1e-5, 1e-6, 1e-7), solvers=('cn', 'spectral', 'adaptive'), repeat=3):
+    """Error at t_end against FourierReference, and wall time, of every solver setting.
+
+    t_end defaults to 0.1 L^2 / alpha (2000 GUI steps at nx = 101). The error
+    is the largest deviation at the nodes relative to the initial temperature
+    range. Returns a list of dicts (solver, nx, dt, steps or tol, error,
+    seconds); a spectral run is exact in time, so it has one entry per nx.
+    """
+    if t_end is None:
+        t_end = 0.1 * L**2 / alpha
+    f = parse_initial_condition(init, L)
+    reference = FourierReference(f, L, alpha, bc_type, bc_params)
+    scale = max(np.ptp(initialize_u(np.linspace(0, L, 4001), f, bc_type, bc_params)), 1e-12)
+    points = []
+    for nx in nxs:
+        x = np.linspace(0, L, nx)
+        u0 = initialize_u(x, f, bc_type, bc_params)
+        exact = reference(x, t_end)
+        for solver in solvers:
+            run, setting = BACKENDS[solver]
+            values = {'steps': steps, 'tol': tols, None: [None]}[setting]
+            for value in values:
+                seconds, u = _time(lambda: run(x, u0, alpha, bc_type, bc_params, t_end, value), repeat)
+                point = {'solver': solver, 'nx': nx, 'error': float(np.abs(u - exact).max() / scale),
+                         'seconds': seconds}
+                if setting == 'steps':
+                    point['steps'] = value
+                    point['dt'] = t_end / value
+                elif setting == 'tol':
+                    point['tol'] = value
+                points.append(point)
+    return points
+
+def recommend(points, tol):
+    """The fastest point whose error is within tol, or None."""
+    ok = [p for p in points if p['error'] <= tol]
+    return min(ok, key=lambda p: p['seconds']) if ok else None
+
+def default_point(L, alpha, init, bc_type='neumann', bc_params=None, t_end=None, nx=101, sigma=0.5, repeat=3):
+    """Error and time of the GUI setting: nx nodes and dt = sigma dx^2 / alpha."""
+    if t_end is None:
+        t_end = 0.1 * L**2 / alpha
+    steps = max(1, round(t_end / (sigma * (L / (nx - 1))**2 / alpha)))
+    return work_precision(L, alpha, init, bc_type, bc_params, t_end, nxs=(nx,), steps=(steps,),
+                          solvers=('cn',), repeat=repeat)[0]
+
+def plot_work_precision(points, path, tol=None, best=None):
+    """Log-log error against wall time, one line per solver and grid, saved to path."""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib import cm
+    fig = Figure(figsize=(9, 6))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    nxs = sorted({p['nx'] for p in points})
+    colors = {nx: cm.viridis(i / max(len(nxs) - 1, 1)) for i, nx in enumerate(nxs)}
+    styles = {'cn': ('-', 'o'), 'adaptive': ('--', 's')}
+    for solver, (ls, marker) in styles.items():
+        for nx in nxs:
+            run = [p for p in points if p['solver'] == solver and p['nx'] == nx]
+            if run:
+                ax.loglog([p['seconds'] for p in run], [p['error'] for p in run], ls=ls, marker=marker,
+                          color=colors[nx], ms=4, label=f'{solver} nx={nx}')
+    spectral = [p for p in points if p['solver'] == 'spectral']
+    if spectral:
+        ax.loglog([p['seconds'] for p in spectral], [p['error'] for p in spectral], 'k:^', label='spectral')
+    if tol is not None:
+        ax.axhline(tol, color='red', lw=1, label=f'tolerance {tol:g}')
+    if best is not None:
+        ax.loglog([best['seconds']], [best['error']], '*', color='red', ms=16, label='cheapest within tolerance')
+    ax.set_xlabel('wall time (s)')
+    ax.set_ylabel('max error / initial range')
+    ax.set_title('Work-precision against the Fourier-series solution')
+    ax.legend(fontsize=7, ncol=2)
+    fig.tight_layout()
+    fig.savefig(path, dpi=100)
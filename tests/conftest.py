@@ -0,0 +1,18 @@
+# conftest.py
+# The heat_sim modules import each other by bare name (see heat_sim/__main__.py),
+# so the tests put heat_sim itself on the path and keep every on-disk cache in
+# a temporary directory.
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'heat_sim'))
+
+@pytest.fixture(autouse=True)
+def isolated_caches(tmp_path, monkeypatch):
+    monkeypatch.setenv('HEAT_SIM_RESULT_CACHE', str(tmp_path / 'results'))
+    monkeypatch.setenv('HEAT_SIM_EXPR_CACHE', str(tmp_path / 'expressions.json'))
+    from heat_core import _compile_expression
+    _compile_expression.cache_clear()
+    yield tmp_path
+    _compile_expression.cache_clear()
@@ -0,0 +1,59 @@
+# test_cache.py
+# The result cache: repeated and longer jobs replay their cached snapshots bit for bit.
+import os
+import numpy as np
+from heat_cache import ResultCache, spec_key
+from heat_cli import build_job, run_job
+
+def job(tmp_path, steps, cache=True):
+    return build_job({
+        'rod': {'metal': 'copper', 'length': 0.3, 'bc': 'dirichlet', 'left': 10, 'right': 90,
+                'init': '50 + 40 * sin(3 * pi * x / L)'},
+        'grid': {'nx': 61},
+        'run': {'steps': steps, 'stride': 25, 'output': str(tmp_path / 'out.npz'), 'cache': cache},
+    })
+
+def test_cache_replays_a_repeated_run(tmp_path):
+    first = run_job(job(tmp_path, 200))
+    again = run_job(job(tmp_path, 200))
+    assert first['cache'] == {'replayed': 0, 'computed': 200}
+    assert again['cache'] == {'replayed': 200, 'computed': 0}
+    np.testing.assert_array_equal(again['u'], first['u'])
+
+def test_cache_extends_a_longer_run(tmp_path):
+    uncached = run_job(job(tmp_path, 300, cache=False))
+    assert uncached['cache'] is None
+    run_job(job(tmp_path, 100))
+    longer = run_job(job(tmp_path, 300))
+    assert longer['cache'] == {'replayed': 100, 'computed': 200}
+    np.testing.assert_array_equal(longer['u'], uncached['u'])
+    # The extension was stored too; a step count off the snapshot grid replays what it can
+    odd = run_job(job(tmp_path, 290))
+    assert odd['cache'] == {'replayed': 275, 'computed': 15}
+    np.testing.assert_array_equal(odd['u'], run_job(job(tmp_path, 290, cache=False))['u'])
+
+def test_cache_keys_on_everything_that_changes_the_numbers(tmp_path):
+    run_job(job(tmp_path, 100))
+    other = job(tmp_path, 100)
+    other['bc_params'] = {'left': 10.0, 'right': 80.0}
+    result = run_job(other)
+    assert result['cache']['replayed'] == 0
+    assert result['u'][-1] == 80.0
+    assert spec_key({'a': 1, 'b': 2.0}) == spec_key({'b': 2.0, 'a': 1})
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    frame = np.zeros((4, 1000))
+    cache = ResultCache(str(tmp_path / 'lru'), max_bytes=10**9)
+    for i in range(3):
+        cache.store({'run': i}, [frame + i])
+        os.utime(cache._path(spec_key({'run': i})), (i, i))
+    size = cache.entries()[0][1]
+    cache.max_bytes = int(3.5 * size)
+    # Reading run 0 makes run 1 the oldest
+    assert cache.load({'run': 0}) is not None
+    cache.store({'run': 3}, [frame + 3])
+    assert cache.load({'run': 1}) is None
+    for i in (0, 2, 3):
+        frames, meta = cache.load({'run': i})
+        np.testing.assert_array_equal(frames, frame + i)
+        assert meta['frames'] == 4
@@ -0,0 +1,93 @@
+# test_checkpoint.py
+# Checkpoint/restart: a resumed job ends on exactly the bits of an uninterrupted one.
+import time
+import numpy as np
+import pytest
+import heat_io
+from heat_cli import build_job, run_job
+from heat_io import read_checkpoint, open_trajectory
+
+def job(tmp_path, steps, **run):
+    return build_job({
+        'rod': {'metal': 'copper', 'length': 0.3, 'bc': 'dirichlet', 'left': 10, 'right': 90,
+                'init': '50 + 40 * sin(3 * pi * x / L)'},
+        'grid': {'nx': 61, 'precision': run.pop('precision', 'float64')},
+        'run': dict({'steps': steps, 'stride': 25, 'output': str(tmp_path / 'out.npz'), 'cache': False}, **run),
+    })
+
+@pytest.mark.parametrize('precision', ['float64', 'float32'])
+def test_resume_from_checkpoint_is_bit_exact(tmp_path, precision):
+    full = run_job(job(tmp_path, 300, precision=precision))
+
+    # The interrupted run: it stops after 150 of the 300 steps
+    path = tmp_path / 'run.ckpt'
+    run_job(job(tmp_path, 150, precision=precision, checkpoint=str(path), checkpoint_every=50))
+    checkpoint = read_checkpoint(str(path))
+    assert checkpoint['step'] == 150
+    resumed = run_job(job(tmp_path, 300, precision=precision, checkpoint=str(path), checkpoint_every=50),
+                      resume=checkpoint)
+
+    assert resumed['u'].dtype == full['u'].dtype
+    np.testing.assert_array_equal(resumed['u'], full['u'])
+    assert resumed['t'] == full['t']
+    assert read_checkpoint(str(path))['step'] == 300
+
+def test_resume_after_a_crash_rewrites_the_trajectory_tail(tmp_path, monkeypatch):
+    run_job(job(tmp_path, 200, trajectory=str(tmp_path / 'full')))
+
+    # Crash after the trajectory got its step-150 row but before that checkpoint was queued
+    submit = heat_io.CheckpointWriter.submit
+    def crash_at_150(self, u, step, t):
+        if step == 150:
+            raise KeyboardInterrupt
+        submit(self, u, step, t)
+    monkeypatch.setattr(heat_io.CheckpointWriter, 'submit', crash_at_150)
+    path = tmp_path / 'run.ckpt'
+    crashed = job(tmp_path, 200, trajectory=str(tmp_path / 'part'), checkpoint=str(path), checkpoint_every=50)
+    with pytest.raises(KeyboardInterrupt):
+        run_job(crashed)
+    monkeypatch.setattr(heat_io.CheckpointWriter, 'submit', submit)
+    checkpoint = read_checkpoint(str(path))
+    assert checkpoint['step'] == 100
+    run_job(crashed, resume=checkpoint)
+
+    t_full, u_full, _ = open_trajectory(str(tmp_path / 'full'))
+    t_part, u_part, _ = open_trajectory(str(tmp_path / 'part'))
+    np.testing.assert_array_equal(t_part, t_full)
+    np.testing.assert_array_equal(u_part, u_full)
+
+def test_checkpoint_rejects_corruption(tmp_path):
+    path = tmp_path / 'run.ckpt'
+    run_job(job(tmp_path, 50, checkpoint=str(path), checkpoint_every=50))
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 0xFF
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match='corrupt'):
+        read_checkpoint(str(path))
+
+def test_checkpoint_writer_reports_any_failed_write(tmp_path):
+    # A config json cannot encode fails in the writer thread; close() must raise it
+    writer = heat_io.CheckpointWriter(str(tmp_path / 'run.ckpt'), {'bad': object()})
+    writer.submit(np.zeros(5), 1, 0.1)
+    with pytest.raises(TypeError):
+        writer.close()
+    assert writer.written == 0
+
+def test_checkpoint_writer_keeps_writing_after_an_error(tmp_path, monkeypatch):
+    path = tmp_path / 'run.ckpt'
+    calls = []
+    write = heat_io.write_checkpoint
+    def flaky(*args):
+        calls.append(args[2])
+        if len(calls) == 1:
+            raise RuntimeError("disk hiccup")
+        write(*args)
+    monkeypatch.setattr(heat_io, 'write_checkpoint', flaky)
+    writer = heat_io.CheckpointWriter(str(path), {})
+    writer.submit(np.zeros(5), 1, 0.1)
+    while not calls:
+        time.sleep(0.001)
+    writer.submit(np.ones(5), 2, 0.2)
+    with pytest.raises(RuntimeError):
+        writer.close()
+    assert read_checkpoint(str(path))['step'] == 2
@@ -0,0 +1,45 @@
+# test_composite.py
+# Composite rods: per-cell diffusivities, flux continuity and the steady profile.
+import numpy as np
+import pytest
+from heat_core import Stepper, face_diffusivity, steady_state, initialize_u, parse_initial_condition
+from heat_mesh import graded_mesh
+
+SEGMENTS = [('copper', 0.05), ('steel', 0.1), (5e-5, 0.05)]
+L = 0.2
+
+def test_face_diffusivity_is_the_series_mean():
+    x = np.array([0.0, 0.05, 0.1, 0.15, 0.2])
+    np.testing.assert_allclose(face_diffusivity(x, SEGMENTS), [1.17e-4, 1.4e-5, 1.4e-5, 5e-5])
+    # A cell across the copper/steel interface: half of each, in series
+    cell = face_diffusivity(np.array([0.0, 0.025, 0.075, 0.2]), SEGMENTS)[1]
+    assert cell == pytest.approx(0.05 / (0.025 / 1.17e-4 + 0.025 / 1.4e-5))
+    with pytest.raises(ValueError):
+        face_diffusivity(x, [('copper', 0.1)])
+
+@pytest.mark.parametrize('mesh', ['uniform', 'graded'])
+def test_composite_neumann_conserves_mean(mesh):
+    nx = 81
+    f = parse_initial_condition('100 * Piecewise((1, x < L / 3), (0, True))', L)
+    x = np.linspace(0, L, nx) if mesh == 'uniform' else graded_mesh(L, nx, f)
+    alpha = 1.17e-4  # the largest segment alpha, as build_job picks it
+    kappa = face_diffusivity(x, SEGMENTS) / alpha
+    dt = 0.5 * (L / (nx - 1))**2 / alpha
+    r = alpha * dt / (L / (nx - 1))**2
+    u0 = initialize_u(x, f)
+    u = Stepper(nx, r, x=x, kappa=kappa).advance(u0, 500)
+    assert abs(np.trapezoid(u, x) - np.trapezoid(u0, x)) < 1e-12 * L * np.ptp(u0)
+
+def test_composite_dirichlet_settles_to_the_resistance_line():
+    nx, alpha = 41, 1.17e-4
+    x = np.linspace(0, L, nx)
+    bc = {'left': 100.0, 'right': 0.0}
+    kappa = face_diffusivity(x, SEGMENTS) / alpha
+    u0 = initialize_u(x, parse_initial_condition('50', L), 'dirichlet', bc)
+    # Large steps are fine: only the end state matters
+    u = Stepper(nx, 50.0, 'dirichlet', bc, kappa=kappa).advance(u0, 4000)
+    expected = steady_state(x, u0, 'dirichlet', bc, alpha=SEGMENTS)
+    np.testing.assert_allclose(u, expected, atol=1e-8)
+    # Same flux through every cell
+    flux = face_diffusivity(x, SEGMENTS) * np.diff(u) / np.diff(x)
+    np.testing.assert_allclose(flux, flux[0], rtol=1e-6)
@@ -0,0 +1,78 @@
+# test_expressions.py
+# parse_initial_condition, compiled fresh and replayed from the on-disk cache.
+import json
+import numpy as np
+import pytest
+from heat_core import parse_initial_condition, expression_cache_path, _compile_expression
+
+L = 2.0
+X = np.linspace(0, L, 9)
+
+CASES = {
+    '50': np.full_like(X, 50.0),
+    '0': np.zeros_like(X),
+    'L': np.full_like(X, L),
+    'sin(pi * x / L)': np.sin(np.pi * X / L),
+    'Max(x, L / 4)': np.maximum(X, L / 4),
+    'Min(x, 1 - x / L)': np.minimum(X, 1 - X / L),
+    'Abs(x - L / 2)': np.abs(X - L / 2),
+    'Piecewise((100, x < L / 2), (0, True))': np.where(X < L / 2, 100.0, 0.0),
+    'Piecewise((x, x < 1), (2 - x, x < 1.5), (Max(0, x - 1.5), True))':
+        np.where(X < 1, X, np.where(X < 1.5, 2 - X, np.maximum(0, X - 1.5))),
+    'erf(x)': None,
+    'gamma(1 + x)': None,
+}
+
+def expected(expr):
+    if CASES[expr] is not None:
+        return CASES[expr]
+    import scipy.special
+    return scipy.special.erf(X) if expr == 'erf(x)' else scipy.special.gamma(1 + X)
+
+@pytest.mark.parametrize('expr', CASES)
+def test_parse_initial_condition(expr):
+    f = parse_initial_condition(expr, L)
+    u = f(X)
+    assert u.shape == X.shape
+    np.testing.assert_allclose(u, expected(expr), rtol=1e-14, atol=1e-14)
+    assert f.source == (expr, L)
+
+@pytest.mark.parametrize('expr', CASES)
+def test_cached_expression_matches_fresh_compile(expr):
+    fresh = parse_initial_condition(expr, L)(X).copy()
+    _compile_expression.cache_clear()
+    replayed = parse_initial_condition(expr, L)(X)
+    np.testing.assert_array_equal(replayed, fresh)
+
+def test_constant_keeps_grid_shape_and_dtype():
+    f = parse_initial_condition('50', 1.0)
+    assert f(np.linspace(0, 1, 7)).shape == (7,)
+    assert f(np.zeros((3, 4))).shape == (3, 4)
+    assert float(f(np.array(0.25))) == 50.0
+
+def test_cache_file_holds_plain_numpy_source():
+    parse_initial_condition('Max(x, L / 4) + erf(x)', L)
+    with open(expression_cache_path()) as fh:
+        entries = json.load(fh)
+    assert f"Max(x, L / 4) + erf(x)|{L!r}" in entries
+
+@pytest.mark.parametrize('source', [
+    "__import__('os').system('echo unsafe')",
+    "x.__class__",
+    "(lambda: 1)()",
+    "open('/etc/passwd')",
+    "x[0]",
+    "'text'",
+])
+def test_tampered_cache_entries_are_recompiled(source):
+    key = f"sin(pi * x / L)|{L!r}"
+    with open(expression_cache_path(), 'w') as fh:
+        json.dump({key: source}, fh)
+    u = parse_initial_condition('sin(pi * x / L)', L)(X)
+    np.testing.assert_allclose(u, np.sin(np.pi * X / L), rtol=1e-14, atol=1e-14)
+    with open(expression_cache_path()) as fh:
+        assert json.load(fh)[key] != source
+
+def test_invalid_expression_raises_value_error():
+    with pytest.raises(ValueError):
+        parse_initial_condition('undefined_function(x)', L)
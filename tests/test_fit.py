@@ -0,0 +1,60 @@
+# test_fit.py
+# Tangent-linear sensitivities of FitProblem against finite differences, and fit().
+import numpy as np
+import pytest
+from heat_fit import FitProblem, fit
+
+TIMES = [20.0, 40.0, 80.0, 160.0]
+PROBES = [0.013, 0.05, 0.071]
+
+def problem(bc_type, bc_params=None, data=None):
+    if data is None:
+        data = np.zeros((len(TIMES), len(PROBES)))
+    return FitProblem(0.1, '40 + 30 * sin(pi * x / L) + 10 * x / L', PROBES, TIMES, data,
+                      bc_type=bc_type, bc_params=bc_params, nx=41)
+
+def test_tangents_match_finite_differences_neumann():
+    p = problem('neumann')
+    alpha = np.array([2.3e-5, 9.7e-5])
+    pred, jac = p.simulate(alpha)
+    assert jac.shape == pred.shape + (1,)
+    h = 1e-4
+    up, _ = p.simulate(alpha * np.exp(h), tangents=False)
+    down, _ = p.simulate(alpha * np.exp(-h), tangents=False)
+    np.testing.assert_allclose(jac[..., 0], (up - down) / (2 * h), rtol=1e-6, atol=1e-7)
+
+def test_tangents_match_finite_differences_dirichlet():
+    p = problem('dirichlet', {'left': 20.0, 'right': 60.0})
+    alpha = np.array([1.4e-5, 1.17e-4])
+    left, right = np.array([20.0, 25.0]), np.array([60.0, 55.0])
+    pred, jac = p.simulate(alpha, left, right)
+    assert jac.shape == pred.shape + (3,)
+    h = 1e-4
+    fd = [
+        (p.simulate(alpha * np.exp(h), left, right, tangents=False)[0]
+         - p.simulate(alpha * np.exp(-h), left, right, tangents=False)[0]) / (2 * h),
+        (p.simulate(alpha, left + h, right, tangents=False)[0]
+         - p.simulate(alpha, left - h, right, tangents=False)[0]) / (2 * h),
+        (p.simulate(alpha, left, right + h, tangents=False)[0]
+         - p.simulate(alpha, left, right - h, tangents=False)[0]) / (2 * h),
+    ]
+    for i, expected in enumerate(fd):
+        np.testing.assert_allclose(jac[..., i], expected, rtol=1e-6, atol=1e-7)
+
+def test_tangents_do_not_change_predictions():
+    p = problem('dirichlet', {'left': 20.0, 'right': 60.0})
+    alpha = np.array([2.3e-5, 1.4e-5, 1.65e-4])
+    with_tangents, _ = p.simulate(alpha)
+    without, _ = p.simulate(alpha, tangents=False)
+    np.testing.assert_allclose(with_tangents, without, rtol=1e-13)
+
+@pytest.mark.parametrize('fit_ends', [False, True])
+def test_fit_recovers_synthetic_parameters(fit_ends):
+    truth = problem('dirichlet', {'left': 22.0, 'right': 58.0})
+    data = truth.simulate([9.7e-5], tangents=False)[0][0]
+    p = problem('dirichlet', {'left': 20.0, 'right': 60.0} if fit_ends else {'left': 22.0, 'right': 58.0}, data)
+    result = fit(p, fit_ends=fit_ends)
+    assert result['alpha'] == pytest.approx(9.7e-5, rel=1e-6)
+    if fit_ends:
+        assert result['left'] == pytest.approx(22.0, abs=1e-6)
+        assert result['right'] == pytest.approx(58.0, abs=1e-6)
@@ -0,0 +1,37 @@
+# test_mesh.py
+# Graded and adaptive meshes: an insulated rod keeps its mean temperature.
+import numpy as np
+import pytest
+from heat_core import Stepper, initialize_u, parse_initial_condition
+from heat_mesh import graded_mesh, run_adaptive_mesh
+
+L, ALPHA, NX = 0.2, 2.3e-5, 81
+DT = 0.5 * (L / (NX - 1))**2 / ALPHA
+R = ALPHA * DT / (L / (NX - 1))**2
+INITS = ['100 * Piecewise((1, x < L / 3), (0, True))', 'tanh((x - L / 2) / (0.01 * L))']
+
+def drift(u, x, u0, x0):
+    """Change of the mean temperature, relative to the initial temperature range."""
+    return abs(np.trapezoid(u, x) - np.trapezoid(u0, x0)) / (L * np.ptp(u0))
+
+@pytest.mark.parametrize('init', INITS)
+def test_neumann_graded_mesh_conserves_mean(init):
+    f = parse_initial_condition(init, L)
+    x = graded_mesh(L, NX, f)
+    assert np.ptp(np.diff(x)) > 0.1 * np.diff(x).mean()
+    u0 = initialize_u(x, f)
+    u = Stepper(NX, R, x=x).advance(u0, 500)
+    assert drift(u, x, u0, x) < 1e-12
+
+def test_uniform_positions_reproduce_the_uniform_stepper():
+    x = np.linspace(0, L, NX)
+    u0 = initialize_u(x, parse_initial_condition(INITS[0], L))
+    np.testing.assert_allclose(Stepper(NX, R, x=x).advance(u0, 100), Stepper(NX, R).advance(u0, 100),
+                               rtol=1e-12, atol=1e-10)
+
+def test_adaptive_mesh_conserves_mean():
+    x = np.linspace(0, L, NX)
+    u0 = initialize_u(x, parse_initial_condition(INITS[0], L))
+    x_end, u = run_adaptive_mesh(x, u0, ALPHA, DT, 200, remesh_every=10)
+    assert not np.allclose(x_end, x)
+    assert drift(u, x_end, u0, x) < 1e-12
@@ -0,0 +1,51 @@
+# test_precision.py
+# float32 and mixed precision: state dtypes, accuracy and the decimated plot line.
+import numpy as np
+import pytest
+from heat_core import Stepper, Ensemble, initialize_u, parse_initial_condition
+from heat_mesh import graded_mesh
+
+NX, L, ALPHA = 201, 0.5, 9.7e-5
+R = 0.5
+
+def start(dtype=float):
+    x = np.linspace(0, L, NX)
+    return initialize_u(x, parse_initial_condition('20 + 80 * exp(-((x - 0.3 * L) / (0.05 * L))**2)', L),
+                        dtype=dtype)
+
+@pytest.mark.parametrize('precision, tol', [('float32', 1e-4), ('mixed', 1e-5)])
+def test_reduced_precision_tracks_float64(precision, tol):
+    exact = Stepper(NX, R).advance(start(), 2000)
+    stepper = Stepper(NX, R, precision=precision)
+    u = stepper.advance(start(np.float32), 2000)
+    assert stepper.dtype == u.dtype == np.float32
+    assert np.abs(u - exact).max() / 80 < tol
+
+def test_ensemble_keeps_float32_states():
+    ensemble = Ensemble(NX, [ALPHA, 2 * ALPHA], L, precision='mixed')
+    u = ensemble.advance(np.stack([start(), start()]), 10)
+    assert u.dtype == np.float32
+    with pytest.raises(ValueError):
+        Stepper(NX, R, precision='float16')
+
+def test_mixed_precision_graded_mesh_conserves_mean():
+    f = parse_initial_condition('100 * Piecewise((1, x < L / 3), (0, True))', L)
+    x = graded_mesh(L, NX, f)
+    u0 = initialize_u(x, f, dtype=np.float32)
+    u = Stepper(NX, R, x=x, precision='mixed').advance(u0, 500)
+    assert abs(np.trapezoid(u, x) - np.trapezoid(u0, x)) < 1e-6 * L * np.ptp(u0)
+
+@pytest.mark.parametrize('dtype', [np.float32, np.float64])
+def test_rodline_decimates_any_float_state(dtype):
+    from matplotlib.figure import Figure
+    from heat_plot import RodLine
+    x = np.linspace(0, L, 20001)
+    u = start(float)
+    u = np.interp(x, np.linspace(0, L, NX), u).astype(dtype)
+    u[12345] = 500  # a spike narrower than a pixel stays visible
+    ax = Figure().add_subplot()
+    line = RodLine(ax, x, u, max_points=200)
+    assert len(line.segments) == 199
+    assert line.segments[:, :, 1].max() == 500
+    line.update(u[::-1].copy())
+    assert line.segments[:, :, 1].max() == 500
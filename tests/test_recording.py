@@ -0,0 +1,40 @@
+# test_recording.py
+# Recording a plot window: the trajectory keeps every frame however long the run goes.
+import matplotlib
+import numpy as np
+import pytest
+from heat_io import TrajectoryWriter, open_trajectory
+
+matplotlib.use('Agg')
+
+def test_growing_writer_keeps_every_row(tmp_path):
+    x = np.linspace(0, 1, 5)
+    writer = TrajectoryWriter(str(tmp_path / 'traj'), x, 3, grow=True)
+    for i in range(10):
+        writer.append(float(i), x * i)
+    writer.close()
+    t, u, meta = open_trajectory(str(tmp_path / 'traj'))
+    np.testing.assert_array_equal(t, np.arange(10.0))
+    np.testing.assert_array_equal(u, np.outer(np.arange(10), x))
+    assert meta['capacity'] == 12
+
+def test_fixed_writer_still_refuses_past_capacity(tmp_path):
+    writer = TrajectoryWriter(str(tmp_path / 'traj'), np.zeros(3), 1)
+    writer.append(0.0, np.zeros(3))
+    with pytest.raises(ValueError, match='full'):
+        writer.append(1.0, np.zeros(3))
+
+def test_run_plot_records_past_its_initial_capacity(tmp_path):
+    from matplotlib.backend_bases import CloseEvent
+    from heat_core import parse_initial_condition
+    from heat_plot import run_plot
+    f = parse_initial_condition('sin(pi * x / L)', 0.1)
+    # No steady_tol: the producer never stops on its own
+    fig, update = run_plot(0.1, 1.17e-4, f, lambda: None, record_path=str(tmp_path / 'rec'), steady_tol=None,
+                           nx=41, show=False, threaded=False, use_cache=False)
+    for i in range(300):
+        update(i)
+    CloseEvent('close_event', fig.canvas)._process()
+    t, u, meta = open_trajectory(str(tmp_path / 'rec'))
+    assert len(t) > 300
+    np.testing.assert_allclose(np.diff(t), meta['dt'] * meta['stride'])
@@ -0,0 +1,68 @@
+# test_service.py
+# The simulation service: request validation and per-member failures in a batch.
+import queue
+import threading
+import numpy as np
+import pytest
+import heat_service
+from heat_cli import build_job
+from heat_service import check_job, SimulationService, request
+
+def job(init='sin(pi * x / L)', steps=40):
+    return build_job({'rod': {'metal': 'copper', 'init': init}, 'grid': {'nx': 21},
+                      'run': {'steps': steps, 'stride': 20}})
+
+def test_check_job_rejects_a_bad_expression():
+    with pytest.raises(ValueError, match="foo"):
+        check_job(job('foo(x) +'))
+    with pytest.raises(ValueError):
+        check_job(job('undefined_function(x)'))
+    assert check_job(job())['init'] == 'sin(pi * x / L)'
+
+def test_bad_member_fails_alone(monkeypatch):
+    results = queue.Queue()
+    monkeypatch.setattr(heat_service, '_results', results)
+    # A job that skipped check_job, between two good ones
+    good = check_job(job())
+    assert heat_service._solve_batch([1, 2, 3], [good, dict(good, init='foo(x) +'), good]) == 2
+    messages = []
+    while not results.empty():
+        messages.append(results.get())
+    errors = [m for m in messages if m[0] == 'error']
+    assert len(errors) == 1 and errors[0][1] == [2]
+    frames = [m for m in messages if m[0] == 'frame']
+    assert all(m[1] == [1, 3] for m in frames) and len(frames) == 3
+    assert messages[-1] == ('done', [1, 3])
+    np.testing.assert_array_equal(frames[-1][3][0], frames[-1][3][1])
+
+def test_bad_request_gets_400_and_does_not_touch_its_batch():
+    service = SimulationService(workers=1, window=0.05)
+    server = heat_service._Server(('127.0.0.1', 0), heat_service._Handler)
+    server.service = service
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f'http://127.0.0.1:{server.server_port}'
+    cfg = {'rod': {'metal': 'copper'}, 'grid': {'nx': 21}, 'run': {'steps': 40, 'stride': 20}}
+    outcome = {}
+
+    def post(name, body):
+        try:
+            outcome[name] = request(url, body)[0]
+        except ValueError as e:
+            outcome[name] = e
+    try:
+        clients = [threading.Thread(target=post, args=('good', cfg)),
+                   threading.Thread(target=post, args=('bad', dict(cfg, rod={'metal': 'copper', 'init': 'foo(x) +'}))),
+                   threading.Thread(target=post, args=('list', [1, 2]))]
+        for c in clients:
+            c.start()
+        for c in clients:
+            c.join(30)
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
+    assert outcome['good'][-1] == {'done': True}
+    assert sum('u' in line for line in outcome['good']) == 3
+    assert isinstance(outcome['bad'], ValueError) and 'foo' in str(outcome['bad'])
+    assert isinstance(outcome['list'], ValueError)
@@ -0,0 +1,95 @@
+# test_solvers.py
+# The Crank-Nicolson backends against each other.
+import numpy as np
+import pytest
+from heat_core import (setup_matrices, setup_banded, make_solver, compute_next_u_banded, Stepper, Ensemble,
+                       initialize_u, parse_initial_condition)
+
+BCS = [('neumann', None), ('dirichlet', {'left': 20.0, 'right': 80.0})]
+
+def rod(nx, L, init, bc_type, bc_params):
+    x = np.linspace(0, L, nx)
+    return x, initialize_u(x, parse_initial_condition(init, L), bc_type, bc_params)
+
+def setting(nx=41, L=0.5, alpha=1.17e-4):
+    dx = L / (nx - 1)
+    dt = 0.5 * dx**2 / alpha
+    return nx, L, alpha, dt, alpha * dt / dx**2
+
+@pytest.mark.parametrize('bc_type, bc_params', BCS)
+def test_banded_matches_dense(bc_type, bc_params):
+    nx, L, alpha, dt, r = setting()
+    x, u0 = rod(nx, L, '100 * x / L + 30 * sin(3 * pi * x / L)', bc_type, bc_params)
+    dense = make_solver(nx, r, bc_type, bc_params, solver='dense')(u0.copy(), 200)
+    banded = make_solver(nx, r, bc_type, bc_params, solver='banded')(u0.copy(), 200)
+    ab_imp, ab_exp = setup_banded(nx, r, bc_type)
+    loop = u0.copy()
+    for _ in range(200):
+        loop = compute_next_u_banded(loop, ab_imp, ab_exp)
+        if bc_type == 'dirichlet':
+            loop[0], loop[-1] = bc_params['left'], bc_params['right']
+    for u in (banded, loop):
+        np.testing.assert_allclose(u, dense, rtol=1e-12, atol=1e-10)
+
+@pytest.mark.parametrize('bc_type', ['neumann', 'dirichlet'])
+def test_banded_matrices_expand_to_dense(bc_type):
+    M_imp, M_exp = setup_matrices(11, 0.7, bc_type)
+    ab_imp, ab_exp = setup_banded(11, 0.7, bc_type)
+    for M, ab in ((M_imp, ab_imp), (M_exp, ab_exp)):
+        np.testing.assert_allclose(np.diag(M), ab[1])
+        np.testing.assert_allclose(np.diag(M, 1), ab[0, 1:])
+        np.testing.assert_allclose(np.diag(M, -1), ab[2, :-1])
+        assert not np.any(np.triu(M, 2)) and not np.any(np.tril(M, -2))
+
+@pytest.mark.parametrize('bc_type, bc_params', BCS)
+def test_stepper_matches_dense(bc_type, bc_params):
+    nx, L, alpha, dt, r = setting()
+    x, u0 = rod(nx, L, '100 * x / L + 30 * sin(3 * pi * x / L)', bc_type, bc_params)
+    dense = make_solver(nx, r, bc_type, bc_params, solver='dense')(u0.copy(), 200)
+    np.testing.assert_allclose(Stepper(nx, r, bc_type, bc_params).advance(u0, 200), dense, rtol=1e-12, atol=1e-10)
+
+def test_stepper_advance_in_pieces_and_in_place():
+    nx, L, alpha, dt, r = setting()
+    x, u0 = rod(nx, L, 'exp(-((x - 0.2) / 0.05)**2)', 'neumann', None)
+    stepper = Stepper(nx, r)
+    whole = stepper.advance(u0, 90)
+    assert whole is not u0
+    u = u0.copy()
+    for k in (1, 40, 49):
+        assert stepper.advance(u, k, out=u) is u
+    np.testing.assert_array_equal(u, whole)
+    out = np.empty_like(u0)
+    assert stepper.advance(u0, 0, out=out) is out
+    np.testing.assert_array_equal(out, u0)
+
+def test_dense_and_banded_default_dirichlet_ends_to_zero():
+    nx, L, alpha, dt, r = setting()
+    x, u0 = rod(nx, L, '50 + 10 * x / L', 'dirichlet', None)
+    assert u0[0] == u0[-1] == 0
+    dense = make_solver(nx, r, 'dirichlet', solver='dense')(u0.copy(), 50)
+    banded = make_solver(nx, r, 'dirichlet', solver='banded')(u0.copy(), 50)
+    np.testing.assert_allclose(banded, dense, rtol=1e-12, atol=1e-10)
+    assert dense[0] == dense[-1] == 0
+
+@pytest.mark.parametrize('bc_type, bc_params', BCS)
+def test_ensemble_members_match_their_own_stepper(bc_type, bc_params):
+    nx, L, alpha, dt, r = setting()
+    x, u0 = rod(nx, L, '100 * x / L + 30 * sin(3 * pi * x / L)', bc_type, bc_params)
+    # The member under test between two unrelated rods
+    ensemble = Ensemble(nx, [alpha, 2 * alpha, alpha], [L, L, 2 * L],
+                        [bc_type, 'neumann', 'dirichlet'], [bc_params, None, {'left': 5.0, 'right': 5.0}],
+                        dt=[dt, dt, 4 * dt])
+    members = ensemble.advance(np.stack([u0, u0[::-1], np.full(nx, 5.0)]), 200)
+    dense = make_solver(nx, r, bc_type, bc_params, solver='dense')(u0.copy(), 200)
+    np.testing.assert_allclose(members[0], dense, rtol=1e-12, atol=1e-10)
+    np.testing.assert_array_equal(members[1], Stepper(nx, 2 * r, 'neumann').advance(u0[::-1], 200))
+    np.testing.assert_allclose(members[2], 5.0, rtol=1e-12)
+
+def test_ensemble_subset_keeps_dt():
+    ensemble = Ensemble(21, [1e-4, 2e-4, 3e-4], 1.0)
+    u = np.random.default_rng(1).random((3, 21))
+    full = ensemble.advance(u, 30)
+    part = ensemble.subset([0, 2]).advance(u[[0, 2]], 30)
+    np.testing.assert_array_equal(part, full[[0, 2]])
+    with pytest.raises(ValueError):
+        ensemble.advance(u[:2], 1)
@@ -0,0 +1,35 @@
+# test_spectral.py
+# SpectralSolver against the exact Fourier-series solution.
+import numpy as np
+import pytest
+from heat_core import initialize_u, parse_initial_condition
+from heat_spectral import SpectralSolver
+from heat_verify import FourierReference
+
+BCS = [('neumann', None), ('dirichlet', {'left': 20.0, 'right': 80.0})]
+
+@pytest.mark.parametrize('bc_type, bc_params', BCS)
+@pytest.mark.parametrize('init', ['x * (L - x)', 'exp(-((x - 0.3 * L) / (0.1 * L))**2)'])
+def test_spectral_matches_fourier_reference(bc_type, bc_params, init):
+    L, alpha = 1.0, 9.7e-5
+    f = parse_initial_condition(init, L)
+    x = np.linspace(0, L, 401)
+    u0 = initialize_u(x, f, bc_type, bc_params)
+    reference = FourierReference(f, L, alpha, bc_type, bc_params)
+    solver = SpectralSolver(x, u0, alpha, bc_type, bc_params)
+    for t in (0.01, 0.05, 0.2):
+        t_end = t * L**2 / alpha
+        # Only the sampling of f on the grid separates the two
+        assert np.abs(solver.at(t_end) - reference(x, t_end)).max() / np.ptp(u0) < 3e-5
+
+def test_spectral_advance_matches_at():
+    x = np.linspace(0, 1, 101)
+    u0 = x**3
+    solver = SpectralSolver(x, u0, 1e-4, dt=50.0)
+    np.testing.assert_allclose(solver.advance(u0, 7), solver.at(350.0), rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(solver.at([0.0, 350.0]), [u0, solver.at(350.0)], rtol=1e-12, atol=1e-12)
+
+def test_spectral_needs_a_uniform_grid():
+    x = np.linspace(0, 1, 11)**2
+    with pytest.raises(ValueError):
+        SpectralSolver(x, x, 1e-4)
@@ -0,0 +1,34 @@
+# test_verify.py
+# The Fourier-series reference and the work-precision harness built on it.
+import numpy as np
+import pytest
+from heat_core import initialize_u, parse_initial_condition, steady_state
+from heat_verify import FourierReference, work_precision, recommend
+
+BCS = [('neumann', None), ('dirichlet', {'left': 20.0, 'right': 80.0})]
+
+@pytest.mark.parametrize('bc_type, bc_params', BCS)
+def test_reference_settles_to_steady_state(bc_type, bc_params):
+    f = parse_initial_condition('50 + 40 * cos(pi * x / L)**3', 1.0)
+    reference = FourierReference(f, 1.0, 1e-4, bc_type, bc_params)
+    fine = np.linspace(0, 1, 4001)
+    expected = steady_state(fine, initialize_u(fine, f, bc_type, bc_params), bc_type, bc_params)[::80]
+    np.testing.assert_allclose(reference(fine[::80], 1e5), expected, atol=1e-6)
+
+def test_reference_single_mode_decays_exactly():
+    L, alpha, t = 2.0, 1e-4, 3000.0
+    reference = FourierReference(lambda x: np.cos(3 * np.pi * x / L), L, alpha)
+    x = np.linspace(0, L, 17)
+    np.testing.assert_allclose(reference(x, t), np.cos(3 * np.pi * x / L) * np.exp(-alpha * (3 * np.pi / L)**2 * t),
+                               atol=1e-14)
+    with pytest.raises(ValueError):
+        reference(x, 1e-6)
+
+def test_work_precision_errors_shrink_with_resolution():
+    points = work_precision(0.5, 1.17e-4, 'sin(pi * x / L) + 0.3 * x / L', nxs=(26, 101), steps=(20, 200),
+                            tols=(1e-3,), repeat=1)
+    cn = {(p['nx'], p['steps']): p['error'] for p in points if p['solver'] == 'cn'}
+    assert cn[(101, 200)] < cn[(26, 200)] and cn[(101, 200)] < cn[(101, 20)]
+    best = recommend(points, 1e-3)
+    assert best is not None and best['error'] <= 1e-3
+    assert recommend(points, 0.0) is None